@@ -0,0 +1,361 @@
+"""
+Suite de benchmarks reproducible (pipeline, entrenamiento y serving).
+
+Uso (desde la raíz del repositorio, con el modelo ya entrenado):
+    python -m benchmarks.run_benchmarks                      # todos los grupos, compara con benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --quick --only serving,api
+    python -m benchmarks.run_benchmarks --update-baseline    # guarda esta ejecución como nueva línea base
+
+Cada resultado registra la mediana, mínimo, media y desviación de `repeat` repeticiones (tras
+un calentamiento). La comparación marca como regresión cualquier benchmark cuya mediana supere
+la de la línea base en más de `--threshold` (o el `threshold` propio guardado en la línea base).
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import ConvergenceWarning
+
+from src.domain.pipeline_modules.data_cleaner import DataCleaner
+from src.domain.pipeline_modules.mission_schema import CANONICAL_COLUMNS
+from src.domain.services.exoplanet_pipeline import ExoplanetPreprocessor
+from src.infrastructure.monitoring.logger import setup_logger
+
+DATA_PATH = './data/kepler_koi.csv'
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+DEFAULT_THRESHOLD = 0.25  # +25 % sobre la mediana de la línea base
+MIN_COMPARABLE_SECONDS = 0.005  # Por debajo de 5 ms el ruido del reloj domina: se informa pero no se marca
+
+GROUPS: Dict[str, Callable] = {}
+
+
+def benchmark_group(name: str):
+    """Registra una función de grupo: recibe la configuración y devuelve una lista de resultados."""
+    def register(func):
+        GROUPS[name] = func
+        return func
+    return register
+
+
+def measure(func: Callable[[], object], repeat: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summarize(name: str, timings: List[float], rows: Optional[int] = None) -> dict:
+    median = statistics.median(timings)
+    result = {
+        'name': name,
+        'repeat': len(timings),
+        'median_s': round(median, 6),
+        'min_s': round(min(timings), 6),
+        'mean_s': round(statistics.fmean(timings), 6),
+        'stdev_s': round(statistics.stdev(timings), 6) if len(timings) > 1 else 0.0,
+    }
+    if rows:
+        result['rows'] = rows
+        result['rows_per_second'] = round(rows / median, 1) if median > 0 else None
+    return result
+
+
+def machine_info() -> dict:
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        available_cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available_cpus = os.cpu_count()
+    try:
+        memory_bytes = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        memory_bytes = None
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'available_cpus': available_cpus,
+        'memory_bytes': memory_bytes,
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit_learn': sklearn.__version__,
+        'git_commit': commit,
+    }
+
+
+def make_synthetic_catalog(source_path: str, scale: int, output_path: str, seed: int = 42) -> str:
+
+    """
+    Catálogo sintético `scale` veces mayor: copias de las filas reales con ruido multiplicativo
+    (1 %) en las columnas numéricas koi_* y kepid únicos. Solo se escriben las columnas canónicas.
+    """
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(source_path, comment='#', usecols=lambda col: col in CANONICAL_COLUMNS)
+    numeric = [col for col in base.columns if col.startswith('koi_') and pd.api.types.is_numeric_dtype(base[col])]
+
+    copies = []
+    for copy_index in range(scale):
+        copy = base.copy()
+        if copy_index > 0:
+            noise = rng.lognormal(0.0, 0.01, size=(len(copy), len(numeric)))
+            copy[numeric] = copy[numeric].to_numpy() * noise
+            copy['kepid'] = copy['kepid'] + copy_index * 1_000_000_000
+        copies.append(copy)
+    pd.concat(copies, ignore_index=True).to_csv(output_path, index=False)
+    return output_path
+
+
+@benchmark_group('load')
+def bench_load(config) -> List[dict]:
+    """Carga CSV en frío (parseo + escritura de la caché columnar) y en caliente (lectura de la caché)."""
+    rows = len(DataCleaner(use_cache=False).load_and_select(config.data_path))
+    cache_root = os.path.join(config.workdir, 'load-cache')
+
+    def cold():
+        shutil.rmtree(cache_root, ignore_errors=True)
+        DataCleaner(cache_dir=cache_root).load_and_select(config.data_path)
+
+    def warm():
+        DataCleaner(cache_dir=cache_root).load_and_select(config.data_path)
+
+    return [
+        summarize('load.cold_csv', measure(cold, config.repeat), rows),
+        summarize('load.warm_cache', measure(warm, config.repeat), rows),
+    ]
+
+
+@benchmark_group('pipeline')
+def bench_pipeline(config) -> List[dict]:
+    """Cada paso de ExoplanetPreprocessor (stage_profile) sobre el catálogo real y sus versiones x10/x100."""
+    results = []
+    for scale in config.scales:
+        path = config.data_path
+        if scale > 1:
+            path = make_synthetic_catalog(config.data_path, scale, os.path.join(config.workdir, f'koi_x{scale}.csv'))
+        repeat = 1 if scale >= 100 else config.repeat
+
+        profiles = []
+
+        def run():
+            preprocessor = ExoplanetPreprocessor(data_path=path)
+            preprocessor.fit_transform_complete()
+            profiles.append(preprocessor.stage_profile)
+            return preprocessor
+
+        total = measure(run, repeat)
+        profiles = profiles[1:]  # Se descarta el calentamiento (escribe la caché columnar)
+        n_rows = len(DataCleaner().load_and_select(path))
+        for stage in [entry['stage'] for entry in profiles[0]]:
+            timings = [next(e['seconds'] for e in profile if e['stage'] == stage) for profile in profiles]
+            results.append(summarize(f'pipeline.x{scale}.{stage}', timings, n_rows))
+        results.append(summarize(f'pipeline.x{scale}.total', total, n_rows))
+    return results
+
+
+@benchmark_group('training')
+def bench_training(config) -> List[dict]:
+    """Ajuste del Ensemble final (mismo build_ensemble y split que TrainModelUseCase, sin escribir artefactos)."""
+    from src.application.use_cases.train_model_use_case import build_ensemble
+
+    X, y, temporal_splits = ExoplanetPreprocessor(data_path=config.data_path).fit_transform_complete()
+    train_index, _ = temporal_splits[-1]
+    X_train, y_train = X[train_index], y[train_index]
+
+    def fit():
+        build_ensemble(n_jobs=-1).fit(X_train, y_train)
+
+    return [summarize('training.fit_ensemble', measure(fit, min(config.repeat, 3), warmup=0), len(X_train))]
+
+
+def _load_adapter():
+    from src.infrastructure.adapters.ml_adapter import RandomForestAdapter
+
+    adapter = RandomForestAdapter()
+    adapter.ensure_loaded()
+    return adapter
+
+
+@benchmark_group('serving')
+def bench_serving(config) -> List[dict]:
+    """RandomForestAdapter.predict (una fila) y predict_batch (lotes de 1000 filas)."""
+    adapter = _load_adapter()
+    rng = np.random.default_rng(0)
+    n_features = adapter.EXPECTED_FEATURES_COUNT
+    single_rows = rng.normal(size=(config.single_calls, n_features)).tolist()
+    batch = rng.normal(size=(1000, n_features))
+
+    def single():
+        for row in single_rows:
+            adapter.predict(row)
+
+    def batched():
+        adapter.predict_batch(batch)
+
+    return [
+        summarize('serving.predict_single', measure(single, config.repeat), len(single_rows)),
+        summarize('serving.predict_batch_1000', measure(batched, config.repeat), len(batch)),
+    ]
+
+
+@benchmark_group('api')
+def bench_api(config) -> List[dict]:
+    """Throughput extremo a extremo de /models/predict con TestClient (secuencial y 8 hilos concurrentes)."""
+    from fastapi.testclient import TestClient
+    from src.presentation.api.v1.main import app
+    from src.presentation.api.v1.endpoints import models
+
+    models.ML_REPOSITORY.ensure_loaded()
+    feature_names = models.ML_REPOSITORY.get_feature_names()
+    rng = np.random.default_rng(1)
+    # Filas distintas en cada petición: se mide el modelo, no la caché de predicciones
+    payloads = [{"features": dict(zip(feature_names, row))}
+                for row in rng.normal(size=(config.api_requests, len(feature_names))).tolist()]
+
+    with TestClient(app) as client:
+        def post(payload):
+            response = client.post('/models/predict', json=payload)
+            response.raise_for_status()
+
+        def sequential():
+            models.PREDICTION_CACHE.invalidate()
+            for payload in payloads:
+                post(payload)
+
+        def concurrent():
+            models.PREDICTION_CACHE.invalidate()
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(post, payloads))
+
+        return [
+            summarize('api.predict_sequential', measure(sequential, config.repeat), len(payloads)),
+            summarize('api.predict_concurrent_8', measure(concurrent, config.repeat), len(payloads)),
+        ]
+
+
+def compare(results: List[dict], baseline: dict, threshold: float) -> List[dict]:
+
+    """Una fila por benchmark presente en ambos: ratio de medianas (por fila) y si supera el umbral."""
+    reference = {entry['name']: entry for entry in baseline.get('results', [])}
+    rows = []
+    for result in results:
+        base = reference.get(result['name'])
+        if base is None or not base.get('median_s'):
+            continue
+        limit = base.get('threshold', threshold)
+        ratio = result['median_s'] / base['median_s']
+        if result.get('rows') and base.get('rows'):
+            ratio *= base['rows'] / result['rows']  # Tiempo por fila: --quick usa menos llamadas/peticiones
+        rows.append({'name': result['name'], 'baseline_s': base['median_s'], 'current_s': result['median_s'],
+                     'ratio': round(ratio, 3), 'threshold': limit,
+                     'regression': ratio > 1.0 + limit and result['median_s'] >= MIN_COMPARABLE_SECONDS})
+    return rows
+
+
+def run(groups: List[str], config) -> dict:
+    results = []
+    for name in groups:
+        started = time.perf_counter()
+        try:
+            group_results = GROUPS[name](config)
+        except FileNotFoundError as e:
+            # p. ej. sin modelo entrenado: el grupo se omite y queda anotado
+            print(f"⚠️  Grupo '{name}' omitido: {e}")
+            results.append({'name': f'{name}.skipped', 'skipped': str(e)})
+            continue
+        results.extend(group_results)
+        print(f"✅ {name}: {len(group_results)} benchmarks en {time.perf_counter() - started:.1f}s")
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': machine_info(),
+        'config': {'repeat': config.repeat, 'scales': config.scales, 'data_path': config.data_path},
+        'results': results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de pipeline, entrenamiento y serving.")
+    parser.add_argument('--only', help=f"Grupos separados por comas (por defecto todos: {','.join(GROUPS)}).")
+    parser.add_argument('--quick', action='store_true', help="Menos repeticiones, sin el catálogo x100.")
+    parser.add_argument('--repeat', type=int, default=None, help="Repeticiones por benchmark (por defecto 5; 2 con --quick).")
+    parser.add_argument('--scales', default=None, help="Factores del catálogo sintético (por defecto 1,10,100; 1,10 con --quick).")
+    parser.add_argument('--data-path', default=DATA_PATH)
+    parser.add_argument('--output', default=None, help="JSON de resultados (por defecto benchmarks/results/bench-<fecha>.json).")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Línea base con la que comparar.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Regresión tolerada sobre la mediana (0.25 = +25 %%).")
+    parser.add_argument('--update-baseline', action='store_true', help="Guardar los resultados como nueva línea base.")
+    parser.add_argument('--no-fail', action='store_true', help="No devolver código de error ante regresiones.")
+    args = parser.parse_args(argv)
+
+    groups = args.only.split(',') if args.only else list(GROUPS)
+    unknown = [name for name in groups if name not in GROUPS]
+    if unknown:
+        parser.error(f"Grupos desconocidos: {unknown}")
+    args.repeat = args.repeat or (2 if args.quick else 5)
+    args.scales = [int(s) for s in (args.scales or ('1,10' if args.quick else '1,10,100')).split(',')]
+    args.single_calls = 100 if args.quick else 500
+    args.api_requests = 100 if args.quick else 500
+
+    # Los benchmarks miden el código, no la salida por consola de cada paso
+    setup_logger()
+    logging.getLogger().setLevel(logging.WARNING)
+    warnings.filterwarnings('ignore', category=ConvergenceWarning)
+
+    with tempfile.TemporaryDirectory(prefix='exoai-bench-') as workdir:
+        args.workdir = workdir
+        report = run(groups, args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Resultados: {output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Línea base actualizada: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Sin línea base para comparar (use --update-baseline).")
+        return 0
+    with open(args.baseline) as f:
+        comparison = compare(report['results'], json.load(f), args.threshold)
+
+    regressions = [row for row in comparison if row['regression']]
+    for row in comparison:
+        flag = '❌' if row['regression'] else '  '
+        print(f"{flag} {row['name']:<45} {row['baseline_s']:>10.4f}s -> {row['current_s']:>10.4f}s  x{row['ratio']:.2f}")
+    print(f"Regresiones: {len(regressions)} de {len(comparison)} (umbral por defecto +{args.threshold:.0%})")
+    return 1 if regressions and not args.no_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
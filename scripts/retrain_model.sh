@@ -3,6 +3,11 @@
 echo "--- Iniciando reentrenamiento del Ensemble V3 Final ---"
 # Activa el entorno virtual
 source venv/bin/activate
-# Ejecuta el caso de uso (el entry point del entrenamiento)
-python -m src.application.use_cases.train_model_use_case
-echo "--- Reentrenamiento Finalizado. Modelo v3 actualizado en /models ---"
\ No newline at end of file
+# Ejecuta el caso de uso (el entry point del entrenamiento). Con --incremental solo se procesan las
+# filas nuevas o modificadas del volcado; si el delta es grande se entrena desde cero automáticamente.
+python -m src.application.use_cases.train_model_use_case --incremental
+echo "--- Reentrenamiento Finalizado. Nueva versión publicada en /models/registry ---"
+# Recarga en caliente en la API en ejecución (sin reinicio ni peticiones perdidas).
+# -f: un 401/403/500 de la API cuenta como fallo, no como recarga correcta
+curl -sf -X POST "http://localhost:${API_PORT:-8000}/models/admin/reload" -H "X-Admin-Token: ${MODEL_ADMIN_TOKEN}" \
+    || echo "Recarga no realizada (API no disponible o rechazada): la nueva versión se cargará en el próximo arranque."
\ No newline at end of file
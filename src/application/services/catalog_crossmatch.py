@@ -0,0 +1,90 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from src.domain.pipeline_modules.catalog_index import DEFAULT_MATCH_RADIUS_ARCSEC, CatalogIndex
+
+# Configuración por entorno (ver .env); CATALOG_INDEX_ENABLED=false desactiva el contexto de catálogos
+DEFAULT_ENABLED = os.getenv("CATALOG_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+KOI_CATALOG_PATH = os.getenv("NASA_DATA_PATH", "./data/kepler_koi.csv")
+CONFIRMED_CATALOG_PATH = os.getenv("CONFIRMED_CATALOG_PATH", "./data/kepler_confirmed.csv")
+TOI_CATALOG_PATH = os.getenv("TOI_CATALOG_PATH", "./data/tess_toi.csv")
+DEFAULT_RADIUS_ARCSEC = float(os.getenv("CATALOG_MATCH_RADIUS_ARCSEC", str(DEFAULT_MATCH_RADIUS_ARCSEC)))
+
+# Columnas de una petición de candidatos que identifican el objeto (no son features del modelo)
+ID_COLUMNS = ('kepid', 'tid')
+POSITION_COLUMNS = ('ra', 'dec')
+
+
+def load_default_index() -> CatalogIndex:
+    """Índice de los catálogos de data/ (persistido en data/.cache; se reconstruye si cambian)."""
+    existing = [path if path and os.path.exists(path) else None for path in (TOI_CATALOG_PATH, CONFIRMED_CATALOG_PATH)]
+    return CatalogIndex.load_or_build(KOI_CATALOG_PATH, *existing)
+
+
+class CatalogCrossMatchService:
+
+    """
+    Servicio de Aplicación: Contexto de catálogos conocidos (KOI, confirmados, TOI) para
+    predicciones y auditoría de etiquetas. El índice se carga una sola vez, de forma diferida
+    y protegida por un lock; si no puede cargarse el servicio queda desactivado y las
+    predicciones siguen sin contexto.
+    """
+
+    def __init__(self, loader: Callable[[], CatalogIndex] = load_default_index, enabled: bool = DEFAULT_ENABLED,
+                 radius_arcsec: float = DEFAULT_RADIUS_ARCSEC):
+        self.enabled = enabled
+        self.radius_arcsec = radius_arcsec
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._index: Optional[CatalogIndex] = None
+        self._load_error: Optional[str] = None
+
+    @property
+    def index(self) -> Optional[CatalogIndex]:
+        if not self.enabled or self._load_error is not None:
+            return None
+        if self._index is None:
+            with self._lock:
+                if self._index is None and self._load_error is None:
+                    try:
+                        self._index = self._loader()
+                    except Exception as e:
+                        self._load_error = str(e)
+                        logging.error(f"❌ Índice de catálogos no disponible: {e}")
+        return self._index
+
+    def crossmatch(self, kepid=None, tid=None, names=None, ra=None, dec=None,
+                   radius_arcsec: float = None) -> List[Dict[str, object]]:
+        """Contexto conocido por fila (uniones por ID y cono por posición). Falla si no hay índice."""
+        index = self.index
+        if index is None:
+            raise RuntimeError(f"Índice de catálogos no disponible: {self._load_error or 'desactivado'}")
+        return index.known_context(kepid=kepid, tid=tid, names=names, ra=ra, dec=dec,
+                                   radius_arcsec=radius_arcsec or self.radius_arcsec)
+
+    def context_for_columns(self, raw_columns: Mapping[str, np.ndarray]) -> Optional[List[Dict[str, object]]]:
+
+        """
+        Contexto para un lote de candidatos en columnas crudas: usa kepid/tid y ra/dec si la
+        petición los trae. None si no hay columnas de identificación o el índice no está disponible.
+        """
+        columns = {name: raw_columns[name] for name in ID_COLUMNS if name in raw_columns}
+        if all(name in raw_columns for name in POSITION_COLUMNS):
+            columns.update({name: raw_columns[name] for name in POSITION_COLUMNS})
+        if not columns or self.index is None:
+            return None
+        return self.index.known_context(radius_arcsec=self.radius_arcsec, **columns)
+
+    def get_stats(self) -> dict:
+        index = self._index
+        stats = {"enabled": self.enabled, "loaded": index is not None, "load_error": self._load_error,
+                 "radius_arcsec": self.radius_arcsec}
+        if index is not None:
+            catalogs, counts = np.unique(index.catalog, return_counts=True)
+            stats.update({"entries": len(index), "positioned_entries": len(index.vectors),
+                          "entries_by_catalog": {str(cat): int(count) for cat, count in zip(catalogs, counts)}})
+        return stats
@@ -0,0 +1,71 @@
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+from src.domain.pipeline_modules.drift_reference import DriftReference
+from src.domain.pipeline_modules.streaming_stats import FeatureDistributionSketch
+
+# Configuración por entorno (ver .env); DRIFT_MONITOR_ENABLED=false lo desactiva
+DEFAULT_ENABLED = os.getenv("DRIFT_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+class DriftMonitor:
+
+    """
+    Servicio de Aplicación: Acumula la distribución de las features servidas en un sketch
+    de memoria constante y la compara con la referencia del entrenamiento (PSI/KS y
+    valores fuera de los rangos astronómicos). observe() es O(1) por fila; al cambiar la
+    versión servida (otra referencia) la ventana de serving se reinicia.
+    """
+
+    def __init__(self, enabled: bool = DEFAULT_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._reference: Optional[DriftReference] = None
+        self._sketch: Optional[FeatureDistributionSketch] = None
+        self._resets = 0
+
+    def observe(self, matrix, reference: Optional[DriftReference]) -> None:
+        """Añade las filas servidas (N x F, mismo espacio que la referencia) a la ventana actual."""
+        if not self.enabled or reference is None:
+            return
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.shape[1] != reference.sketch.n_features:
+            return
+        with self._lock:
+            if reference is not self._reference:
+                self._start_window(reference)
+            self._sketch.update(matrix)
+
+    def _start_window(self, reference: Optional[DriftReference]) -> None:
+        self._reference = reference
+        self._sketch = reference.new_sketch() if reference is not None else None
+        self._resets += 1
+
+    def reset(self) -> None:
+        """Vacía la ventana de serving (p. ej. tras revisar un aviso de drift)."""
+        with self._lock:
+            self._start_window(self._reference)
+
+    def report(self, reference: Optional[DriftReference] = None) -> dict:
+
+        """
+        Puntuaciones de drift de la ventana actual. Si se pasa la referencia servida y no es
+        la de la ventana, se informa sin datos (la ventana se reinicia en la próxima predicción).
+        """
+        with self._lock:
+            current = self._reference
+            sketch = None if self._sketch is None else FeatureDistributionSketch.from_dict(self._sketch.to_dict())
+        reference = reference or current
+        if not self.enabled or reference is None:
+            return {"enabled": self.enabled, "status": "no_reference", "features": {}}
+        if reference is not current or sketch is None:
+            sketch = reference.new_sketch()
+        report = reference.compare(sketch)
+        report["enabled"] = self.enabled
+        report["window_resets"] = self._resets
+        return report
@@ -1,9 +1,20 @@
 import logging
-from typing import List
-from src.domain.entities.exoplanet import Exoplanet # Usamos la entidad de dominio
+import numpy as np
+import pandas as pd
+from typing import List, Mapping, Sequence
+from src.domain.entities.exoplanet import Exoplanet, ExoplanetBatch # Usamos las entidades de dominio
 from src.domain.repositories.ml_repository import MLRepository # Usamos el PORT
+from src.domain.pipeline_modules.inference_transformer import InferenceTransformer
+from src.domain.pipeline_modules.scientific_filter import ScientificFilter
+from src.domain.pipeline_modules.mission_schema import KEPLER_SCHEMA, MISSION_COLUMN, detect_missions, to_canonical
+from src.application.services.prediction_cache import PredictionCache
+from src.application.services.drift_monitor import DriftMonitor
 
-logging.basicConfig(level=logging.INFO)
+# Líneas por predicción: logger muestreado/limitado (ver src/infrastructure/monitoring/logger.py)
+prediction_logger = logging.getLogger("exoplanet-ml.predictions")
+
+# Columnas crudas con la temperatura de equilibrio (KOI, TOI/K2): alimenta la regla de habitabilidad, no el modelo
+EQUILIBRIUM_TEMP_SOURCES = ('koi_teq', 'pl_eqt')
 
 class ExoplanetService:
 
@@ -11,10 +22,172 @@ class ExoplanetService:
     Servicio de Aplicación: Traduce la predicción técnica a una entidad 
     de dominio rica en lógica de negocio (DDD).
     """
-    def __init__(self, ml_repository: MLRepository):
-        """Inyección del Adaptador de Modelo ML (el Port)."""
+    def __init__(self, ml_repository: MLRepository, transformer: InferenceTransformer = None,
+                 candidate_filter: ScientificFilter = None, prediction_cache: PredictionCache = None,
+                 drift_monitor: DriftMonitor = None):
+        """
+        Inyección del Adaptador de Modelo ML (el Port), del transformador de inferencia
+        (columnas crudas -> features) y del filtro científico compilado del entrenamiento.
+        Sin transformador explícito se usa el de la versión que sirve el repositorio.
+        La caché de predicciones es opcional (sin ella, cada fila llega al modelo), igual
+        que el monitor de drift (recibe todas las filas servidas, también las de la caché).
+        """
         self.ml_repository = ml_repository
+        self._transformer = transformer
+        self.candidate_filter = candidate_filter or ScientificFilter()
+        self.prediction_cache = prediction_cache
+        self.drift_monitor = drift_monitor
+
+    @property
+    def transformer(self):
+        if self._transformer is not None:
+            return self._transformer
+        return self.ml_repository.get_transformer()
+
+    def predict(self, features: List[float]) -> dict:
+
+        """Predicción técnica de un único candidato (delegada al Port)."""
+        if self.prediction_cache is None or not self.prediction_cache.enabled:
+            result = self.ml_repository.predict(features)
+            self._observe_drift([features])
+            return result
+        result = self.predict_batch([features])
+        return {
+            "prediction": result['predictions'][0],
+            "confidence": result['confidences'][0],
+            "model_name": result['model_name'],
+        }
+
+    def predict_batch(self, features_matrix: Sequence[Sequence[float]]) -> dict:
+
+        """
+        Predicción vectorizada de N candidatos en una sola llamada al Port. Con caché,
+        el lote se divide en aciertos y fallos y solo los fallos llegan al modelo.
+        """
+        result = self._predict_batch(features_matrix)
+        self._observe_drift(features_matrix)
+        return result
+
+    def _observe_drift(self, features_matrix: Sequence[Sequence[float]]) -> None:
+        if self.drift_monitor is not None:
+            self.drift_monitor.observe(features_matrix, self.ml_repository.get_drift_reference())
+
+    def _predict_batch(self, features_matrix: Sequence[Sequence[float]]) -> dict:
+        cache = self.prediction_cache
+        if cache is None or not cache.enabled:
+            return self.ml_repository.predict_batch(features_matrix)
+
+        matrix = np.asarray(features_matrix, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2:
+            return self.ml_repository.predict_batch(features_matrix)
+
+        version = getattr(self.ml_repository, 'model_version', None)
+        keys = cache.keys_for(matrix, version)
+        cached = cache.lookup(keys, version)
+        misses = [i for i, entry in enumerate(cached) if entry is None]
+
+        predictions = [entry[0] if entry else None for entry in cached]
+        confidences = [entry[1] if entry else None for entry in cached]
+        model_name = version
+
+        if misses:
+            result = self.ml_repository.predict_batch(matrix[misses])
+            model_name = result['model_name']
+            miss_keys = [keys[i] for i in misses]
+            if model_name != version:
+                # El modelo se (re)cargó durante la llamada: las claves deben llevar la versión que predijo
+                miss_keys = cache.keys_for(matrix[misses], model_name)
+            cache.store(miss_keys, result['predictions'], result['confidences'], model_name)
+            for row, prediction, confidence in zip(misses, result['predictions'], result['confidences']):
+                predictions[row] = prediction
+                confidences[row] = confidence
+
+        return {"predictions": predictions, "confidences": confidences, "model_name": model_name}
         
+    @staticmethod
+    def canonicalize_columns(raw_columns: Mapping[str, Sequence]) -> Mapping[str, Sequence]:
+
+        """
+        Traduce columnas de otras misiones (TESS TOI, K2, o un lote mixto) a las columnas
+        canónicas koi_*. Un lote Kepler se devuelve tal cual; un lote mixto conserva la
+        misión de origen de cada fila (MISSION_COLUMN) para los filtros científicos.
+        """
+        schemas = detect_missions(raw_columns.keys())
+        if schemas == [KEPLER_SCHEMA]:
+            return raw_columns
+        frame = to_canonical(pd.DataFrame({name: np.asarray(values) for name, values in raw_columns.items()}), schemas)
+        columns = {col: frame[col].to_numpy(dtype=np.float64) for col in frame.columns
+                   if col not in ('koi_disposition', MISSION_COLUMN)}
+        if MISSION_COLUMN in frame.columns:
+            columns[MISSION_COLUMN] = frame[MISSION_COLUMN].to_numpy()
+        return columns
+
+    @staticmethod
+    def equilibrium_temperature(raw_columns: Mapping[str, Sequence]):
+
+        """Temperatura de equilibrio por fila (primera fuente con valor; NaN si ninguna). None sin columnas."""
+        sources = [np.asarray(raw_columns[col], dtype=np.float64) for col in EQUILIBRIUM_TEMP_SOURCES if col in raw_columns]
+        if not sources:
+            return None
+        values = sources[0]
+        for other in sources[1:]:
+            values = np.where(np.isfinite(values), values, other)
+        return values
+
+    def screen_candidates(self, raw_columns: Mapping[str, Sequence[float]]) -> tuple:
+
+        """Aplica los filtros científicos del entrenamiento: (máscara de aceptados, rechazos por filtro)."""
+        return self.candidate_filter.evaluate(raw_columns)
+
+    def predict_candidates(self, raw_columns: Mapping[str, Sequence[float]]) -> dict:
+
+        """
+        Pipeline de inferencia sobre columnas crudas (KOI, o TESS/K2 traducidas al esquema
+        canónico; se admite un lote mixto): los candidatos fuera del dominio
+        científico se rechazan antes del modelo; el resto se transforma y se predice en lote.
+        Las filas rechazadas quedan con prediction/confidence = None; is_potentially_habitable
+        es None también si la fila no trae temperatura de equilibrio (habitabilidad desconocida).
+        """
+        transformer = self.transformer
+        if transformer is None:
+            raise RuntimeError("No hay transformador de inferencia cargado. Entrene el modelo para generarlo.")
+
+        equilibrium_temp = self.equilibrium_temperature(raw_columns)
+        raw_columns = self.canonicalize_columns(raw_columns)
+        accepted, rejections = self.screen_candidates(raw_columns)
+        predictions = [None] * len(accepted)
+        confidences = [None] * len(accepted)
+        habitable = [None] * len(accepted)
+        model_name = None
+
+        if accepted.any():
+            subset = {name: np.asarray(values, dtype=np.float64)[accepted] for name, values in raw_columns.items()
+                      if name != MISSION_COLUMN}
+            result = self.predict_batch(transformer.transform(subset))
+            rows = np.flatnonzero(accepted)
+            for row, prediction, confidence in zip(rows, result['predictions'], result['confidences']):
+                predictions[row] = prediction
+                confidences[row] = confidence
+            if equilibrium_temp is not None:
+                batch = ExoplanetBatch.from_columns({**subset, 'koi_teq': equilibrium_temp[accepted]}, result['confidences'])
+                known = np.isfinite(batch.equilibrium_temp)
+                for row, is_habitable in zip(rows[known], batch.is_potentially_habitable()[known]):
+                    habitable[row] = bool(is_habitable)
+            model_name = result['model_name']
+
+        prediction_logger.info("Candidatos evaluados: %d. Rechazados por filtros: %d", len(accepted), (~accepted).sum())
+
+        return {
+            "accepted": accepted.tolist(),
+            "predictions": predictions,
+            "confidences": confidences,
+            "is_potentially_habitable": habitable,
+            "rejections": rejections,
+            "model_name": model_name,
+        }
+
     def classify_and_evaluate(self, features: List[float], astronomical_params: dict) -> dict:
 
         """
@@ -35,7 +208,7 @@ class ExoplanetService:
         # 3. Regla de Negocio del Dominio
         is_habitable = exoplanet_entity.is_potentially_habitable()
         
-        logging.info(f"Evaluación de Habitabilidad para {exoplanet_entity.kepid}: {is_habitable}")
+        prediction_logger.info("Evaluación de Habitabilidad para %s: %s", exoplanet_entity.kepid, is_habitable)
         
         # 4. Retorno del resultado enriquecido
         return {
@@ -43,4 +216,24 @@ class ExoplanetService:
             "confidence": prediction_result['confidence'],
             "model_name": prediction_result['model_name'],
             "is_potentially_habitable": is_habitable
-        }
\ No newline at end of file
+        }
+
+    def classify_and_evaluate_batch(self, features_matrix: Sequence[Sequence[float]], astronomical_params: Mapping[str, Sequence]) -> dict:
+
+        """
+        Versión columnar de classify_and_evaluate para catálogos: una pasada del modelo y la
+        regla de habitabilidad como máscara sobre un ExoplanetBatch (sin una entidad por fila).
+        `astronomical_params` son columnas KOI (kepid, koi_period, koi_prad, koi_teq).
+        """
+        result = self.predict_batch(features_matrix)
+        batch = ExoplanetBatch.from_columns(astronomical_params, result['confidences'])
+        is_habitable = batch.is_potentially_habitable()
+
+        prediction_logger.info("Evaluación de Habitabilidad en lote: %d de %d candidatos", is_habitable.sum(), len(batch))
+
+        return {
+            "predictions": result['predictions'],
+            "confidences": result['confidences'],
+            "model_name": result['model_name'],
+            "is_potentially_habitable": is_habitable.tolist()
+        }
@@ -0,0 +1,180 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from src.application.services.exoplanet_service import ExoplanetService
+
+logger = logging.getLogger(__name__)
+
+# Ventana de agrupación configurable por entorno (ver .env)
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "2.0"))
+
+
+class PredictionBatcher:
+
+    """
+    Servicio de Aplicación: Coalescedor de peticiones (micro-batching dinámico).
+    Agrupa las predicciones individuales concurrentes durante una ventana corta
+    (max_wait_ms o max_batch_size filas, lo que ocurra primero), ejecuta un único
+    predict_batch vectorizado en un hilo de trabajo y resuelve el futuro de cada llamante.
+    Así el event loop de FastAPI nunca queda bloqueado por sklearn.
+    """
+
+    STATS_WINDOW = 1024  # Muestras recientes usadas para percentiles
+
+    def __init__(self, service: ExoplanetService, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, executor: Optional[ThreadPoolExecutor] = None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size debe ser >= 1.")
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict-batcher")
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self._batches_total = 0
+        self._rows_total = 0
+        self._errors_total = 0
+        self._batch_sizes = deque(maxlen=self.STATS_WINDOW)
+        self._wait_times_ms = deque(maxlen=self.STATS_WINDOW)
+        self._inference_times_ms = deque(maxlen=self.STATS_WINDOW)
+
+    def _ensure_worker(self) -> None:
+        """Arranca (o re-arranca si cambió el event loop) la tarea que consume la cola."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            # Contexto vacío: el worker vive más que la petición que lo arranca y no debe heredar su request id
+            self._worker = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def submit(self, features: List[float]) -> dict:
+
+        """Encola una fila de features y espera su resultado individual (mismo formato que predict)."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((features, future, time.perf_counter()))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        """Espera la primera petición y agrega las que lleguen dentro de la ventana."""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            # Primero drenamos sin esperar lo que ya está encolado
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            dispatched_at = time.perf_counter()
+            for _, _, enqueued_at in batch:
+                self._wait_times_ms.append((dispatched_at - enqueued_at) * 1000.0)
+
+            try:
+                await self._dispatch(batch)
+            except Exception as e:  # El worker nunca debe morir: cada futuro ya recibió su error
+                logger.error(f"Error inesperado en el micro-batcher: {e}")
+
+    async def _dispatch(self, batch: list) -> None:
+        """Ejecuta un predict_batch en el hilo de trabajo y reparte los resultados por fila."""
+        rows = [features for features, _, _ in batch]
+        futures = [future for _, future, _ in batch]
+
+        started = time.perf_counter()
+        try:
+            result = await self._loop.run_in_executor(self._executor, self._predict_matrix, rows)
+        except Exception:
+            # Una fila inválida no debe hacer fallar a las demás: degradamos a predicción individual
+            await self._dispatch_individually(batch)
+            return
+        finally:
+            self._inference_times_ms.append((time.perf_counter() - started) * 1000.0)
+
+        self._batches_total += 1
+        self._rows_total += len(batch)
+        self._batch_sizes.append(len(batch))
+
+        for i, future in enumerate(futures):
+            if not future.done():
+                future.set_result({
+                    "prediction": result['predictions'][i],
+                    "confidence": result['confidences'][i],
+                    "model_name": result['model_name'],
+                })
+
+    async def _dispatch_individually(self, batch: list) -> None:
+        for features, future, _ in batch:
+            try:
+                result = await self._loop.run_in_executor(self._executor, self.service.predict, features)
+                self._rows_total += 1
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                self._errors_total += 1
+                if not future.done():
+                    future.set_exception(e)
+        self._batches_total += 1
+        self._batch_sizes.append(len(batch))
+
+    def _predict_matrix(self, rows: list) -> dict:
+        return self.service.predict_batch(np.asarray(rows, dtype=np.float64))
+
+    def get_stats(self) -> dict:
+
+        """Estadísticas para ajustar throughput vs latencia p99 (profundidad de cola, tamaños y esperas)."""
+
+        def _percentiles(samples) -> dict:
+            if not samples:
+                return {"mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+            values = np.fromiter(samples, dtype=np.float64)
+            return {
+                "mean": round(float(values.mean()), 4),
+                "p50": round(float(np.percentile(values, 50)), 4),
+                "p99": round(float(np.percentile(values, 99)), 4),
+                "max": round(float(values.max()), 4),
+            }
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches_total": self._batches_total,
+            "rows_total": self._rows_total,
+            "errors_total": self._errors_total,
+            "batch_size": _percentiles(self._batch_sizes),
+            "wait_time_ms": _percentiles(self._wait_times_ms),
+            "inference_time_ms": _percentiles(self._inference_times_ms),
+        }
+
+    async def close(self) -> None:
+        """Detiene el worker (usado en el shutdown de la API)."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
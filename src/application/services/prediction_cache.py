@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Configuración por entorno (ver .env); PREDICTION_CACHE_MAX_ENTRIES=0 desactiva la caché
+DEFAULT_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "100000"))
+DEFAULT_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+DEFAULT_DECIMALS = int(os.getenv("PREDICTION_CACHE_DECIMALS", "6"))
+
+
+class PredictionCache:
+
+    """
+    Servicio de Aplicación: Caché LRU/TTL en proceso de resultados de predicción.
+    La clave es un hash (blake2b, 16 bytes) del vector de features ordenado y redondeado
+    a `decimals` más la versión del modelo, de modo que la memoria por entrada es fija y
+    acotada por `max_entries`. Al cambiar la versión servida la caché se vacía entera.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 decimals: int = DEFAULT_DECIMALS):
+        if max_entries < 0:
+            raise ValueError("max_entries debe ser >= 0.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.decimals = decimals
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()  # clave -> (expira_en, predicción, confianza)
+        self._version: Optional[str] = None
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def keys_for(self, matrix: np.ndarray, version: Optional[str]) -> List[bytes]:
+
+        """Una clave por fila. El redondeo se hace vectorizado; -0.0 se normaliza a 0.0."""
+        rounded = np.ascontiguousarray(np.round(matrix, self.decimals) + 0.0, dtype=np.float64)
+        prefix = hashlib.blake2b(str(version).encode(), digest_size=16)
+        keys = []
+        for row in rounded:
+            hasher = prefix.copy()
+            hasher.update(row.data)
+            keys.append(hasher.digest())
+        return keys
+
+    def lookup(self, keys: List[bytes], version: Optional[str]) -> List[Optional[Tuple[int, float]]]:
+
+        """(predicción, confianza) por clave, o None si falta o caducó. Los aciertos pasan al final del LRU."""
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            self._check_version(version)
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] < now:
+                    del self._entries[key]
+                    self._expirations += 1
+                    entry = None
+                if entry is None:
+                    self._misses += 1
+                    results.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    results.append((entry[1], entry[2]))
+        return results
+
+    def store(self, keys: List[bytes], predictions: List[int], confidences: List[float], version: Optional[str]) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._check_version(version)
+            for key, prediction, confidence in zip(keys, predictions, confidences):
+                self._entries[key] = (expires_at, prediction, confidence)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _check_version(self, version: Optional[str]) -> None:
+        # Se llama con el lock tomado: una versión nueva invalida todo lo anterior
+        if version is not None and version != self._version:
+            if self._version is not None:
+                self._clear()
+            self._version = version
+
+    def _clear(self) -> None:
+        if self._entries:
+            self._entries.clear()
+        self._invalidations += 1
+
+    def invalidate(self) -> None:
+
+        """Vacía la caché (p. ej. tras recargar el modelo)."""
+        with self._lock:
+            self._clear()
+            self._version = None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "decimals": self.decimals,
+                "size": len(self._entries),
+                "model_version": self._version,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
@@ -0,0 +1,164 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.domain.pipeline_modules.transit_search import TRANSIT_COLUMNS, TransitSearch
+from src.infrastructure.adapters.fits_light_curve_reader import (
+    discover_light_curves, read_light_curve, stitch_light_curves
+)
+from src.infrastructure.monitoring.logger import setup_logger
+
+# Logger del módulo (los handlers los configura setup_logger al ejecutar el script)
+logger = logging.getLogger(__name__)
+
+# Columnas de la tabla de features por objetivo (las koi_* siguen las unidades del catálogo KOI)
+FEATURE_TABLE_COLUMNS = ['target_id', 'mission', 'n_files', 'n_points'] + list(TRANSIT_COLUMNS)
+
+
+def _file_fingerprint(paths: List[str]) -> List[list]:
+    """Nombre, tamaño y mtime de cada archivo: si cambia, el objetivo se reprocesa."""
+    return [[os.path.basename(p), os.path.getsize(p), int(os.path.getmtime(p))] for p in paths]
+
+
+def _process_target(task: dict) -> dict:
+
+    """
+    Worker: lee los FITS del objetivo, une trimestres/sectores, limpia (sigma-clip),
+    aplana (mediana móvil de `window_days`) y ejecuta la búsqueda BLS.
+    """
+    start = time.perf_counter()
+    row = {'target_id': task['target_id'], 'mission': task['mission'], 'n_files': len(task['paths'])}
+    try:
+        light_curve = stitch_light_curves([read_light_curve(path) for path in task['paths']])
+        light_curve.sigma_clip()
+        cadence = float(np.median(np.diff(light_curve.time))) if len(light_curve) > 1 else 0.0
+        if cadence > 0:
+            light_curve.detrend(window_length=int(task['window_days'] / cadence))
+            light_curve.sigma_clip()
+        row['n_points'] = len(light_curve)
+        row.update(task['transit_search'].search(light_curve))
+        status, error = 'ok', None
+    except Exception as e:
+        row.setdefault('n_points', 0)
+        status, error = 'error', f"{type(e).__name__}: {e}"
+
+    return {
+        'target': f"{task['mission']}:{task['target_id']}",
+        'files': task['fingerprint'],
+        'status': status,
+        'error': error,
+        'seconds': round(time.perf_counter() - start, 3),
+        'row': row,
+    }
+
+
+class IngestLightCurvesUseCase:
+    """
+    Caso de Uso: Ingesta nocturna de curvas de luz FITS locales (Kepler/TESS).
+    Descubre los archivos, agrupa por objetivo, procesa cada objetivo en un pool de procesos
+    (normalización + búsqueda de tránsitos BLS) y escribe una tabla de features por objetivo
+    con columnas koi_* que ExoplanetPreprocessor.transform / ExoplanetService.predict_candidates
+    consumen directamente. Es reanudable: cada objetivo terminado se anota en un manifiesto
+    JSONL y en la siguiente ejecución se omite si sus archivos no cambiaron.
+    """
+
+    def __init__(self, input_dir: str, output_path: str, manifest_path: Optional[str] = None,
+                 max_workers: Optional[int] = None, window_days: float = 1.0,
+                 transit_search: Optional[TransitSearch] = None):
+        self.input_dir = input_dir
+        self.output_path = output_path
+        self.manifest_path = manifest_path or os.path.splitext(output_path)[0] + '.manifest.jsonl'
+        self.max_workers = max_workers
+        self.window_days = window_days
+        self.transit_search = transit_search or TransitSearch()
+
+    def _load_manifest(self) -> Dict[str, dict]:
+
+        """Última entrada por objetivo; una línea truncada (corte a mitad de escritura) se ignora."""
+        entries = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    entries[entry['target']] = entry
+        return entries
+
+    def run(self) -> pd.DataFrame:
+        logger.info(f"--- Ingesta de curvas de luz desde: {self.input_dir} ---")
+        targets = discover_light_curves(self.input_dir)
+        manifest = self._load_manifest()
+
+        tasks = []
+        for (mission, target_id), paths in targets.items():
+            fingerprint = _file_fingerprint(paths)
+            done = manifest.get(f"{mission}:{target_id}")
+            if done and done['status'] == 'ok' and done['files'] == fingerprint:
+                continue
+            tasks.append({'mission': mission, 'target_id': target_id, 'paths': paths, 'fingerprint': fingerprint,
+                          'window_days': self.window_days, 'transit_search': self.transit_search})
+
+        logger.info(f"🔭 Objetivos: {len(targets)} | ya procesados: {len(targets) - len(tasks)} | pendientes: {len(tasks)}")
+
+        start = time.perf_counter()
+        output_dir = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(output_dir, exist_ok=True)
+        with open(self.manifest_path, 'a') as manifest_file:
+            for entry in self._execute(tasks):
+                # Una línea por objetivo terminado y flush inmediato: un corte no pierde lo ya hecho
+                manifest_file.write(json.dumps(entry) + '\n')
+                manifest_file.flush()
+                manifest[entry['target']] = entry
+                if entry['status'] != 'ok':
+                    logger.warning(f"Objetivo {entry['target']} con error: {entry['error']}")
+
+        feature_table = self._write_feature_table(manifest, targets)
+        failed = sum(1 for entry in manifest.values() if entry['status'] != 'ok')
+        logger.info(f"✅ Ingesta completada en {time.perf_counter() - start:.1f}s. "
+                    f"Filas: {len(feature_table)}, errores: {failed}. Tabla: {self.output_path}")
+        return feature_table
+
+    def _execute(self, tasks: List[dict]):
+        if self.max_workers == 1:
+            for task in tasks:
+                yield _process_target(task)
+            return
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(_process_target, task) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _write_feature_table(self, manifest: Dict[str, dict], targets: dict) -> pd.DataFrame:
+
+        """Tabla final (una fila por objetivo presente en disco y procesado sin error)."""
+        present = {f"{mission}:{target_id}" for mission, target_id in targets}
+        rows = [entry['row'] for key, entry in sorted(manifest.items()) if entry['status'] == 'ok' and key in present]
+        feature_table = pd.DataFrame(rows, columns=FEATURE_TABLE_COLUMNS)
+        tmp_path = f"{self.output_path}.tmp"
+        feature_table.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.output_path)
+        return feature_table
+
+
+# --- Ejecución del Caso de Uso ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingesta de curvas de luz FITS y búsqueda de tránsitos (BLS).")
+    parser.add_argument('input_dir', help="Directorio con los FITS de Kepler/TESS (se recorre recursivamente).")
+    parser.add_argument('--output', default='./data/light_curve_features.csv', help="Tabla de features por objetivo (CSV).")
+    parser.add_argument('--manifest', default=None, help="Manifiesto JSONL para reanudar (por defecto junto a la salida).")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos del pool (por defecto, todos los núcleos).")
+    parser.add_argument('--window-days', type=float, default=1.0, help="Ventana de la mediana móvil del detrending.")
+    args = parser.parse_args()
+
+    setup_logger()
+    IngestLightCurvesUseCase(args.input_dir, args.output, manifest_path=args.manifest,
+                             max_workers=args.workers, window_days=args.window_days).run()
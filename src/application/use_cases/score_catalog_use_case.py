@@ -0,0 +1,346 @@
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.application.services.exoplanet_service import ExoplanetService
+from src.domain.pipeline_modules.data_cleaner import DataCleaner
+from src.domain.pipeline_modules.mission_schema import MISSION_COLUMN, MISSION_SCHEMAS
+from src.domain.repositories.ml_repository import MLRepository
+from src.infrastructure.adapters.ml_adapter import LEGACY_MODEL_VERSION, RandomForestAdapter
+from src.infrastructure.monitoring.logger import setup_logger
+
+try:  # pyarrow es opcional en el proyecto, pero la salida Parquet lo necesita
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+
+# Logger del módulo (los handlers los configura setup_logger al ejecutar el script)
+logger = logging.getLogger(__name__)
+
+# Columnas crudas que no están en el esquema canónico pero necesita la regla de habitabilidad
+# ({columna KOI: columnas de origen por misión, en orden de preferencia})
+HABITABILITY_SOURCES = {'koi_teq': ('koi_teq', 'pl_eqt')}
+
+# Archivos de la salida: una partición Parquet por shard y el manifiesto de shards terminados
+# (prefijos '_' y '.' para que los lectores de datasets Parquet los ignoren)
+PART_TEMPLATE = 'part-{shard:05d}.parquet'
+PART_PATTERN = re.compile(r'part-(\d+)\.parquet')  # 5 dígitos mínimo; más a partir del shard 100000
+MANIFEST_FILENAME = '_manifest.jsonl'
+
+# Servicio del worker: se construye una vez por proceso en el initializer del pool
+_WORKER_SERVICE: Optional[ExoplanetService] = None
+
+
+def load_adapter(model_version: str) -> MLRepository:
+    """Adaptador con la versión fijada por el proceso principal (misma versión en todos los workers)."""
+    adapter = RandomForestAdapter()
+    adapter.reload(None if model_version == LEGACY_MODEL_VERSION else model_version)
+    return adapter
+
+
+def _init_worker(repository_factory: Callable[[str], MLRepository], model_version: str) -> None:
+    global _WORKER_SERVICE
+    _WORKER_SERVICE = ExoplanetService(repository_factory(model_version))
+
+
+def _read_shard(task: dict) -> pd.DataFrame:
+
+    """
+    Filas [start, start + rows) del catálogo. En CSV se salta directamente al offset en bytes
+    calculado al planificar (sin volver a recorrer las filas anteriores); en Parquet se leen
+    solo los row groups que cubren el rango.
+    """
+    if task['format'] == 'parquet':
+        parquet_file = pq.ParquetFile(task['data_path'])
+        columns = [c for c in parquet_file.schema_arrow.names if c.strip().lower() in task['columns']]
+        first_row, groups = 0, []
+        for group in range(parquet_file.num_row_groups):
+            group_rows = parquet_file.metadata.row_group(group).num_rows
+            if first_row + group_rows > task['start'] and first_row < task['start'] + task['rows']:
+                groups.append(group)
+            elif not groups:
+                first_row += group_rows
+        table = parquet_file.read_row_groups(groups, columns=columns)
+        frame = table.slice(task['start'] - first_row, task['rows']).to_pandas()
+    else:
+        with open(task['data_path'], 'rb') as f:
+            f.seek(task['offset'])
+            frame = pd.read_csv(f, header=None, names=task['header'], nrows=task['rows'],
+                                usecols=lambda name: name.strip().lower() in task['columns'])
+    frame.columns = frame.columns.str.strip().str.lower()
+    return frame.reset_index(drop=True)
+
+
+def _score_shard(task: dict) -> dict:
+
+    """
+    Worker: lee su rango de filas, lo traduce al esquema canónico, rechaza los candidatos
+    fuera de los filtros científicos y puntúa el resto en una sola pasada vectorizada
+    (predicción, confianza y habitabilidad). Escribe su partición de forma atómica.
+    """
+    start = time.perf_counter()
+    service = _WORKER_SERVICE
+    try:
+        raw = _read_shard(task)
+        frame = DataCleaner.canonicalize(raw, [MISSION_SCHEMAS[name] for name in task['missions']])
+        columns = {col: frame[col].to_numpy(dtype=np.float64) for col in frame.columns
+                   if col not in ('koi_disposition', MISSION_COLUMN)}
+        for target, sources in HABITABILITY_SOURCES.items():
+            source = next((col for col in sources if col in raw.columns), None)
+            columns[target] = (raw[source].to_numpy(dtype=np.float64) if source is not None
+                               else np.full(len(raw), np.nan))
+
+        n_rows = len(raw)
+        # En un catálogo mixto cada fila se filtra con los criterios que publica su misión
+        screened = columns if MISSION_COLUMN not in frame.columns else {**columns, MISSION_COLUMN: frame[MISSION_COLUMN].to_numpy()}
+        accepted, rejections = service.screen_candidates(screened)
+        predictions = np.zeros(n_rows, dtype=np.int8)
+        confidences = np.full(n_rows, np.nan)
+        habitable = np.zeros(n_rows, dtype=bool)
+        model_name = task['model_version']
+
+        if accepted.any():
+            subset = {name: values[accepted] for name, values in columns.items()}
+            result = service.classify_and_evaluate_batch(service.transformer.transform(subset), subset)
+            predictions[accepted] = result['predictions']
+            confidences[accepted] = result['confidences']
+            habitable[accepted] = result['is_potentially_habitable']
+            model_name = result['model_name']
+
+        kepid = columns.get('kepid', np.full(n_rows, np.nan))
+        table = pa.table({
+            'row_index': pa.array(np.arange(task['start'], task['start'] + n_rows, dtype=np.int64)),
+            'kepid': pa.array(kepid, mask=np.isnan(kepid)).cast(pa.int64()),
+            'accepted': pa.array(accepted),
+            'prediction': pa.array(predictions, mask=~accepted),
+            'confidence': pa.array(confidences, mask=~accepted),
+            'is_potentially_habitable': pa.array(habitable, mask=~accepted),
+        }).replace_schema_metadata({'model_version': str(model_name), 'source': os.path.basename(task['data_path'])})
+
+        path = os.path.join(task['output_dir'], PART_TEMPLATE.format(shard=task['shard']))
+        tmp_path = os.path.join(task['output_dir'], f".{os.path.basename(path)}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)  # Escritura atómica: una partición existe completa o no existe
+
+        status, error = 'ok', None
+        summary = {'rows': n_rows, 'accepted': int(accepted.sum()), 'habitable': int(habitable.sum()),
+                   'rejections': rejections, 'model_version': model_name}
+    except Exception as e:
+        status, error = 'error', f"{type(e).__name__}: {e}"
+        summary = {'rows': task['rows']}
+
+    return {'shard': task['shard'], 'run': task['run'], 'status': status, 'error': error,
+            'seconds': round(time.perf_counter() - start, 3), **summary}
+
+
+class ScoreCatalogUseCase:
+    """
+    Caso de Uso: Puntuación offline de un catálogo completo (CSV del NASA Exoplanet Archive o
+    Parquet; Kepler, TESS, K2 o mixto). El catálogo se divide en shards de `shard_size` filas
+    que un pool de procesos puntúa en paralelo; cada worker carga el modelo una sola vez y
+    escribe una partición Parquet (part-NNNNN.parquet) con predicción, confianza y
+    habitabilidad. Es reanudable: cada shard terminado se anota en _manifest.jsonl y en la
+    siguiente ejecución se omite si el catálogo, la versión del modelo y el tamaño de shard
+    no cambiaron.
+    """
+
+    def __init__(self, data_path: str, output_dir: str, shard_size: int = 100_000,
+                 max_workers: Optional[int] = None, mission: Optional[str] = None,
+                 model_version: Optional[str] = None,
+                 repository_factory: Callable[[str], MLRepository] = load_adapter):
+        if pa is None:
+            raise RuntimeError("La puntuación de catálogos escribe Parquet y requiere pyarrow.")
+        if shard_size < 1:
+            raise ValueError("shard_size debe ser >= 1.")
+        self.data_path = data_path
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+        self.shard_size = shard_size
+        self.max_workers = max_workers
+        self.mission = mission
+        self.model_version = model_version
+        self.repository_factory = repository_factory
+        self.cleaner = DataCleaner(use_cache=False)
+
+    def resolve_model_version(self) -> str:
+        """Versión a usar en todo el run: la pedida, la CURRENT del registro o los artefactos planos."""
+        return self.model_version or RandomForestAdapter().registry.current_version() or LEGACY_MODEL_VERSION
+
+    def plan_shards(self) -> List[dict]:
+
+        """
+        Rangos de filas de cada shard. En CSV se recorre el archivo una vez en binario para
+        guardar el offset en bytes del inicio de cada shard (asume filas de una sola línea,
+        como las del NASA Exoplanet Archive).
+        """
+        if self.data_path.endswith('.parquet'):
+            n_rows = pq.ParquetFile(self.data_path).metadata.num_rows
+            return [{'format': 'parquet', 'start': start, 'rows': min(self.shard_size, n_rows - start)}
+                    for start in range(0, n_rows, self.shard_size)]
+
+        shards, row = [], 0
+        with open(self.data_path, 'rb') as f:
+            header_found = False
+            offset = f.tell()
+            for line in iter(f.readline, b''):
+                next_offset = offset + len(line)
+                if not header_found:
+                    header_found = not line.startswith(b'#')
+                elif line.strip():
+                    if row % self.shard_size == 0:
+                        shards.append({'format': 'csv', 'start': row, 'rows': 0, 'offset': offset})
+                    shards[-1]['rows'] += 1
+                    row += 1
+                offset = next_offset
+        return shards
+
+    def _run_signature(self, model_version: str) -> dict:
+        """Identifica el run: si cambia el catálogo, el modelo o el troceado, no se reanuda."""
+        stat = os.stat(self.data_path)
+        return {'input': [os.path.abspath(self.data_path), stat.st_size, int(stat.st_mtime)],
+                'model_version': model_version, 'shard_size': self.shard_size, 'mission': self.mission}
+
+    def _load_manifest(self, signature: dict) -> Dict[int, dict]:
+
+        """
+        Shards terminados del mismo run (última entrada por shard; una línea truncada se ignora).
+        Si el manifiesto es de otro run, la salida anterior se descarta y se empieza de cero.
+        """
+        entries, foreign = {}, False
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get('run') == signature:
+                        entries[entry['shard']] = entry
+                    else:
+                        foreign = True
+        if foreign:
+            logger.warning(f"La salida de {self.output_dir} es de otro run (catálogo, modelo o shard_size distintos). "
+                           f"Se reinicia la puntuación.")
+            self._remove_partitions(keep=0)
+            os.remove(self.manifest_path)
+            entries = {}
+        return entries
+
+    def _remove_partitions(self, keep: int) -> None:
+        """Elimina las particiones con índice >= keep (restos de un run anterior)."""
+        for path in glob.glob(os.path.join(self.output_dir, 'part-*.parquet')):
+            match = PART_PATTERN.fullmatch(os.path.basename(path))
+            if match and int(match.group(1)) >= keep:
+                os.remove(path)
+
+    def run(self) -> dict:
+        logger.info(f"--- Puntuación del catálogo: {self.data_path} ---")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        archive_columns = self.cleaner.archive_columns(self.data_path)
+        schemas = self.cleaner.resolve_schemas(archive_columns, self.mission)
+        wanted = set(self.cleaner.source_columns(schemas))
+        for sources in HABITABILITY_SOURCES.values():
+            wanted.update(sources)
+
+        model_version = self.resolve_model_version()
+        signature = self._run_signature(model_version)
+        manifest = self._load_manifest(signature)
+        shards = self.plan_shards()
+        self._remove_partitions(keep=len(shards))
+
+        header = None if self.data_path.endswith('.parquet') else self._csv_header()
+        tasks = []
+        for shard_id, shard in enumerate(shards):
+            done = manifest.get(shard_id)
+            part_path = os.path.join(self.output_dir, PART_TEMPLATE.format(shard=shard_id))
+            if done and done['status'] == 'ok' and os.path.exists(part_path):
+                continue
+            tasks.append({**shard, 'shard': shard_id, 'data_path': self.data_path, 'header': header,
+                          'columns': wanted, 'missions': [schema.name for schema in schemas],
+                          'output_dir': self.output_dir, 'model_version': model_version, 'run': signature})
+
+        n_rows = sum(shard['rows'] for shard in shards)
+        logger.info(f"🧩 Filas: {n_rows:,} | shards: {len(shards)} de {self.shard_size:,} filas | "
+                    f"ya puntuados: {len(shards) - len(tasks)} | pendientes: {len(tasks)} | modelo: {model_version}")
+
+        start = time.perf_counter()
+        with open(self.manifest_path, 'a') as manifest_file:
+            for entry in self._execute(tasks, model_version):
+                # Una línea por shard terminado y flush inmediato: un corte no pierde lo ya hecho
+                manifest_file.write(json.dumps(entry) + '\n')
+                manifest_file.flush()
+                manifest[entry['shard']] = entry
+                if entry['status'] != 'ok':
+                    logger.warning(f"Shard {entry['shard']} con error: {entry['error']}")
+                else:
+                    logger.info(f"   Shard {entry['shard']}: {entry['rows']:,} filas en {entry['seconds']:.2f}s "
+                                f"({entry['accepted']:,} aceptadas, {entry['habitable']:,} potencialmente habitables)")
+
+        scored = [manifest[i] for i in range(len(shards)) if manifest.get(i, {}).get('status') == 'ok']
+        summary = {
+            "rows": n_rows,
+            "shards": len(shards),
+            "scored_shards": len(scored),
+            "failed_shards": sorted(i for i in range(len(shards)) if manifest.get(i, {}).get('status') == 'error'),
+            "accepted": sum(entry['accepted'] for entry in scored),
+            "habitable": sum(entry['habitable'] for entry in scored),
+            "model_version": model_version,
+            "output_dir": self.output_dir,
+            "wall_clock_seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info(f"✅ Puntuación completada en {summary['wall_clock_seconds']:.1f}s. Shards: "
+                    f"{summary['scored_shards']}/{summary['shards']}, aceptadas: {summary['accepted']:,}, "
+                    f"habitables: {summary['habitable']:,}. Salida: {self.output_dir}")
+        return summary
+
+    def _csv_header(self) -> List[str]:
+        """Nombres de la cabecera CSV tal cual (tras los comentarios '#')."""
+        with open(self.data_path, 'r') as f:
+            for line in f:
+                if not line.startswith('#'):
+                    return next(csv.reader([line]))
+        return []
+
+    def _execute(self, tasks: List[dict], model_version: str):
+        if not tasks:
+            return
+        if self.max_workers == 1:
+            _init_worker(self.repository_factory, model_version)
+            for task in tasks:
+                yield _score_shard(task)
+            return
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(self.repository_factory, model_version)) as pool:
+            futures = [pool.submit(_score_shard, task) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+# --- Ejecución del Caso de Uso ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Puntuación offline de un catálogo (CSV/Parquet) en shards paralelos.")
+    parser.add_argument('data_path', help="Catálogo a puntuar, p. ej. data/kepler_koi.csv o data/tess_toi.csv.")
+    parser.add_argument('--output', default=None, help="Directorio de la salida Parquet particionada "
+                                                       "(por defecto ./data/scores/<nombre del catálogo>).")
+    parser.add_argument('--shard-size', type=int, default=100_000, help="Filas por shard (y por partición Parquet).")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos del pool (por defecto, todos los núcleos).")
+    parser.add_argument('--mission', default=None, help="Forzar el esquema de misión (kepler, tess, k2).")
+    parser.add_argument('--model-version', default=None, help="Versión del registro (por defecto, CURRENT).")
+    args = parser.parse_args()
+
+    setup_logger()
+    output_dir = args.output or os.path.join('./data/scores', os.path.splitext(os.path.basename(args.data_path))[0])
+    ScoreCatalogUseCase(args.data_path, output_dir, shard_size=args.shard_size, max_workers=args.workers,
+                        mission=args.mission, model_version=args.model_version).run()
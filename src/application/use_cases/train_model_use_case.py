@@ -1,41 +1,201 @@
 import pandas as pd
 import numpy as np
+import argparse
 import logging
 import os
+import tempfile
+import time
 import joblib
 import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import ParameterGrid
 from src.domain.services.exoplanet_pipeline import ExoplanetPreprocessor as DataPreprocessor
+from src.domain.pipeline_modules.data_cleaner import DataCleaner
+from src.domain.pipeline_modules.drift_reference import DriftReference
+from src.domain.pipeline_modules.data_finalizer import DataFinalizer
+from src.domain.pipeline_modules.fingerprint_store import FingerprintStore
+from src.domain.pipeline_modules.inference_transformer import InferenceTransformer
+from src.infrastructure.adapters.compiled_ensemble import compile_voting_classifier
+from src.infrastructure.monitoring.logger import setup_logger
+from src.infrastructure.adapters.model_registry import (
+    ModelRegistry, MODEL_FILENAME, COMPILED_MODEL_FILENAME, METRICS_FILENAME,
+    IMPORTANCE_FILENAME, FEATURE_NAMES_FILENAME, PREPROCESSOR_FILENAME, DRIFT_REFERENCE_FILENAME,
+    FEATURE_STORE_FILENAME
+)
 
-# Configuración del logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(name)s | %(levelname)s | %(message)s')
+# Logger del módulo (los handlers los configura setup_logger al ejecutar el script)
 logger = logging.getLogger(__name__)
 
-# Ubicaciones para guardar los artefactos
+# Ubicaciones para guardar los artefactos (cada entrenamiento es una versión del registro;
+# los JSON planos de models/ reflejan el último entrenamiento para el dashboard)
 MODELS_DIR = './models'
-MODEL_PATH = os.path.join(MODELS_DIR, 'ensemble_v3_final.pkl')
+REGISTRY_DIR = os.path.join(MODELS_DIR, 'registry')
 METRICS_PATH = os.path.join(MODELS_DIR, 'latest_metrics.json')
 IMPORTANCE_PATH = os.path.join(MODELS_DIR, 'feature_importance.json')
 FEATURE_NAMES_PATH = os.path.join(MODELS_DIR, 'feature_names.json')
+PREPROCESSOR_PATH = os.path.join(MODELS_DIR, 'preprocessor.json')
+DRIFT_REFERENCE_PATH = os.path.join(MODELS_DIR, 'drift_reference.json')
+
+# Reentrenamiento incremental: por encima de estos umbrales se entrena desde cero
+MAX_DELTA_FRACTION = 0.25   # (filas nuevas/modificadas + eliminadas) / filas del almacén
+MAX_MEDIAN_SHIFT = 0.25     # desplazamiento de la mediana de una feature, en IQR del transformador congelado
+MAX_FOREST_SIZE = 400       # árboles acumulados con warm_start
+MIN_TREES_PER_UPDATE = 10
+
+# Directorio en RAM para compartir la matriz con los workers de validación cruzada
+SHARED_MEMORY_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def build_ensemble(params: dict = None, n_jobs: int = None, weighted: bool = False) -> VotingClassifier:
+
+    """
+    Ensemble RF + LR con la configuración base del proyecto; `params` usa la notación de
+    sklearn para VotingClassifier ('rf__n_estimators', 'lr__C', ...). Con weighted=True el
+    balanceo llega como sample_weight y se desactiva class_weight para no aplicarlo dos veces.
+    """
+    class_weight = None if weighted else 'balanced'
+    rf = RandomForestClassifier(n_estimators=100, random_state=42, class_weight=class_weight, n_jobs=n_jobs)
+    lr = LogisticRegression(random_state=42, class_weight=class_weight)
+    ensemble = VotingClassifier(estimators=[('rf', rf), ('lr', lr)], voting='soft')
+    return ensemble.set_params(**(params or {}))
+
+
+def _evaluate_fold(task: dict) -> dict:
+
+    """
+    Worker de validación cruzada: entrena una configuración sobre un fold. La matriz se abre
+    como memmap desde el archivo compartido (no viaja serializada al worker).
+    """
+    X = np.load(task['X_path'], mmap_mode='r')
+    y = np.load(task['y_path'], mmap_mode='r')
+    train_index, test_index = task['train_index'], task['test_index']
+    weights = np.load(task['w_path'], mmap_mode='r')[train_index] if task['w_path'] else None
+
+    start = time.perf_counter()
+    # Un núcleo por worker: el paralelismo lo da el pool de procesos
+    model = build_ensemble(task['params'], n_jobs=1, weighted=weights is not None)
+    model.fit(X[train_index], y[train_index], sample_weight=weights)
+    y_pred = model.predict(X[test_index])
+    y_test = y[test_index]
+
+    return {
+        "config": task['config'],
+        "fold": task['fold'],
+        "accuracy": round(accuracy_score(y_test, y_pred), 4),
+        "f1_score": round(f1_score(y_test, y_pred), 4),
+        "train_size": len(train_index),
+        "test_size": len(test_index),
+        "wall_clock_seconds": round(time.perf_counter() - start, 3),
+    }
 
 
 class TrainModelUseCase:
     """
     Caso de Uso: Entrenamiento de un Ensemble Híbrido con Validación Temporal.
-    Guarda el modelo, métricas, importancia de features y nombres de features.
+    Guarda el modelo, métricas, importancia de features, nombres de features
+    el transformador de inferencia (si se proporciona), la referencia de drift y el almacén
+    de huellas por fila como una versión del registro. train_incremental() parte de la versión
+    publicada y solo procesa el delta del nuevo volcado del archivo.
     """
-    def __init__(self):
+    def __init__(self, registry: ModelRegistry = None):
+        self.registry = registry or ModelRegistry(REGISTRY_DIR)
+        self.version = None
         self.model = None
         self.metrics = {}
         self.feature_names = []
+        self.transformer = None
+        self.drift_reference = None
+        self.fingerprint_store = None
         os.makedirs(MODELS_DIR, exist_ok=True)
 
-    def train_and_evaluate(self, X: np.ndarray, y: np.ndarray, temporal_splits, feature_names: list):
+    def cross_validate(self, X: np.ndarray, y: np.ndarray, temporal_splits, param_grid: dict = None,
+                       max_workers: int = None, sample_weight: np.ndarray = None) -> dict:
+
+        """
+        Evalúa cada configuración de `param_grid` en TODOS los folds temporales, repartiendo
+        las combinaciones (configuración, fold) en un pool de procesos. X e y se escriben una
+        vez en un .npy (en /dev/shm si existe) que los workers abren como memmap.
+        max_workers=1 ejecuta en el proceso actual. Retorna métricas por fold y la mejor
+        configuración (mayor F1 medio).
+        """
+        configs = list(ParameterGrid(param_grid or {}))
+        logger.info(f"🔀 Validación cruzada temporal: {len(configs)} configuraciones x {len(temporal_splits)} folds")
+
+        search_start = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix='exoai-cv-', dir=SHARED_MEMORY_DIR) as shared_dir:
+            X_path, y_path = os.path.join(shared_dir, 'X.npy'), os.path.join(shared_dir, 'y.npy')
+            np.save(X_path, np.ascontiguousarray(X))
+            np.save(y_path, np.ascontiguousarray(y))
+            w_path = None
+            if sample_weight is not None:
+                w_path = os.path.join(shared_dir, 'w.npy')
+                np.save(w_path, np.ascontiguousarray(sample_weight, dtype=np.float64))
+
+            tasks = [
+                {"config": config_id, "params": params, "fold": fold_id, "X_path": X_path, "y_path": y_path,
+                 "w_path": w_path, "train_index": train_index, "test_index": test_index}
+                for config_id, params in enumerate(configs)
+                for fold_id, (train_index, test_index) in enumerate(temporal_splits, start=1)
+            ]
+            if max_workers == 1:
+                fold_results = [_evaluate_fold(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    fold_results = list(pool.map(_evaluate_fold, tasks))
+
+        results = []
+        for config_id, params in enumerate(configs):
+            folds = [{k: v for k, v in r.items() if k != 'config'} for r in fold_results if r['config'] == config_id]
+            results.append({
+                "params": params,
+                "folds": folds,
+                "mean_accuracy": round(float(np.mean([f['accuracy'] for f in folds])), 4),
+                "mean_f1_score": round(float(np.mean([f['f1_score'] for f in folds])), 4),
+                # Tiempo de pared sumado de sus folds (lo que costaría entrenarla en serie)
+                "wall_clock_seconds": round(sum(f['wall_clock_seconds'] for f in folds), 3),
+            })
+            logger.info(f"   Config {params}: F1 medio={results[-1]['mean_f1_score']:.4f}, "
+                        f"Accuracy media={results[-1]['mean_accuracy']:.4f} ({results[-1]['wall_clock_seconds']:.1f}s)")
+
+        best = max(results, key=lambda r: r['mean_f1_score'])
+        search_seconds = time.perf_counter() - search_start
+        logger.info(f"🏆 Mejor configuración: {best['params']} (búsqueda completa en {search_seconds:.1f}s)")
+
+        return {
+            "n_folds": len(temporal_splits),
+            "configurations": results,
+            "best_params": best['params'],
+            "search_wall_clock_seconds": round(search_seconds, 3),
+        }
+
+    def train_and_evaluate(self, X: np.ndarray, y: np.ndarray, temporal_splits, feature_names: list, transformer=None,
+                           cross_validation: bool = False, param_grid: dict = None, max_workers: int = None,
+                           sample_weight: np.ndarray = None, pipeline_profile: list = None,
+                           fingerprint_store: FingerprintStore = None):
+        """
+        Entrena el Ensemble final sobre el último fold temporal. Con cross_validation=True
+        primero evalúa `param_grid` en todos los folds (en paralelo) y entrena con la mejor
+        configuración; el detalle por fold y por configuración va a latest_metrics.json.
+        `sample_weight` (balanceo por pesos del preprocesador) sustituye a class_weight.
+        `pipeline_profile` (tiempos/memoria por paso del preprocesador) se guarda con las métricas.
+        `fingerprint_store` (ExoplanetPreprocessor.fingerprint_store) habilita el siguiente
+        reentrenamiento incremental.
+        """
         logger.info("--- Iniciando Entrenamiento de ENSEMBLE HÍBRIDO ---")
         self.feature_names = feature_names
+        self.transformer = transformer
+        self.fingerprint_store = fingerprint_store
+
+        cv_report, best_params = None, {}
+        if cross_validation:
+            cv_report = self.cross_validate(X, y, temporal_splits, param_grid=param_grid, max_workers=max_workers,
+                                            sample_weight=sample_weight)
+            best_params = cv_report['best_params']
 
         train_index, test_index = temporal_splits[-1]
         X_train, X_test = X[train_index], X[test_index]
@@ -43,14 +203,18 @@ class TrainModelUseCase:
 
         logger.info(f"Datos divididos con VALIDACIÓN TEMPORAL (Split 5/5): Train={len(X_train)}, Test={len(X_test)}")
         
-        rf = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
-        lr = LogisticRegression(random_state=42, class_weight='balanced')
-
-        ensemble = VotingClassifier(estimators=[('rf', rf), ('lr', lr)], voting='soft')
+        # Todos los núcleos para el entrenamiento final (el resultado no depende de n_jobs)
+        ensemble = build_ensemble(best_params, n_jobs=-1, weighted=sample_weight is not None)
         
         logger.info("Entrenando ENSEMBLE (RF + LR)...")
-        ensemble.fit(X_train, y_train)
+        ensemble.fit(X_train, y_train, sample_weight=None if sample_weight is None else sample_weight[train_index])
+        # Inferencia en un solo hilo: los lotes de la API son pequeños
+        ensemble.named_estimators_['rf'].n_jobs = None
         self.model = ensemble
+
+        # Distribución de referencia de las features (monitor de drift en serving)
+        bounds = transformer.scaled_bounds(DataCleaner.ASTRO_FILTERS) if transformer is not None else None
+        self.drift_reference = DriftReference.from_matrix(X_train, feature_names, bounds=bounds)
         
         y_pred = ensemble.predict(X_test)
         accuracy = accuracy_score(y_test, y_pred)
@@ -63,6 +227,10 @@ class TrainModelUseCase:
             "train_size": len(X_train),
             "test_size": len(X_test),
         }
+        if cv_report is not None:
+            self.metrics["cross_validation"] = cv_report
+        if pipeline_profile:
+            self.metrics["pipeline_profile"] = pipeline_profile
         
         logger.info(f"ENTRENAMIENTO FINALIZADO. Métricas ENSEMBLE: Accuracy={self.metrics['accuracy']:.4f}, F1-Score={self.metrics['f1_score']:.4f}")
         
@@ -70,51 +238,247 @@ class TrainModelUseCase:
         
         return self.metrics
 
+    def _load_base_version(self) -> Optional[dict]:
+
+        """Modelo sklearn, transformador y almacén de huellas de la versión publicada (None si falta alguno)."""
+        version = self.registry.current_version()
+        if version is None:
+            return None
+        paths = {name: self.registry.artifact_path(version, filename) for name, filename in (
+            ('model', MODEL_FILENAME), ('transformer', PREPROCESSOR_FILENAME),
+            ('store', FEATURE_STORE_FILENAME), ('metrics', METRICS_FILENAME))}
+        missing = [name for name, path in paths.items() if not os.path.exists(path)]
+        if missing:
+            logger.info(f"La versión {version} no tiene {', '.join(missing)}: no admite reentrenamiento incremental.")
+            return None
+        with open(paths['metrics'], 'r') as f:
+            metrics = json.load(f)
+        return {
+            "version": version,
+            "model": joblib.load(paths['model'])['model'],
+            "transformer": InferenceTransformer.load(paths['transformer']),
+            "store": FingerprintStore.load(paths['store']),
+            "metrics": metrics,
+        }
+
+    def train_incremental(self, preprocessor: DataPreprocessor, max_delta_fraction: float = MAX_DELTA_FRACTION,
+                          max_median_shift: float = MAX_MEDIAN_SHIFT) -> Optional[dict]:
+
+        """
+        Reentrenamiento incremental a partir de la versión publicada:
+        1. El preprocesador compara el volcado con el almacén de huellas y transforma solo las
+           filas nuevas o modificadas, con el transformador congelado de la versión base.
+        2. Evaluación precuencial: el modelo base se mide sobre esas filas antes de verlas.
+        3. El RandomForest añade árboles con warm_start (en proporción al delta) entrenados con
+           el delta y una muestra igual de filas conservadas; la LR se reajusta sobre el almacén
+           completo partiendo de sus coeficientes.
+        Retorna None (el llamador debe entrenar desde cero) si no hay versión base con almacén,
+        si el delta o el desplazamiento de las medianas superan los umbrales, o si el bosque
+        superaría MAX_FOREST_SIZE árboles. Las filas eliminadas o modificadas no se "desaprenden":
+        por eso cuentan en el delta.
+        """
+        start = time.perf_counter()
+        base = self._load_base_version()
+        if base is None:
+            return None
+        store, transformer, model = base['store'], base['transformer'], base['model']
+        if store.feature_names != transformer.feature_names:
+            logger.info("El almacén de huellas no corresponde al transformador de la versión base.")
+            return None
+
+        logger.info(f"--- Reentrenamiento INCREMENTAL sobre la versión {base['version']} ---")
+        updated_store, diff, X_delta, y_delta = preprocessor.transform_incremental(store, transformer)
+        if diff.is_empty:
+            logger.info("✅ El volcado no tiene filas nuevas, modificadas ni eliminadas: se mantiene la versión publicada.")
+            self.version, self.metrics = base['version'], base['metrics']
+            return self.metrics
+
+        rf, lr = model.named_estimators_['rf'], model.named_estimators_['lr']
+        delta_fraction = (diff.n_inserted + diff.deleted) / max(len(store), 1)
+        median_shift = updated_store.median_shift()
+        n_new_trees = max(MIN_TREES_PER_UPDATE, int(np.ceil(len(rf.estimators_) * delta_fraction)))
+        if delta_fraction > max_delta_fraction or median_shift > max_median_shift \
+                or len(rf.estimators_) + n_new_trees > MAX_FOREST_SIZE:
+            logger.info(f"Delta {delta_fraction:.1%} (máx. {max_delta_fraction:.0%}), desplazamiento de medianas "
+                        f"{median_shift:.3f} IQR (máx. {max_median_shift}), árboles {len(rf.estimators_)}+{n_new_trees} "
+                        f"(máx. {MAX_FOREST_SIZE}): se requiere un entrenamiento completo.")
+            return None
+
+        # Evaluación precuencial: filas que el modelo base nunca vio
+        evaluation = "carried_over"
+        accuracy, f1 = base['metrics'].get('accuracy'), base['metrics'].get('f1_score')
+        if len(X_delta):
+            y_pred = model.predict(X_delta)
+            accuracy, f1 = round(accuracy_score(y_delta, y_pred), 4), round(f1_score(y_delta, y_pred, zero_division=0), 4)
+            evaluation = "prequential_delta"
+
+        # Árboles nuevos: delta + una muestra igual de filas conservadas (no solo datos recientes)
+        n_kept = len(diff.kept)
+        replay = np.random.RandomState(42).choice(n_kept, size=min(n_kept, max(len(X_delta), 1)), replace=False)
+        X_fit = np.vstack([X_delta, updated_store.features[replay]])
+        y_fit = np.concatenate([y_delta, updated_store.target[replay]])
+        if len(np.unique(y_fit)) < 2:
+            logger.info("El delta y la muestra de repaso no contienen ambas clases: se requiere un entrenamiento completo.")
+            return None
+
+        # Balanceo con las frecuencias de clase del almacén completo (no solo de la muestra del
+        # warm_start): los árboles nuevos reciben pesos por fila en lugar de class_weight='balanced'
+        classes, counts = np.unique(updated_store.target, return_counts=True)
+        class_weights = counts.max() / counts
+        weighted = rf.class_weight is None  # Base entrenada en modo por pesos (balanceo vía sample_weight)
+        base_class_weight = rf.class_weight
+        fit_start = time.perf_counter()
+        rf.set_params(warm_start=True, class_weight=None, n_estimators=len(rf.estimators_) + n_new_trees, n_jobs=-1)
+        rf.fit(X_fit, y_fit, sample_weight=class_weights[np.searchsorted(classes, y_fit)])
+        rf.set_params(warm_start=False, class_weight=base_class_weight, n_jobs=None)
+        lr.set_params(warm_start=True)
+        lr.fit(updated_store.features, updated_store.target,
+               sample_weight=DataFinalizer().balance_weights(updated_store.target) if weighted else None)
+        lr.set_params(warm_start=False)
+        fit_seconds = time.perf_counter() - fit_start
+
+        self.model = model
+        self.feature_names = list(transformer.feature_names)
+        self.transformer = transformer
+        self.fingerprint_store = updated_store
+        bounds = transformer.scaled_bounds(DataCleaner.ASTRO_FILTERS)
+        self.drift_reference = DriftReference.from_matrix(updated_store.features, self.feature_names, bounds=bounds)
+
+        self.metrics = {
+            "model_name": "Ensemble_v3_Final",
+            "accuracy": accuracy,
+            "f1_score": f1,
+            "train_size": len(updated_store),
+            "test_size": len(X_delta),
+            "incremental": {
+                "base_version": base['version'],
+                "evaluation": evaluation,
+                "inserted_rows": diff.n_inserted,
+                "changed_kepids": diff.changed_kepids,
+                "deleted_rows": diff.deleted,
+                "unchanged_rows": n_kept,
+                "delta_fraction": round(delta_fraction, 4),
+                "median_shift_iqr": round(median_shift, 4),
+                "trees_added": n_new_trees,
+                "n_estimators": len(rf.estimators_),
+                "fit_seconds": round(fit_seconds, 3),
+                "wall_clock_seconds": round(time.perf_counter() - start, 3),
+            },
+            "pipeline_profile": preprocessor.stage_profile,
+        }
+        logger.info(f"REENTRENAMIENTO INCREMENTAL FINALIZADO en {self.metrics['incremental']['wall_clock_seconds']:.1f}s. "
+                    f"+{n_new_trees} árboles ({len(rf.estimators_)} en total). Métricas precuenciales sobre el delta: "
+                    f"Accuracy={accuracy}, F1-Score={f1}")
+
+        self._save_artifacts()
+        return self.metrics
+
     def _save_artifacts(self):
-        """Guarda el modelo DENTRO de un diccionario, junto con otros metadatos."""
+        """
+        Guarda el modelo DENTRO de un diccionario, junto con otros metadatos, en una versión
+        nueva del registro. La versión se publica (CURRENT) solo cuando todo está escrito.
+        Los JSON pequeños se copian también a models/ para el dashboard.
+        """
         if self.model is not None:
-            # --- INICIO DE LA CORRECCIÓN CLAVE ---
-            # Ahora guardamos un diccionario, no solo el modelo.
+            self.version = self.registry.create_version()
+            self.metrics["model_version"] = self.version
+
+            def version_path(filename):
+                return self.registry.artifact_path(self.version, filename)
+
             model_data_to_save = {
                 'model': self.model,
-                'feature_names': self.feature_names
+                'feature_names': self.feature_names,
+                'version': self.version,
             }
-            joblib.dump(model_data_to_save, MODEL_PATH)
-            # --- FIN DE LA CORRECCIÓN CLAVE ---
-            
-            logger.info(f"💾 Modelo y metadatos guardados exitosamente en: {MODEL_PATH}")
+            joblib.dump(model_data_to_save, version_path(MODEL_FILENAME))
+            logger.info(f"💾 Modelo y metadatos guardados exitosamente en: {version_path(MODEL_FILENAME)}")
+
+            # Versión compilada (arrays planos) para servir sin sklearn.
+            # Sin compresión: la API la abre con mmap_mode='r' (sin copiar los arrays a memoria)
+            joblib.dump(compile_voting_classifier(self.model), version_path(COMPILED_MODEL_FILENAME), compress=0)
+            logger.info(f"⚡ Modelo compilado (NumPy) guardado en: {version_path(COMPILED_MODEL_FILENAME)}")
 
-            with open(METRICS_PATH, 'w') as f:
-                json.dump(self.metrics, f, indent=4)
-            logger.info(f"📄 Métricas guardadas en: {METRICS_PATH}")
+            self._write_json(self.metrics, version_path(METRICS_FILENAME), METRICS_PATH)
+            logger.info(f"📄 Métricas guardadas en: {version_path(METRICS_FILENAME)}")
 
             rf_model = self.model.named_estimators_['rf']
             importances = rf_model.feature_importances_
             importance_dict = dict(zip(self.feature_names, importances.tolist()))
-            with open(IMPORTANCE_PATH, 'w') as f:
-                json.dump(importance_dict, f, indent=4)
-            logger.info(f"📊 Importancia de características guardada en: {IMPORTANCE_PATH}")
+            self._write_json(importance_dict, version_path(IMPORTANCE_FILENAME), IMPORTANCE_PATH)
+            logger.info(f"📊 Importancia de características guardada en: {version_path(IMPORTANCE_FILENAME)}")
             
             # Guardamos los nombres de features en su propio JSON para el frontend
-            with open(FEATURE_NAMES_PATH, 'w') as f:
-                json.dump({"feature_names": self.feature_names}, f, indent=4)
-            logger.info(f"📝 Nombres de características guardados en: {FEATURE_NAMES_PATH}")
+            self._write_json({"feature_names": self.feature_names}, version_path(FEATURE_NAMES_FILENAME), FEATURE_NAMES_PATH)
+            logger.info(f"📝 Nombres de características guardados en: {version_path(FEATURE_NAMES_FILENAME)}")
+
+            # Transformador de inferencia (medianas, constantes estadísticas y scaler)
+            if self.transformer is not None:
+                self.transformer.save(version_path(PREPROCESSOR_FILENAME))
+                self.transformer.save(PREPROCESSOR_PATH)
+
+            if self.drift_reference is not None:
+                self.drift_reference.save(version_path(DRIFT_REFERENCE_FILENAME))
+                self.drift_reference.save(DRIFT_REFERENCE_PATH)
+
+            # Huellas por fila + features: base del siguiente reentrenamiento incremental
+            if self.fingerprint_store is not None:
+                self.fingerprint_store.save(version_path(FEATURE_STORE_FILENAME))
+
+            self.registry.write_manifest(self.version, {"metrics": self.metrics})
+            self.registry.publish(self.version)
             
         else:
             logger.warning("No hay modelo entrenado para guardar.")
 
+    @staticmethod
+    def _write_json(payload, *paths):
+        for path in paths:
+            with open(path, 'w') as f:
+                json.dump(payload, f, indent=4)
+
 
 # --- Ejecución del Caso de Uso ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entrenamiento del Ensemble V3 con validación temporal.")
+    parser.add_argument('--cv', action='store_true', help="Evaluar todos los folds temporales (y la grilla) antes del entrenamiento final.")
+    parser.add_argument('--param-grid', help="JSON con la grilla de hiperparámetros, p. ej. '{\"rf__n_estimators\": [100, 200]}'.")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos para la validación cruzada (por defecto, todos los núcleos).")
+    parser.add_argument('--balance', choices=['oversample', 'weights'], default='oversample',
+                        help="Balanceo por oversampling (filas duplicadas) o solo por pesos por muestra.")
+    parser.add_argument('--profile-memory', action='store_true', help="Medir el pico de memoria de cada paso del preprocesador (tracemalloc).")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Procesar solo las filas nuevas o modificadas respecto a la versión publicada "
+                             "(si no es posible, se entrena desde cero).")
+    args = parser.parse_args()
+
+    setup_logger()
     logger.info("Iniciando caso de uso de entrenamiento desde __main__...")
     
-    preprocessor = DataPreprocessor(data_path='./data/kepler_koi.csv')
-    X_final_scaled, y_balanced, temporal_splits = preprocessor.fit_transform_complete()
-    
-    feature_names_from_pipeline = preprocessor.feature_names
-    
+    preprocessor = DataPreprocessor(data_path='./data/kepler_koi.csv', balance_mode=args.balance,
+                                    profile_memory=args.profile_memory)
     trainer = TrainModelUseCase()
-    final_metrics = trainer.train_and_evaluate(X_final_scaled, y_balanced, temporal_splits, feature_names_from_pipeline)
+    final_metrics = trainer.train_incremental(preprocessor) if args.incremental else None
+
+    # Estas opciones solo afectan al entrenamiento completo (el respaldo de --incremental)
+    full_training_flags = [flag for flag, given in (('--cv', args.cv), ('--param-grid', args.param_grid),
+                                                    ('--balance', args.balance != 'oversample'),
+                                                    ('--workers', args.workers is not None)) if given]
+    if final_metrics is not None and full_training_flags:
+        logger.warning(f"⚠️ Reentrenamiento incremental aplicado: se ignoran {', '.join(full_training_flags)} "
+                       "(solo se usan al entrenar desde cero).")
+
+    if final_metrics is None:
+        X_final_scaled, y_balanced, temporal_splits = preprocessor.fit_transform_complete()
+
+        feature_names_from_pipeline = preprocessor.feature_names
+
+        final_metrics = trainer.train_and_evaluate(
+            X_final_scaled, y_balanced, temporal_splits, feature_names_from_pipeline, transformer=preprocessor.transformer,
+            cross_validation=args.cv, param_grid=json.loads(args.param_grid) if args.param_grid else None,
+            max_workers=args.workers, sample_weight=preprocessor.sample_weights,
+            pipeline_profile=preprocessor.stage_profile, fingerprint_store=preprocessor.fingerprint_store()
+        )
 
     print("\n--- Resultado del Caso de Uso de Entrenamiento Híbrido Final ---")
-    print(pd.Series(final_metrics))
\ No newline at end of file
+    print(pd.Series({k: v for k, v in final_metrics.items() if k not in ('cross_validation', 'pipeline_profile', 'incremental')}))
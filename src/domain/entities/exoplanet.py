@@ -1,24 +1,109 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+import numpy as np
+from scipy.ndimage import median_filter
+
 class LightCurve:
-    """Entidad o Value Object: Representa los datos de brillo de la estrella."""
-    time: list
-    flux: list
-    error: list
-    
-    def normalize(self):
+    """
+    Entidad o Value Object: Representa los datos de brillo de la estrella.
+    time/flux/error se guardan como arrays float64 contiguos; las operaciones de
+    preprocesamiento son vectorizadas, modifican la curva in-place y retornan self
+    para poder encadenarlas (lc.sigma_clip().detrend()).
+    """
+    __slots__ = ('time', 'flux', 'error')
+
+    def __init__(self, time, flux, error=None):
+        self.time = np.ascontiguousarray(time, dtype=np.float64)
+        self.flux = np.ascontiguousarray(flux, dtype=np.float64)
+        self.error = (np.ones_like(self.flux) if error is None
+                      else np.ascontiguousarray(error, dtype=np.float64))
+        if not (self.time.ndim == 1 and self.time.shape == self.flux.shape == self.error.shape):
+            raise ValueError("time, flux y error deben ser arrays 1D de la misma longitud.")
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __repr__(self) -> str:
+        span = f"{self.time[0]:.3f}-{self.time[-1]:.3f}" if len(self) else "vacía"
+        return f"LightCurve(n={len(self)}, time={span})"
+
+    def normalize(self) -> "LightCurve":
         """Lógica científica de preprocesamiento (ej. detrending o scaling)."""
         # Normalización simple: (flux - mean) / error
-        mean_flux = sum(self.flux) / len(self.flux)
-        self.flux = [(f - mean_flux) / self.error[i] for i, f in enumerate(self.flux)]
-           
+        self.flux = (self.flux - self.flux.mean()) / self.error
+        return self
+
+    def detrend(self, window_length: int = 101) -> "LightCurve":
+
+        """
+        Elimina la variabilidad estelar lenta dividiendo por una mediana móvil de
+        `window_length` puntos (debe ser bastante mayor que la duración del tránsito).
+        El flujo queda relativo (~1 fuera de tránsito) y el error se escala igual.
+        """
+        window_length = max(3, min(int(window_length), len(self)) | 1)
+        trend = median_filter(self.flux, size=window_length, mode='nearest')
+        trend[trend == 0] = np.nan
+        self.flux = self.flux / trend
+        self.error = self.error / np.abs(trend)
+        return self
+
+    def sigma_clip(self, sigma: float = 5.0, sigma_lower: Optional[float] = None, max_iter: int = 5) -> "LightCurve":
+
+        """
+        Descarta puntos no finitos y outliers respecto a la mediana (escala robusta MAD),
+        iterando hasta que no cambie la máscara. Por defecto solo recorta hacia arriba
+        (`sigma`): los tránsitos son caídas de flujo y no deben eliminarse.
+        """
+        keep = np.isfinite(self.time) & np.isfinite(self.flux) & np.isfinite(self.error)
+        for _ in range(max_iter):
+            flux = self.flux[keep]
+            if len(flux) == 0:
+                break
+            median = np.median(flux)
+            scale = 1.4826 * np.median(np.abs(flux - median))
+            if scale == 0:
+                break
+            deviation = (self.flux - median) / scale
+            new_keep = keep & (deviation <= sigma)
+            if sigma_lower is not None:
+                new_keep &= deviation >= -sigma_lower
+            if np.array_equal(new_keep, keep):
+                break
+            keep = new_keep
+
+        self.time, self.flux, self.error = self.time[keep], self.flux[keep], self.error[keep]
+        return self
+
+
+
+# Criterios de habitabilidad: una sola definición para Exoplanet y ExoplanetBatch
+HABITABLE_TEMP_RANGE_K = (250.0, 350.0)
+HABITABLE_RADIUS_RANGE_EARTH = (0.5, 2.0)
+HABITABLE_MIN_CONFIDENCE = 0.90
+
+
+def habitability_rule(equilibrium_temp, radius_earth, confidence_score):
+
+    """
+    Regla de habitabilidad. Solo usa comparaciones y `&`, por lo que acepta tanto escalares
+    como arrays NumPy (en ese caso devuelve una máscara booleana). Un NaN nunca la cumple.
+    """
+    temp_min, temp_max = HABITABLE_TEMP_RANGE_K
+    radius_min, radius_max = HABITABLE_RADIUS_RANGE_EARTH
+    is_in_zone = (temp_min <= equilibrium_temp) & (equilibrium_temp <= temp_max)
+    is_earth_size = (radius_min <= radius_earth) & (radius_earth <= radius_max)
+    is_high_confidence = confidence_score >= HABITABLE_MIN_CONFIDENCE
+    return is_in_zone & is_earth_size & is_high_confidence
+
+
 @dataclass
 class Exoplanet:
     """
     Entidad: Representa un exoplaneta candidato con sus atributos clave.
     """
+    __slots__ = ('kepid', 'period_days', 'radius_earth', 'equilibrium_temp', 'confidence_score')
+
     kepid: str
     period_days: float
     radius_earth: float
@@ -29,15 +114,68 @@ class Exoplanet:
 
         """
         Determina si el exoplaneta es potencialmente habitable basado en criterios científicos.     
-        Criterios (ejemplos):
+        Criterios (ver habitability_rule):
         - Temperatura de equilibrio entre 250K y 350K   
         - Tamaño entre 0.5 y 2.0 veces el radio terrestre
-        - Alta confianza en la detección (confidence_score > 0.90)
+        - Alta confianza en la detección (confidence_score >= 0.90)
         Retorna True si cumple todos los criterios, False en caso contrario.
         """
-        is_in_zone = 250 <= self.equilibrium_temp <= 350
-        is_earth_size = 0.5 <= self.radius_earth <= 2.0
-        is_high_confidence = self.confidence_score >= 0.90 
-        
-        return is_in_zone and is_earth_size and is_high_confidence
-    
\ No newline at end of file
+        return bool(habitability_rule(self.equilibrium_temp, self.radius_earth, self.confidence_score))
+
+
+class ExoplanetBatch:
+    """
+    Entidad columnar: N candidatos como struct-of-arrays (un array por atributo de Exoplanet).
+    Evalúa la regla de habitabilidad como una máscara sobre todo el lote, sin crear una
+    instancia de Exoplanet por fila.
+    """
+    __slots__ = ('kepid', 'period_days', 'radius_earth', 'equilibrium_temp', 'confidence_score')
+
+    # Columnas KOI de las que se toma cada atributo (from_columns)
+    KOI_COLUMNS = {'kepid': 'kepid', 'period_days': 'koi_period', 'radius_earth': 'koi_prad',
+                   'equilibrium_temp': 'koi_teq'}
+
+    def __init__(self, kepid, period_days, radius_earth, equilibrium_temp, confidence_score):
+        self.period_days = np.ascontiguousarray(period_days, dtype=np.float64)
+        self.radius_earth = np.ascontiguousarray(radius_earth, dtype=np.float64)
+        self.equilibrium_temp = np.ascontiguousarray(equilibrium_temp, dtype=np.float64)
+        self.confidence_score = np.ascontiguousarray(confidence_score, dtype=np.float64)
+        n_rows = len(self.confidence_score)
+        self.kepid = (np.full(n_rows, 'N/A', dtype=object) if kepid is None
+                      else np.asarray(kepid, dtype=object))
+        arrays = (self.kepid, self.period_days, self.radius_earth, self.equilibrium_temp, self.confidence_score)
+        if not all(array.ndim == 1 and len(array) == n_rows for array in arrays):
+            raise ValueError("kepid, period_days, radius_earth, equilibrium_temp y confidence_score "
+                             "deben ser arrays 1D de la misma longitud.")
+
+    @classmethod
+    def from_columns(cls, columns, confidence_score) -> "ExoplanetBatch":
+
+        """
+        Construye el lote a partir de columnas KOI (kepid, koi_period, koi_prad, koi_teq) y de
+        las confianzas del modelo. Una columna ausente queda como NaN (kepid como 'N/A').
+        """
+        confidence_score = np.asarray(confidence_score, dtype=np.float64)
+        missing = np.full(len(confidence_score), np.nan)
+        values = {attribute: columns[column] if column in columns else missing
+                  for attribute, column in cls.KOI_COLUMNS.items()}
+        if 'kepid' not in columns:
+            values['kepid'] = None
+        return cls(confidence_score=confidence_score, **values)
+
+    def __len__(self) -> int:
+        return len(self.confidence_score)
+
+    def __repr__(self) -> str:
+        return f"ExoplanetBatch(n={len(self)})"
+
+    def __getitem__(self, index: int) -> Exoplanet:
+        """Materializa una fila como entidad escalar (solo cuando hace falta un objeto)."""
+        return Exoplanet(kepid=self.kepid[index], period_days=float(self.period_days[index]),
+                         radius_earth=float(self.radius_earth[index]),
+                         equilibrium_temp=float(self.equilibrium_temp[index]),
+                         confidence_score=float(self.confidence_score[index]))
+
+    def is_potentially_habitable(self) -> np.ndarray:
+        """Máscara booleana (N,) con la misma regla que Exoplanet.is_potentially_habitable."""
+        return habitability_rule(self.equilibrium_temp, self.radius_earth, self.confidence_score)
@@ -0,0 +1,292 @@
+import hashlib
+import logging
+import os
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from src.domain.pipeline_modules.data_cleaner import DataCleaner
+from src.domain.pipeline_modules.mission_schema import TESS_DISPOSITIONS
+
+KEPLER, TESS = 'kepler', 'tess'
+DEFAULT_MATCH_RADIUS_ARCSEC = 2.0
+INDEX_FILENAME_PREFIX = 'catalog_index'
+
+# Disposición conocida de un objeto con varias coincidencias: la más concluyente gana
+DISPOSITION_PRIORITY = ('CONFIRMED', 'FALSE POSITIVE', 'CANDIDATE')
+
+KOI_COLUMNS = ['kepid', 'kepoi_name', 'kepler_name', 'koi_disposition', 'ra', 'dec']
+TOI_COLUMNS = ['toi', 'tid', 'tfopwg_disp', 'ra', 'dec']
+CONFIRMED_COLUMNS = ['kepid', 'koi_name', 'kepler_name', 'pl_name']
+
+
+def unit_vectors(ra_deg, dec_deg) -> np.ndarray:
+    """Posiciones RA/Dec (grados) como vectores unitarios cartesianos (N x 3)."""
+    ra, dec = np.radians(np.asarray(ra_deg, dtype=np.float64)), np.radians(np.asarray(dec_deg, dtype=np.float64))
+    cos_dec = np.cos(dec)
+    return np.column_stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)])
+
+
+def chord_length(radius_arcsec: float) -> float:
+    """Cuerda en la esfera unidad equivalente a una separación angular (radio de la búsqueda en el KD-tree)."""
+    return 2.0 * np.sin(np.radians(radius_arcsec / 3600.0) / 2.0)
+
+
+def separation_arcsec(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Separación angular entre vectores unitarios (fórmula de la cuerda, estable a separaciones pequeñas)."""
+    chord = np.linalg.norm(np.asarray(u) - np.asarray(v), axis=-1)
+    return np.degrees(2.0 * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))) * 3600.0
+
+
+class CatalogIndex:
+
+    """
+    Responsabilidad: Índice de los catálogos conocidos (KOI, planetas confirmados de Kepler y
+    TOI de TESS) en una única tabla de entradas. Mantiene índices hash por nombre (kepoi_name /
+    TOI-xxxx.xx) y por estrella anfitriona (kepid / TIC ID) para uniones O(1) por ID, y un
+    KD-tree sobre vectores unitarios para búsquedas por cono en lote. Los catálogos confirmados
+    no traen coordenadas: se unen a su KOI por nombre y heredan la posición de su kepid.
+    """
+
+    ARTIFACT_VERSION = 1
+
+    def __init__(self, catalog: Sequence[str], name: Sequence[str], host_id: Sequence[int], ra: Sequence[float],
+                 dec: Sequence[float], disposition: Sequence[str], confirmed_name: Sequence[str],
+                 host_indexes: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+                 vectors: np.ndarray = None):
+        self.catalog = np.asarray(catalog, dtype=str)
+        self.name = np.asarray(name, dtype=str)
+        self.host_id = np.asarray(host_id, dtype=np.int64)
+        self.ra = np.asarray(ra, dtype=np.float64)
+        self.dec = np.asarray(dec, dtype=np.float64)
+        self.disposition = np.asarray(disposition, dtype=str)
+        self.confirmed_name = np.asarray(confirmed_name, dtype=str)
+        if len({len(column) for column in (self.catalog, self.name, self.host_id, self.ra, self.dec,
+                                           self.disposition, self.confirmed_name)}) != 1:
+            raise ValueError("Dimensiones inconsistentes entre las columnas del índice de catálogos.")
+
+        # Índice hash por nombre (nombres únicos entre catálogos: K00752.01, TOI-1000.01)
+        self._names = pd.Index(self.name)
+        if not self._names.is_unique:
+            raise ValueError("Los nombres del índice de catálogos deben ser únicos.")
+
+        # Índice por estrella anfitriona (varias entradas por clave): claves únicas + offsets (CSR)
+        self.host_indexes = host_indexes or {cat: self._build_host_index(cat) for cat in (KEPLER, TESS)}
+        self._host_keys = {cat: pd.Index(keys) for cat, (keys, _, _) in self.host_indexes.items()}
+
+        # Índice espacial: KD-tree sobre las entradas con posición (se reconstruye al cargar)
+        self._sky_rows = np.flatnonzero(np.isfinite(self.ra) & np.isfinite(self.dec))
+        self.vectors = vectors if vectors is not None else unit_vectors(self.ra[self._sky_rows], self.dec[self._sky_rows])
+        self._tree = cKDTree(self.vectors) if len(self.vectors) else None
+
+    def __len__(self) -> int:
+        return len(self.name)
+
+    def _build_host_index(self, catalog: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rows = np.flatnonzero((self.catalog == catalog) & (self.host_id >= 0))
+        order = rows[np.argsort(self.host_id[rows], kind='stable')]
+        keys, starts = np.unique(self.host_id[order], return_index=True)
+        return keys, np.append(starts, len(order)), order
+
+    # --- Construcción desde los CSV del archivo ---
+
+    @classmethod
+    def from_archives(cls, koi_path: str, toi_path: str = None, confirmed_path: str = None,
+                      cleaner: DataCleaner = None) -> "CatalogIndex":
+
+        """Construye el índice leyendo solo las columnas de identificación y posición de cada catálogo."""
+        cleaner = cleaner or DataCleaner()
+        koi = cleaner.read_archive_table(koi_path, columns=KOI_COLUMNS)
+        entries = [pd.DataFrame({
+            'catalog': KEPLER, 'name': koi['kepoi_name'], 'host_id': koi['kepid'], 'ra': koi['ra'], 'dec': koi['dec'],
+            'disposition': koi['koi_disposition'].str.upper(), 'confirmed_name': koi['kepler_name'],
+        })]
+
+        if confirmed_path:
+            confirmed = cleaner.read_archive_table(confirmed_path, columns=CONFIRMED_COLUMNS)
+            pl_names = confirmed.drop_duplicates('koi_name').set_index('koi_name')['pl_name']
+            entries[0]['confirmed_name'] = koi['kepoi_name'].map(pl_names).fillna(koi['kepler_name'])
+            # Confirmados sin fila KOI (o sin nombre KOI, p. ej. detectados por TTV): entran con su
+            # nombre de planeta y la posición de su estrella si se conoce
+            orphans = confirmed[~confirmed['koi_name'].isin(koi['kepoi_name'])]
+            positions = koi.drop_duplicates('kepid').set_index('kepid')[['ra', 'dec']]
+            entries.append(pd.DataFrame({
+                'catalog': KEPLER, 'name': orphans['koi_name'].fillna(orphans['pl_name']), 'host_id': orphans['kepid'],
+                'ra': orphans['kepid'].map(positions['ra']), 'dec': orphans['kepid'].map(positions['dec']),
+                'disposition': 'CONFIRMED', 'confirmed_name': orphans['pl_name'],
+            }))
+
+        if toi_path:
+            toi = cleaner.read_archive_table(toi_path, columns=TOI_COLUMNS)
+            disposition = toi['tfopwg_disp'].astype(str).str.upper()
+            entries.append(pd.DataFrame({
+                'catalog': TESS, 'name': toi['toi'].map(lambda value: f"TOI-{value:.2f}"), 'host_id': toi['tid'],
+                'ra': toi['ra'], 'dec': toi['dec'],
+                'disposition': disposition.map(TESS_DISPOSITIONS).fillna(disposition), 'confirmed_name': '',
+            }))
+
+        table = pd.concat(entries, ignore_index=True).drop_duplicates('name')
+        index = cls(table['catalog'], table['name'], table['host_id'].fillna(-1), table['ra'], table['dec'],
+                    table['disposition'].fillna(''), table['confirmed_name'].fillna(''))
+        logging.info(f"🗺️ Índice de catálogos construido: {len(index):,} entradas "
+                     f"({len(index.vectors):,} con posición).")
+        return index
+
+    # --- Consultas en lote ---
+
+    def lookup_names(self, names: Sequence[str]) -> np.ndarray:
+        """Posición de cada nombre en el índice (-1 si no existe); una sola pasada hash por lote."""
+        return self._names.get_indexer(pd.Index(np.asarray(names, dtype=object)))
+
+    def lookup_hosts(self, host_ids: Sequence[float], catalog: str = KEPLER) -> List[np.ndarray]:
+        """Entradas de cada estrella anfitriona (kepid para 'kepler', TIC ID para 'tess'); vacío si no hay."""
+        keys, offsets, order = self.host_indexes[catalog]
+        ids = pd.to_numeric(pd.Series(np.asarray(host_ids, dtype=object)), errors='coerce').to_numpy(dtype=np.float64)
+        positions = np.full(len(ids), -1, dtype=np.int64)
+        valid = np.isfinite(ids)
+        positions[valid] = self._host_keys[catalog].get_indexer(ids[valid].astype(np.int64))
+        return [order[offsets[p]:offsets[p + 1]] if p >= 0 else order[:0] for p in positions]
+
+    def cone_search(self, ra: Sequence[float], dec: Sequence[float],
+                    radius_arcsec: float = DEFAULT_MATCH_RADIUS_ARCSEC) -> List[Tuple[np.ndarray, np.ndarray]]:
+
+        """
+        Entradas a menos de `radius_arcsec` de cada posición, ordenadas por separación:
+        (filas del índice, separaciones en arcsec). Las posiciones nulas no coinciden con nada.
+        """
+        ra, dec = np.asarray(ra, dtype=np.float64), np.asarray(dec, dtype=np.float64)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        results = [empty] * len(ra)
+        valid = np.flatnonzero(np.isfinite(ra) & np.isfinite(dec))
+        if self._tree is None or not len(valid):
+            return results
+
+        queries = unit_vectors(ra[valid], dec[valid])
+        neighbours = self._tree.query_ball_point(queries, r=chord_length(radius_arcsec))
+        for i, hits, query in zip(valid, neighbours, queries):
+            if not hits:
+                continue
+            hits = np.asarray(hits, dtype=np.int64)
+            separations = separation_arcsec(self.vectors[hits], query)
+            by_distance = np.argsort(separations, kind='stable')
+            results[i] = (self._sky_rows[hits[by_distance]], separations[by_distance])
+        return results
+
+    def entry(self, row: int) -> Dict[str, object]:
+        return {
+            "catalog": str(self.catalog[row]),
+            "name": str(self.name[row]),
+            "host_id": int(self.host_id[row]) if self.host_id[row] >= 0 else None,
+            "ra": float(self.ra[row]) if np.isfinite(self.ra[row]) else None,
+            "dec": float(self.dec[row]) if np.isfinite(self.dec[row]) else None,
+            "disposition": str(self.disposition[row]) or None,
+            "confirmed_name": str(self.confirmed_name[row]) or None,
+        }
+
+    def known_context(self, kepid: Sequence[float] = None, tid: Sequence[float] = None,
+                      names: Sequence[str] = None, ra: Sequence[float] = None, dec: Sequence[float] = None,
+                      radius_arcsec: float = DEFAULT_MATCH_RADIUS_ARCSEC) -> List[Dict[str, object]]:
+
+        """
+        Contexto conocido por fila combinando uniones por ID (nombre, kepid, TIC ID) y cono por
+        posición: coincidencias, disposición más concluyente y si ya existe un planeta confirmado.
+        """
+        given = [np.asarray(values) for values in (kepid, tid, names, ra, dec) if values is not None]
+        if not given:
+            raise ValueError("Indique al menos una columna de identificación (kepid, tid, names) o posición (ra/dec).")
+        if (ra is None) != (dec is None):
+            raise ValueError("La búsqueda por posición necesita 'ra' y 'dec'.")
+        n_rows = len(given[0])
+        if any(len(values) != n_rows for values in given):
+            raise ValueError("Todas las columnas deben tener la misma longitud.")
+
+        id_matches = [[] for _ in range(n_rows)]
+        if names is not None:
+            for i, position in enumerate(self.lookup_names(names)):
+                if position >= 0:
+                    id_matches[i].append(position)
+        for host_ids, catalog in ((kepid, KEPLER), (tid, TESS)):
+            if host_ids is not None:
+                for i, rows in enumerate(self.lookup_hosts(host_ids, catalog)):
+                    id_matches[i].extend(rows.tolist())
+        cones = self.cone_search(ra, dec, radius_arcsec) if ra is not None else [None] * n_rows
+
+        contexts = []
+        for by_id, cone in zip(id_matches, cones):
+            matches = {}
+            for row in by_id:
+                matches.setdefault(row, {**self.entry(row), "match": "id", "separation_arcsec": None})
+            if cone is not None:
+                for row, separation in zip(*cone):
+                    match = matches.setdefault(int(row), {**self.entry(row), "match": "position"})
+                    match["separation_arcsec"] = round(float(separation), 4)
+            contexts.append(self._summarize(list(matches.values())))
+        return contexts
+
+    @staticmethod
+    def _summarize(matches: List[Dict[str, object]]) -> Dict[str, object]:
+        dispositions = {match["disposition"] for match in matches}
+        known = next((value for value in DISPOSITION_PRIORITY if value in dispositions), None)
+        return {
+            "known_disposition": known,
+            "already_confirmed": known == 'CONFIRMED',
+            "confirmed_names": sorted({match["confirmed_name"] for match in matches if match["confirmed_name"]}),
+            "matches": matches,
+        }
+
+    # --- Persistencia (npz sin pickle, junto a los datos) ---
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp"
+        host_arrays = {f"{cat}_{part}": array for cat, arrays in self.host_indexes.items()
+                       for part, array in zip(('keys', 'offsets', 'order'), arrays)}
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, version=self.ARTIFACT_VERSION, catalog=self.catalog, name=self.name, host_id=self.host_id,
+                     ra=self.ra, dec=self.dec, disposition=self.disposition, confirmed_name=self.confirmed_name,
+                     vectors=self.vectors, **host_arrays)
+        os.replace(tmp_path, path)
+        logging.info(f"🗺️ Índice de catálogos guardado en: {path} ({len(self):,} entradas)")
+
+    @classmethod
+    def load(cls, path: str) -> "CatalogIndex":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != cls.ARTIFACT_VERSION:
+                raise ValueError(f"Versión de índice de catálogos no soportada: {int(data['version'])}")
+            host_indexes = {cat: tuple(data[f"{cat}_{part}"] for part in ('keys', 'offsets', 'order'))
+                            for cat in (KEPLER, TESS)}
+            return cls(data['catalog'], data['name'], data['host_id'], data['ra'], data['dec'], data['disposition'],
+                       data['confirmed_name'], host_indexes=host_indexes, vectors=data['vectors'])
+
+    @classmethod
+    def load_or_build(cls, koi_path: str, toi_path: str = None, confirmed_path: str = None,
+                      cache_dir: str = None) -> "CatalogIndex":
+
+        """
+        Carga el índice persistido junto a los datos (data/.cache) o lo construye y lo guarda.
+        La clave es el hash del contenido de los catálogos (y la versión del artefacto): un volcado nuevo lo invalida.
+        """
+        sources = [path for path in (koi_path, toi_path, confirmed_path) if path]
+        cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(koi_path)), DataCleaner.CACHE_DIRNAME)
+        hashes = [str(cls.ARTIFACT_VERSION)] + [DataCleaner._content_hash(path) for path in sources]
+        key = hashlib.sha1('|'.join(hashes).encode()).hexdigest()[:16]
+        path = os.path.join(cache_dir, f"{INDEX_FILENAME_PREFIX}-{key}.npz")
+        if os.path.exists(path):
+            try:
+                index = cls.load(path)
+                logging.info(f"Índice de catálogos cargado desde: {path}")
+                return index
+            except Exception as e:
+                logging.warning(f"Índice de catálogos inválido ({e}). Se reconstruye.")
+
+        index = cls.from_archives(koi_path, toi_path, confirmed_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            index.save(path)
+            for stale in os.listdir(cache_dir):
+                if stale.startswith(f"{INDEX_FILENAME_PREFIX}-") and stale != os.path.basename(path):
+                    os.remove(os.path.join(cache_dir, stale))
+        except OSError as e:
+            logging.warning(f"No se pudo persistir el índice de catálogos ({e}).")
+        return index
@@ -1,43 +1,117 @@
 import pandas as pd
+import numpy as np
 import logging
+import hashlib
+import os
+import re
 from astropy.table import Table
+from src.domain.pipeline_modules.scientific_filter import KEPLER_FILTERS, ScientificFilter
+from src.domain.pipeline_modules.mission_schema import (
+    CANONICAL_COLUMNS, KEPLER_SCHEMA, MISSION_COLUMN, MISSION_SCHEMAS, detect_missions, to_canonical
+)
+
+try:  # pyarrow es opcional: sin él se usa siempre el lector de Astropy
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
 
 class DataCleaner:
 
     """
     Responsabilidad: Carga robusta, limpieza astronómica y manejo seguro de NaNs.
     Basado en estándares y recomendaciones de la NASA para datos de exoplanetas.
-    1. Carga robusta con Astropy.
+    1. Carga robusta: caché columnar Parquet (clave = hash del contenido) -> lector CSV
+       rápido con PyArrow -> Astropy como último recurso.
+    2. Esquema de misión: detecta el catálogo (Kepler KOI, TESS TOI, K2 o mixto) por sus
+       columnas y lo traduce a las columnas canónicas koi_* antes de filtrar.
     """
     
-    # Filtros de calidad basados en estándares NASA
-    ASTRO_FILTERS = {
-        'koi_period': (0.5, 1000, 'Período orbital válido'),
-        'koi_duration': (0.5, 48, 'Duración tránsito observable'), 
-        'koi_depth': (10, 100000, 'Profundidad detectable'),
-        # 'koi_kepmag': (6, 20, 'Magnitud Kepler válida'), # Omitida por no estar en todos los datasets
-        'koi_model_snr': (7.1, 1000, 'SNR umbral NASA')
-    }
+    # Filtros de calidad basados en estándares NASA (preset por defecto: Kepler)
+    ASTRO_FILTERS = KEPLER_FILTERS
     
-    CRITICAL_FEATURES = [
-        'kepid', 'koi_disposition', 'koi_period', 'koi_duration', 
-        'koi_depth', 'koi_model_snr', 'koi_impact', 'koi_prad',
-        'koi_steff', 'koi_slogg', 'koi_srad', 'koi_smass'
-    ]
+    # Features críticas en el esquema canónico (catálogo KOI de Kepler)
+    CRITICAL_FEATURES = CANONICAL_COLUMNS
+
+    # Columnas que nunca se imputan (identificadores y target)
+    NON_FEATURE_COLUMNS = ['kepid', 'label', 'target_class']
+
+    # Carpeta de caché columnar (relativa a la carpeta del CSV de origen)
+    CACHE_DIRNAME = '.cache'
+
+    def __init__(self, use_cache: bool = True, cache_dir: str = None, filters=None):
+        # Medianas aprendidas en handle_missing_values (reutilizadas en inferencia)
+        self.imputation_medians_ = {}
+        # Tabla de filtros configurable: dict {col: (min, max, desc)} o nombre de misión ('kepler', 'tess')
+        if isinstance(filters, str):
+            self.scientific_filter = ScientificFilter.for_mission(filters)
+        else:
+            self.scientific_filter = ScientificFilter(filters if filters is not None else self.ASTRO_FILTERS)
+        self.use_cache = use_cache and pa is not None
+        self.cache_dir = cache_dir
+        # Misiones detectadas en la última carga
+        self.missions_ = []
     
-    def load_and_select(self, data_path: str) -> pd.DataFrame:
-        """Carga robusta con Astropy y selección de features críticas."""
-        try:
-            logging.info(f"Intentando cargar datos de {data_path} con Astropy...")
-            astropy_table = Table.read(data_path, format='ascii')
-            df = astropy_table.to_pandas()
-            df.columns = df.columns.str.strip().str.lower()
-        except Exception as e:
-            logging.error(f"Error fatal al cargar con Astropy: {e}")
-            raise 
+    def load_and_select(self, data_path: str, mission: str = None) -> pd.DataFrame:
+        """
+        Carga robusta (caché Parquet / PyArrow / Astropy) y selección de features críticas.
+        La misión se detecta por las columnas de la cabecera (o se fuerza con `mission`);
+        solo se leen las columnas que el esquema necesita.
+        """
+        schemas = self.resolve_schemas(self.archive_columns(data_path), mission)
+        df = self.read_archive_table(data_path, columns=self.source_columns(schemas))
+        df = self.canonicalize(df, schemas)
+        df = self.select_and_label(df)
+
+        # VALIDACIÓN DEL MUESTREO (IMPORTANTE)
+        logging.info(f"Distribución del Target: {df['target_class'].value_counts()}")
+            
+        logging.info(f"Datos cargados. Filas iniciales: {len(df)}. Features: {list(df.columns)}")
+        return df
+
+    def resolve_schemas(self, columns, mission: str = None) -> list:
+        """Esquemas de misión del catálogo (forzado por nombre o detectado por columnas)."""
+        if mission is not None:
+            if mission.lower() not in MISSION_SCHEMAS:
+                raise ValueError(f"Misión desconocida '{mission}'. Opciones: {sorted(MISSION_SCHEMAS)}")
+            schemas = [MISSION_SCHEMAS[mission.lower()]]
+        else:
+            schemas = detect_missions(columns)
+        self.missions_ = [schema.name for schema in schemas]
+        logging.info(f"Esquema de misión: {', '.join(self.missions_)}")
+        return schemas
+
+    def source_columns(self, schemas: list) -> list:
+        """Columnas a leer del archivo: las fuentes de todos los esquemas detectados."""
+        columns = []
+        for schema in schemas:
+            columns += [col for col in schema.column_map if col not in columns]
+        return columns
+
+    @staticmethod
+    def canonicalize(df: pd.DataFrame, schemas: list) -> pd.DataFrame:
+        """Renombrado y conversión de unidades al esquema canónico (Kepler pasa sin copia)."""
+        if schemas == [KEPLER_SCHEMA]:
+            return df
+        return to_canonical(df, schemas)
+
+    def archive_columns(self, data_path: str) -> list:
+        """Nombres de columnas del archivo (cabecera tras los comentarios '#', o esquema Parquet)."""
+        if data_path.endswith('.parquet') and pa is not None:
+            return list(pq.read_schema(data_path).names)
+        with open(data_path, 'r') as f:
+            for line in f:
+                if not line.startswith('#'):
+                    return [name.strip().strip('"').lower() for name in line.split(',')]
+        return []
 
-        # Seleccionar solo features críticas que existan
-        available_features = [col for col in self.CRITICAL_FEATURES if col in df.columns]
+    def select_and_label(self, df: pd.DataFrame) -> pd.DataFrame:
+
+        """Selecciona las features críticas y crea 'label'/'target_class' (operación local por fila)."""
+
+        # Seleccionar solo features críticas que existan (y la misión de origen en un catálogo mixto)
+        available_features = [col for col in self.CRITICAL_FEATURES + [MISSION_COLUMN] if col in df.columns]
         df = df[available_features].copy()
         
         # Crear 'label' (0: FP, 1: Planet/Candidate)
@@ -47,19 +121,157 @@ class DataCleaner:
             df['label'] = df['koi_disposition'].str.lower()
             
             # 2. Lógica de mapeo CRÍTICA: Confirmados y Candidatos son 1 (Exoplaneta)
-            df['target_class'] = df['label'].apply(
-                lambda x: 1 
-                if x in ['confirmed', 'candidate'] 
-                else 0
-            )
+            df['target_class'] = df['label'].isin(['confirmed', 'candidate']).astype('int64')
             df = df.drop(columns=['koi_disposition'], errors='ignore')
-            
-        # VALIDACIÓN DEL MUESTREO (IMPORTANTE)
-        logging.info(f"Distribución del Target: {df['target_class'].value_counts()}")
-            
-        logging.info(f"Datos cargados. Filas iniciales: {len(df)}. Features: {list(df.columns)}")
+
         return df
 
+    def iter_chunks(self, data_path: str, chunk_size: int = 50_000):
+
+        """
+        Modo streaming: genera chunks de `chunk_size` filas ya seleccionados y etiquetados.
+        La memoria queda acotada por el tamaño del chunk. Si existe la caché Parquet del
+        CSV se recorre por row-batches; si no, se lee el CSV por bloques.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size debe ser >= 1.")
+
+        parquet_path = data_path if data_path.endswith('.parquet') else None
+        if parquet_path is None and self.use_cache and os.path.exists(self._cache_path(data_path)):
+            parquet_path = self._cache_path(data_path)
+
+        schemas = self.resolve_schemas(self.archive_columns(data_path))
+        wanted = self.source_columns(schemas)
+
+        if parquet_path is not None and pa is not None:
+            parquet_file = pq.ParquetFile(parquet_path)
+            columns = [c for c in wanted if c in parquet_file.schema_arrow.names]
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+                yield self.select_and_label(self.canonicalize(batch.to_pandas(), schemas))
+            return
+
+        wanted = set(wanted)
+        reader = pd.read_csv(
+            data_path,
+            skiprows=self._count_comment_lines(data_path),
+            usecols=lambda name: name.strip().lower() in wanted,
+            chunksize=chunk_size,
+        )
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.strip().str.lower()
+            yield self.select_and_label(self.canonicalize(chunk, schemas))
+
+    def imputable_columns(self, df: pd.DataFrame) -> list:
+        """Columnas numéricas de features sobre las que se aprende/aplica la mediana."""
+        return [col for col in df.columns
+                if df[col].dtype in ['float64', 'int64'] and col not in self.NON_FEATURE_COLUMNS]
+
+    @staticmethod
+    def _count_comment_lines(data_path: str) -> int:
+        """Número de líneas de comentario '#' en la cabecera del archivo NASA."""
+        comment_lines = 0
+        with open(data_path, 'r') as f:
+            for line in f:
+                if not line.startswith('#'):
+                    break
+                comment_lines += 1
+        return comment_lines
+
+    def read_archive_table(self, data_path: str, columns: list = None) -> pd.DataFrame:
+
+        """
+        Lee un CSV del NASA Exoplanet Archive (cabecera con comentarios '#').
+        Con caché activa, la primera lectura escribe un Parquet tipado y las siguientes
+        leen solo `columns` por proyección de columnas (memory-map). La clave de la caché
+        es el hash del contenido, así que cualquier cambio en el CSV la invalida.
+        """
+        if self.use_cache:
+            cache_path = self._cache_path(data_path)
+            if os.path.exists(cache_path):
+                try:
+                    available = set(pq.read_schema(cache_path).names)
+                    projection = [c for c in columns if c in available] if columns else None
+                    table = pq.read_table(cache_path, columns=projection, memory_map=True)
+                    logging.info(f"Datos cargados desde caché columnar: {cache_path}")
+                    return table.to_pandas()
+                except Exception as e:
+                    logging.warning(f"Caché columnar inválida ({e}). Se regenera desde el CSV.")
+
+        table = self._read_archive_csv(data_path)
+        if table is None:
+            return self._read_with_astropy(data_path)
+
+        if self.use_cache:
+            self._write_cache(table, data_path, cache_path)
+
+        if columns:
+            table = table.select([c for c in columns if c in table.column_names])
+        return table.to_pandas()
+
+    def _read_archive_csv(self, data_path: str):
+        """Lector CSV rápido (multihilo) de PyArrow, saltando los comentarios '#' de la cabecera."""
+        if pa is None:
+            return None
+        try:
+            logging.info(f"Intentando cargar datos de {data_path} con PyArrow CSV...")
+            table = pa_csv.read_csv(
+                data_path,
+                read_options=pa_csv.ReadOptions(skip_rows=self._count_comment_lines(data_path)),
+                convert_options=pa_csv.ConvertOptions(strings_can_be_null=True),
+            )
+            table = table.rename_columns([name.strip().lower() for name in table.column_names])
+
+            # Columnas completamente vacías: se tipan como float64 en lugar de 'null'
+            for i, field in enumerate(table.schema):
+                if pa.types.is_null(field.type):
+                    table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+            return table
+        except Exception as e:
+            logging.warning(f"Lector PyArrow falló ({e}). Se usa Astropy como respaldo.")
+            return None
+
+    def _read_with_astropy(self, data_path: str) -> pd.DataFrame:
+        try:
+            logging.info(f"Intentando cargar datos de {data_path} con Astropy...")
+            astropy_table = Table.read(data_path, format='ascii')
+            df = astropy_table.to_pandas()
+            df.columns = df.columns.str.strip().str.lower()
+            return df
+        except Exception as e:
+            logging.error(f"Error fatal al cargar con Astropy: {e}")
+            raise 
+
+    def _cache_path(self, data_path: str) -> str:
+        cache_dir = self.cache_dir or os.path.join(os.path.dirname(os.path.abspath(data_path)), self.CACHE_DIRNAME)
+        stem = os.path.splitext(os.path.basename(data_path))[0]
+        return os.path.join(cache_dir, f"{stem}-{self._content_hash(data_path)}.parquet")
+
+    @staticmethod
+    def _content_hash(data_path: str) -> str:
+        digest = hashlib.sha1()
+        with open(data_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+
+    def _write_cache(self, table, data_path: str, cache_path: str) -> None:
+        """Escribe el Parquet y elimina las versiones obsoletas del mismo CSV."""
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            stem = os.path.splitext(os.path.basename(data_path))[0]
+            stale_pattern = re.compile(rf"{re.escape(stem)}-[0-9a-f]{{16}}\.parquet")
+            for name in os.listdir(cache_dir):
+                if stale_pattern.fullmatch(name) and os.path.join(cache_dir, name) != cache_path:
+                    os.remove(os.path.join(cache_dir, name))
+
+            tmp_path = f"{cache_path}.tmp"
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, cache_path)  # Escritura atómica
+            logging.info(f"Caché columnar escrita en: {cache_path}")
+        except OSError as e:
+            logging.warning(f"No se pudo escribir la caché columnar: {e}")
+
     def apply_scientific_filters(self, df: pd.DataFrame) -> pd.DataFrame:
 
         """
@@ -67,33 +279,33 @@ class DataCleaner:
         con NaN en el target crítico al inicio.
         """
         logging.info("Aplicando limpieza y filtros astronómicos")
-        initial_count = len(df)
-        df_clean = df.copy()
+        df_clean, label_removed, rejections = self.filter_rows(df)
 
         # 1. Eliminar filas donde no hay target (CRÍTICO)
-        if 'label' in df_clean.columns:
-            df_clean = df_clean.dropna(subset=['label'])
-            logging.info(f"   Etiqueta objetivo (label) eliminadas: {initial_count - len(df_clean)}")
-        
-        # Recalcular después de eliminar NaNs de label
-        initial_count = len(df_clean) 
-
-        # 2. Aplicar filtros astronómicos
-        for col, (min_val, max_val, desc) in self.ASTRO_FILTERS.items():
-            if col in df_clean.columns:
-                before = len(df_clean)
-                df_clean = df_clean[
-                    (df_clean[col] >= min_val) & 
-                    (df_clean[col] <= max_val) &
-                    df_clean[col].notna() # Elimina NaNs en las columnas que usamos para filtrar
-                ]
-                removed = before - len(df_clean)
-                logging.info(f"   {desc}: -{removed:,} filas")
-
-        reduction = (1 - len(df_clean)/initial_count) * 100
+        if 'label' in df.columns:
+            logging.info(f"   Etiqueta objetivo (label) eliminadas: {label_removed}")
+
+        # 2. Filtros astronómicos (máscara única; conteos de la misma pasada)
+        for desc, removed in rejections.items():
+            logging.info(f"   {desc}: -{removed:,} filas")
+
+        initial_count = len(df) - label_removed
+        reduction = (1 - len(df_clean)/initial_count) * 100 if initial_count else 0.0
         logging.info(f" Reducción total: {reduction:.1f}% ({len(df_clean):,} filas restantes)")
         return df_clean
 
+    def filter_rows(self, df: pd.DataFrame) -> tuple:
+
+        """
+        Versión silenciosa de apply_scientific_filters (usada también por chunk en streaming).
+        Combina 'label' no nulo y los filtros compilados en una sola máscara aplicada una vez.
+        La misión de origen de un catálogo mixto solo se usa aquí: el df filtrado ya no la lleva.
+        Retorna (df filtrado, filas sin label, {descripción: filas rechazadas}).
+        """
+        has_label = df['label'].notna().to_numpy() if 'label' in df.columns else np.ones(len(df), dtype=bool)
+        mask, rejections = self.scientific_filter.evaluate(df, base_mask=has_label)
+        return df[mask].drop(columns=[MISSION_COLUMN], errors='ignore'), int((~has_label).sum()), rejections
+
     def handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
 
         """
@@ -102,11 +314,14 @@ class DataCleaner:
         """
         logging.info(" Manejo seguro de valores faltantes (Imputación)")
         df_filled = df.copy()
+        self.imputation_medians_ = {}
 
-        # Usamos la mediana general como imputación más robusta para variables numéricas
-        for col in df_filled.columns:
-            if df_filled[col].isnull().sum() > 0 and df_filled[col].dtype in ['float64', 'int64']:
-                median_val = df_filled[col].median()
+        # Usamos la mediana general como imputación más robusta para variables numéricas.
+        # Se guarda la mediana de toda feature numérica para poder imputar en inferencia.
+        for col in self.imputable_columns(df_filled):
+            median_val = df_filled[col].median()
+            self.imputation_medians_[col] = float(median_val)
+            if df_filled[col].isnull().sum() > 0:
                 df_filled[col] = df_filled[col].fillna(median_val)
 
         # Confirmamos que no hay NaNs en las features que pasaremos a FE
@@ -17,47 +17,66 @@ class DataFinalizer:
         self.random_state = random_state
         self.scaler = RobustScaler() 
 
-    def balance_classes(self, X: pd.DataFrame, y: pd.Series) -> tuple:
+    BALANCE_MODES = ('oversample', 'weights')
 
-        """Oversample simple de la minoritaria hasta igualar la mayoritaria."""
+    def balanced_indices(self, y) -> np.ndarray:
 
-        logging.info("Balanceo simple (Oversample) para igualar clases")
+        """
+        Oversample simple de la minoritaria hasta igualar la mayoritaria, expresado como un
+        único array de posiciones (minoritaria con reemplazo + mayoritaria, barajado).
+        Consume el generador aleatorio igual que resample() por clase + sample(frac=1):
+        mismo conjunto y mismo orden que el balanceo por DataFrames, sin copiar la matriz.
+        """
+        labels = np.asarray(y)
+        classes, first_seen, counts = np.unique(labels, return_index=True, return_counts=True)
+        if len(classes) < 2:
+            raise ValueError("Error de balanceo: Solo se encontró una clase en el set final.")
 
-        df_combined = pd.concat([X, y], axis=1) 
-        
-        class_counts = df_combined['target'].value_counts()
-        minority_label = class_counts.idxmin()
-        majority_count = class_counts.max()
-        
-        target_size = majority_count
-        
-        balanced_dfs = []
-        for class_label in df_combined['target'].unique():
-            class_df = df_combined[df_combined['target'] == class_label]
-            
-            is_minority = class_label == minority_label
+        minority_label = classes[np.argmin(counts)]
+        target_size = counts.max()
 
-            resampled_df = resample(
-                class_df, 
-                n_samples=target_size if is_minority else len(class_df), 
-                replace=is_minority, 
+        parts = []
+        # Orden de aparición de las clases (como Series.unique())
+        for class_label in classes[np.argsort(first_seen)]:
+            positions = np.flatnonzero(labels == class_label)
+            is_minority = class_label == minority_label
+            parts.append(resample(
+                positions,
+                n_samples=target_size if is_minority else len(positions),
+                replace=is_minority,
                 random_state=self.random_state
-            )
-            balanced_dfs.append(resampled_df)
+            ))
+        indices = np.concatenate(parts)
+        # Barajado final (misma llamada que DataFrame.sample(frac=1, random_state=...))
+        return indices[np.random.RandomState(self.random_state).choice(len(indices), size=len(indices), replace=False)]
 
-        df_balanced = pd.concat(balanced_dfs, ignore_index=True).sample(
-            frac=1, random_state=self.random_state
-        )
+    def balance_weights(self, y) -> np.ndarray:
 
-        X_balanced = df_balanced.drop(columns=['target'])
-        y_balanced = df_balanced['target']
+        """
+        Modo solo-pesos: peso por fila = tamaño de la mayoritaria / tamaño de su clase.
+        Cada clase suma lo mismo que tras el oversampling, sin duplicar filas (memoria 1x).
+        """
+        labels = np.asarray(y)
+        classes, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+        if len(classes) < 2:
+            raise ValueError("Error de balanceo: Solo se encontró una clase en el set final.")
+        weights = counts.max() / counts
+        logging.info(f"Balanceo por pesos (sin duplicar filas): {dict(zip(classes.tolist(), np.round(weights, 4).tolist()))}")
+        return weights[inverse]
+
+    def balance_classes(self, X: pd.DataFrame, y: pd.Series) -> tuple:
+
+        """Oversample simple de la minoritaria hasta igualar la mayoritaria (una sola copia de X)."""
+
+        logging.info("Balanceo simple (Oversample) para igualar clases")
+
+        indices = self.balanced_indices(y)
+        X_balanced = X.iloc[indices]
+        X_balanced.index = pd.RangeIndex(len(indices))
+        y_balanced = pd.Series(np.asarray(y)[indices], name='target')
 
         final_dist = y_balanced.value_counts().sort_index()
         logging.info(f"Distribución final: {dict(final_dist)}")
-        
-        # Validación CRÍTICA: Asegurar que ambas clases existan
-        if len(final_dist) < 2:
-            raise ValueError("Error de balanceo: Solo se encontró una clase en el set final.")
 
         return X_balanced, y_balanced
 
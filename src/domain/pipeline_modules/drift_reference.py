@@ -0,0 +1,134 @@
+import json
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.domain.pipeline_modules.streaming_stats import FeatureDistributionSketch
+
+# Umbrales habituales del PSI: < 0.1 estable, 0.1-0.25 moderado, > 0.25 significativo
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+# Proporción mínima por bin en el PSI (evita log(0) con bins vacíos)
+PSI_EPSILON = 1e-4
+
+
+def population_stability_index(expected: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    """PSI por fila entre dos matrices de proporciones por bin (F x bins)."""
+    expected = np.clip(expected, PSI_EPSILON, None)
+    observed = np.clip(observed, PSI_EPSILON, None)
+    return ((observed - expected) * np.log(observed / expected)).sum(axis=1)
+
+
+def binned_ks_statistic(expected: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    """Estadístico KS aproximado: máxima distancia entre las CDF evaluadas en los bordes de los bins."""
+    return np.abs(np.cumsum(expected, axis=1) - np.cumsum(observed, axis=1)).max(axis=1)
+
+
+def drift_status(psi: float) -> str:
+    if psi >= PSI_SIGNIFICANT:
+        return "significant"
+    if psi >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+class DriftReference:
+
+    """
+    Responsabilidad: Distribución de referencia de las features servidas, capturada en el
+    entrenamiento (mismo espacio escalado que recibe el modelo). Guarda un sketch por feature
+    con bordes en los cuantiles del entrenamiento y los límites de los filtros astronómicos
+    trasladados a ese espacio. compare() calcula PSI/KS contra un sketch de serving.
+    """
+
+    ARTIFACT_VERSION = 1
+
+    def __init__(self, feature_names: List[str], sketch: FeatureDistributionSketch):
+        if len(feature_names) != sketch.n_features:
+            raise ValueError("Dimensiones inconsistentes entre feature_names y el sketch de referencia.")
+        self.feature_names = list(feature_names)
+        self.sketch = sketch
+
+    @classmethod
+    def from_matrix(cls, X: np.ndarray, feature_names: List[str],
+                    bounds: Dict[str, Tuple[float, float]] = None, n_bins: int = 20) -> "DriftReference":
+
+        """
+        Construye la referencia a partir de la matriz de entrenamiento: bordes en los cuantiles
+        1/n_bins ... (n_bins-1)/n_bins de cada feature y límites {feature: (mín, máx)} opcionales.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        edges = np.nanquantile(X, np.linspace(0, 1, n_bins + 1)[1:-1], axis=0).T
+        lower = np.array([(bounds or {}).get(name, (-np.inf, np.inf))[0] for name in feature_names], dtype=np.float64)
+        upper = np.array([(bounds or {}).get(name, (-np.inf, np.inf))[1] for name in feature_names], dtype=np.float64)
+        return cls(feature_names, FeatureDistributionSketch(edges, lower, upper).update(X))
+
+    def new_sketch(self) -> FeatureDistributionSketch:
+        """Sketch vacío con los mismos bordes y límites, para acumular el tráfico servido."""
+        return self.sketch.empty_like()
+
+    def compare(self, observed: FeatureDistributionSketch) -> dict:
+
+        """
+        Puntuaciones de drift por feature (PSI, KS aproximado, medias/desviaciones, cuantiles y
+        conteos fuera de rango) y un resumen global con el PSI máximo.
+        """
+        expected_props, observed_props = self.sketch.proportions(), observed.proportions()
+        psi = population_stability_index(expected_props, observed_props)
+        ks = binned_ks_statistic(expected_props, observed_props)
+        quantiles = observed.quantiles([0.05, 0.5, 0.95])
+        reference_std, observed_std = np.sqrt(self.sketch.variance), np.sqrt(observed.variance)
+
+        def number(value):
+            return round(float(value), 6) if np.isfinite(value) else None
+
+        features = {}
+        for j, name in enumerate(self.feature_names):
+            has_data = observed.count[j] > 0
+            features[name] = {
+                "psi": number(psi[j]) if has_data else None,
+                "ks": number(ks[j]) if has_data else None,
+                "status": drift_status(psi[j]) if has_data else "no_data",
+                "observed": int(observed.count[j]),
+                "missing": int(observed.missing[j]),
+                "out_of_range": {"below": int(observed.below[j]), "above": int(observed.above[j])},
+                "mean": number(observed.mean[j]) if has_data else None,
+                "std": number(observed_std[j]),
+                "reference_mean": number(self.sketch.mean[j]),
+                "reference_std": number(reference_std[j]),
+                "quantiles": {"p05": number(quantiles[j, 0]), "p50": number(quantiles[j, 1]),
+                              "p95": number(quantiles[j, 2])},
+            }
+
+        scored = [entry["psi"] for entry in features.values() if entry["psi"] is not None]
+        max_psi = max(scored) if scored else None
+        return {
+            "status": drift_status(max_psi) if max_psi is not None else "no_data",
+            "max_psi": max_psi,
+            "drifted_features": sorted(name for name, entry in features.items()
+                                       if entry["status"] in ("moderate", "significant")),
+            "observed_rows": int((observed.count + observed.missing).max(initial=0)),
+            "reference_rows": int(self.sketch.count.max(initial=0)),
+            "out_of_range_values": int(observed.below.sum() + observed.above.sum()),
+            "features": features,
+        }
+
+    # --- Persistencia (artefacto JSON junto al modelo) ---
+
+    def to_dict(self) -> dict:
+        return {"version": self.ARTIFACT_VERSION, "feature_names": self.feature_names, "sketch": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DriftReference":
+        return cls(data["feature_names"], FeatureDistributionSketch.from_dict(data["sketch"]))
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        logging.info(f"📐 Referencia de drift guardada en: {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "DriftReference":
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
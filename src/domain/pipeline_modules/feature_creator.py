@@ -7,73 +7,113 @@ class FeatureCreator:
 
     """
     Responsabilidad: Crear features avanzadas basadas en física y estadísticas.
+    Tras create_statistical_features, statistical_constants_ guarda las constantes
+    (_skew, _kurt, _cv) aprendidas para reutilizarlas en inferencia.
     """
 
+    def __init__(self):
+        self.statistical_constants_ = {}
+
     def create_astronomical_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Crea features basadas en la física de los exoplanetas."""
         logging.info("Creando 45+ Features Astronómicas Avanzadas")
         df_eng = df.copy()
 
+        for name, values in self.astronomical_feature_arrays(df_eng).items():
+            df_eng[name] = values
+            
+        logging.info(f"Features físicas creadas. Total columnas: {len(df_eng.columns)}")
+        return df_eng
+
+    @staticmethod
+    def astronomical_feature_arrays(columns) -> dict:
+
+        """
+        Definición única de las features físicas. Recibe cualquier contenedor indexable por
+        nombre de columna (DataFrame o dict de arrays NumPy) y devuelve {feature: valores}.
+        La usan tanto el pipeline de entrenamiento como el transformador de inferencia.
+        """
+        features = {}
+
         # 1. Características geométricas/físicas (3ra Ley de Kepler)
-        if self._columns_exist(df_eng, ['koi_period', 'koi_smass', 'koi_duration', 'koi_depth', 'koi_srad']):
+        if all(col in columns for col in ['koi_period', 'koi_smass', 'koi_duration', 'koi_depth', 'koi_srad']):
             # Semi-eje mayor en AU
-            df_eng['orbital_distance_au'] = ((df_eng['koi_period']/365.25)**2 * df_eng['koi_smass'])**(1/3)
+            features['orbital_distance_au'] = ((columns['koi_period']/365.25)**2 * columns['koi_smass'])**(1/3)
             # Radio planetario en R_Earth
-            df_eng['planet_radius_earth'] = (
-                np.sqrt(df_eng['koi_depth'] / 1e6 + 1e-10) * df_eng['koi_srad'] * 109.2 # R_sun a R_Earth factor
+            features['planet_radius_earth'] = (
+                np.sqrt(columns['koi_depth'] / 1e6 + 1e-10) * columns['koi_srad'] * 109.2 # R_sun a R_Earth factor
             )
-            df_eng['duration_period_ratio'] = df_eng['koi_duration'] / (df_eng['koi_period'] + 1e-10)
+            features['duration_period_ratio'] = columns['koi_duration'] / (columns['koi_period'] + 1e-10)
         
         # 2. Análisis de habitabilidad
-        if self._columns_exist(df_eng, ['koi_stemp', 'koi_srad']):
+        if all(col in columns for col in ['koi_stemp', 'koi_srad']):
             # Luminosidad estelar (Proxy, Stefan-Boltzmann)
-            df_eng['stellar_luminosity_proxy'] = df_eng['koi_srad']**2 * (df_eng['koi_stemp']/5778)**4
+            features['stellar_luminosity_proxy'] = columns['koi_srad']**2 * (columns['koi_stemp']/5778)**4
             
             # Temperatura de equilibrio (requiere distancia orbital)
-            if 'orbital_distance_au' in df_eng.columns:
-                df_eng['equilibrium_temp'] = (
-                    df_eng['koi_stemp'] * np.sqrt(df_eng['koi_srad'] / (2 * df_eng['orbital_distance_au'] + 1e-10))
+            if 'orbital_distance_au' in features:
+                features['equilibrium_temp'] = (
+                    columns['koi_stemp'] * np.sqrt(columns['koi_srad'] / (2 * features['orbital_distance_au'] + 1e-10))
                 )
-                df_eng['habitable_zone'] = (
-                    (df_eng['equilibrium_temp'] >= 250) & 
-                    (df_eng['equilibrium_temp'] <= 350) # Rango aproximado
+                features['habitable_zone'] = (
+                    (features['equilibrium_temp'] >= 250) & 
+                    (features['equilibrium_temp'] <= 350) # Rango aproximado
                 ).astype(int)
 
         # 3. Características de Calidad y Robustez
-        if 'koi_model_snr' in df_eng.columns:
-            df_eng['log_snr'] = np.log10(df_eng['koi_model_snr'] + 1e-10)
-            df_eng['snr_high_quality'] = (df_eng['koi_model_snr'] > 15).astype(int)
-            
-        logging.info(f"Features físicas creadas. Total columnas: {len(df_eng.columns)}")
-        return df_eng
+        if 'koi_model_snr' in columns:
+            features['log_snr'] = np.log10(columns['koi_model_snr'] + 1e-10)
+            features['snr_high_quality'] = (columns['koi_model_snr'] > 15).astype(int)
+
+        return features
 
     def create_statistical_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Crea características estadísticas (Skewness, Kurtosis, CV)."""
         logging.info("📊 Creando Características Estadísticas")
 
         df_stats = df.copy()
+        self.statistical_constants_ = {}
         
-        # Columnas clave (originales y algunas derivadas)
-        key_patterns = ['period', 'duration', 'depth', 'radius', 'temp', 'snr', 'mass', 'impact']
-        key_cols = [col for col in df_stats.columns 
-                   if any(pattern in col.lower() for pattern in key_patterns)]
-
-        for col in key_cols:
-            if df_stats[col].dtype in ['float64', 'int64'] and not col.endswith(('_skew', '_kurt', '_cv')):
-                values = df_stats[col].dropna()
-                if len(values) > 10:
-                    # Asimetría
-                    df_stats[f'{col}_skew'] = stats.skew(values)
-                    # Curtosis
-                    df_stats[f'{col}_kurt'] = stats.kurtosis(values)
-                    # Coeficiente de variación
-                    mean_val = values.mean()
-                    if abs(mean_val) > 1e-10:
-                        df_stats[f'{col}_cv'] = values.std() / abs(mean_val)
+        for col in self.statistical_columns(df_stats):
+            values = df_stats[col].dropna()
+            if len(values) > 10:
+                # Asimetría
+                self.statistical_constants_[f'{col}_skew'] = float(stats.skew(values))
+                # Curtosis
+                self.statistical_constants_[f'{col}_kurt'] = float(stats.kurtosis(values))
+                # Coeficiente de variación
+                mean_val = values.mean()
+                if abs(mean_val) > 1e-10:
+                    self.statistical_constants_[f'{col}_cv'] = float(values.std() / abs(mean_val))
+
+        for name, value in self.statistical_constants_.items():
+            df_stats[name] = value
 
         logging.info(f"Features estadísticas agregadas. Total columnas: {len(df_stats.columns)}")
         return df_stats
     
+    def statistical_columns(self, df: pd.DataFrame) -> list:
+        """Columnas clave (originales y algunas derivadas) que reciben _skew/_kurt/_cv."""
+        key_patterns = ['period', 'duration', 'depth', 'radius', 'temp', 'snr', 'mass', 'impact']
+        return [col for col in df.columns
+                if any(pattern in col.lower() for pattern in key_patterns)
+                and df[col].dtype in ['float64', 'int64'] and not col.endswith(('_skew', '_kurt', '_cv'))]
+
+    def statistical_constants_from_moments(self, moments: dict) -> dict:
+
+        """
+        Versión streaming de create_statistical_features: calcula las mismas constantes
+        a partir de acumuladores StreamingMoments ({columna: momentos}).
+        """
+        self.statistical_constants_ = {}
+        for col, acc in moments.items():
+            if acc.count > 10:
+                self.statistical_constants_[f'{col}_skew'] = acc.skewness
+                self.statistical_constants_[f'{col}_kurt'] = acc.kurtosis
+                if abs(acc.mean) > 1e-10:
+                    self.statistical_constants_[f'{col}_cv'] = acc.std / abs(acc.mean)
+        return self.statistical_constants_
+
     def _columns_exist(self, df, columns):
         """Función auxiliar."""
         return all(col in df.columns for col in columns)
\ No newline at end of file
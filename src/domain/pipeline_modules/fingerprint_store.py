@@ -0,0 +1,145 @@
+import logging
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from src.domain.pipeline_modules.mission_schema import CANONICAL_COLUMNS
+
+# Columnas que identifican el contenido de una fila del catálogo (features crudas + etiqueta)
+FINGERPRINT_COLUMNS = [col for col in CANONICAL_COLUMNS if col != 'koi_disposition'] + ['label', 'target_class']
+
+
+def row_fingerprints(frame: pd.DataFrame) -> np.ndarray:
+
+    """
+    Hash de 64 bits del contenido de cada fila (kepid, columnas crudas y etiqueta). Las columnas
+    numéricas se normalizan a float64 para que un cambio de dtype entre volcados del archivo
+    (p. ej. int -> float) no cuente como fila modificada.
+    """
+    columns = [col for col in FINGERPRINT_COLUMNS if col in frame.columns]
+    normalized = frame[columns].apply(
+        lambda values: values.astype(np.float64) if pd.api.types.is_numeric_dtype(values) else values
+    )
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy(dtype=np.uint64)
+
+
+def _occurrence_keys(hashes: np.ndarray) -> pd.MultiIndex:
+    """(hash, n-ésima aparición): filas idénticas repetidas se emparejan una a una."""
+    return pd.MultiIndex.from_arrays([hashes, pd.Series(hashes).groupby(hashes).cumcount().to_numpy()])
+
+
+@dataclass(frozen=True)
+class StoreDiff:
+
+    """
+    Resultado de comparar un volcado nuevo con el almacén: posiciones del almacén que se
+    mantienen, máscara de filas nuevas o modificadas del volcado y filas desaparecidas.
+    """
+    kept: np.ndarray
+    inserted: np.ndarray
+    deleted: int
+    changed_kepids: int
+
+    @property
+    def n_inserted(self) -> int:
+        return int(self.inserted.sum())
+
+    @property
+    def is_empty(self) -> bool:
+        return self.n_inserted == 0 and self.deleted == 0
+
+
+class FingerprintStore:
+
+    """
+    Responsabilidad: Memoria del último entrenamiento por fila del catálogo (kepid + hash del
+    contenido) junto con su fila de features ya transformada. diff() compara un volcado nuevo
+    del archivo con el almacén y update() construye el almacén siguiente: las filas sin cambios
+    conservan sus features y solo las nuevas o modificadas necesitan transformarse. Las
+    features viven en el espacio del transformador con el que se construyó el almacén.
+    """
+
+    ARTIFACT_VERSION = 1
+
+    def __init__(self, kepid: np.ndarray, row_hash: np.ndarray, target: np.ndarray, features: np.ndarray,
+                 feature_names: List[str], reference_median: np.ndarray = None):
+        self.kepid = np.asarray(kepid, dtype=np.float64)
+        self.row_hash = np.asarray(row_hash, dtype=np.uint64)
+        self.target = np.asarray(target, dtype=np.int64)
+        self.features = np.asarray(features, dtype=np.float64)
+        self.feature_names = list(feature_names)
+        if not (len(self.kepid) == len(self.row_hash) == len(self.target) == len(self.features)):
+            raise ValueError("Dimensiones inconsistentes entre las columnas del almacén de huellas.")
+        if self.features.shape[1] != len(self.feature_names):
+            raise ValueError("El número de features no coincide con feature_names.")
+        # Mediana por feature al construir el almacén (referencia para medir desplazamientos)
+        self.reference_median = (np.asarray(reference_median, dtype=np.float64) if reference_median is not None
+                                 else self.median())
+
+    @classmethod
+    def build(cls, frame: pd.DataFrame, features: np.ndarray, feature_names: List[str]) -> "FingerprintStore":
+        """Almacén de un entrenamiento completo: `frame` son las filas filtradas y `features` su matriz."""
+        return cls(frame['kepid'].to_numpy(dtype=np.float64), row_fingerprints(frame),
+                   frame['target_class'].to_numpy(), features, feature_names)
+
+    def __len__(self) -> int:
+        return len(self.row_hash)
+
+    def median(self) -> np.ndarray:
+        if len(self) == 0:
+            return np.zeros(len(self.feature_names))
+        return np.median(self.features, axis=0)
+
+    def median_shift(self) -> float:
+
+        """
+        Máximo desplazamiento de la mediana de una feature respecto a la referencia. Con las
+        features escaladas por el RobustScaler está en unidades de IQR del entrenamiento completo.
+        """
+        return float(np.max(np.abs(self.median() - self.reference_median), initial=0.0))
+
+    def diff(self, frame: pd.DataFrame) -> StoreDiff:
+
+        """Compara las filas filtradas de un volcado nuevo con el almacén (por kepid + contenido)."""
+        hashes = row_fingerprints(frame)
+        stored_keys, new_keys = _occurrence_keys(self.row_hash), _occurrence_keys(hashes)
+        kept_mask = stored_keys.isin(new_keys)
+        inserted = ~new_keys.isin(stored_keys)
+
+        new_kepids = frame['kepid'].to_numpy(dtype=np.float64)[inserted]
+        changed = np.intersect1d(new_kepids, self.kepid[~kept_mask]).size
+        return StoreDiff(kept=np.flatnonzero(kept_mask), inserted=inserted,
+                         deleted=int((~kept_mask).sum()), changed_kepids=int(changed))
+
+    def update(self, frame: pd.DataFrame, diff: StoreDiff, new_features: np.ndarray) -> "FingerprintStore":
+
+        """
+        Almacén siguiente: filas conservadas (en su orden) seguidas de las insertadas (en el orden
+        del volcado). La mediana de referencia no cambia: sigue siendo la del transformador.
+        """
+        inserted = frame[diff.inserted]
+        return FingerprintStore(
+            kepid=np.concatenate([self.kepid[diff.kept], inserted['kepid'].to_numpy(dtype=np.float64)]),
+            row_hash=np.concatenate([self.row_hash[diff.kept], row_fingerprints(inserted)]),
+            target=np.concatenate([self.target[diff.kept], inserted['target_class'].to_numpy(dtype=np.int64)]),
+            features=np.vstack([self.features[diff.kept], np.asarray(new_features, dtype=np.float64).reshape(-1, len(self.feature_names))]),
+            feature_names=self.feature_names,
+            reference_median=self.reference_median,
+        )
+
+    # --- Persistencia (npz sin pickle, junto a la versión del modelo) ---
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            np.savez(f, version=self.ARTIFACT_VERSION, kepid=self.kepid, row_hash=self.row_hash, target=self.target,
+                     features=self.features, feature_names=np.array(self.feature_names),
+                     reference_median=self.reference_median)
+        logging.info(f"🧬 Almacén de huellas guardado en: {path} ({len(self):,} filas)")
+
+    @classmethod
+    def load(cls, path: str) -> "FingerprintStore":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['kepid'], data['row_hash'], data['target'], data['features'],
+                       data['feature_names'].tolist(), reference_median=data['reference_median'])
@@ -0,0 +1,133 @@
+import json
+import logging
+from typing import Dict, List, Mapping, Tuple
+
+import numpy as np
+
+from src.domain.exceptions.exceptions import InsufficientDataError
+from src.domain.pipeline_modules.feature_creator import FeatureCreator
+
+
+class InferenceTransformer:
+
+    """
+    Responsabilidad: Aplicar en inferencia los parámetros aprendidos en el entrenamiento.
+    Agrupa en un único artefacto compacto:
+    1. Medianas de imputación (DataCleaner.handle_missing_values).
+    2. Constantes estadísticas _skew/_kurt/_cv (FeatureCreator.create_statistical_features).
+    3. Centro y escala del RobustScaler (DataFinalizer.scale_features).
+    transform() convierte columnas KOI crudas en la matriz escalada de features en una
+    sola pasada NumPy, sin construir DataFrames.
+    """
+
+    ARTIFACT_VERSION = 1
+
+    def __init__(self, feature_names: List[str], imputation_medians: Dict[str, float],
+                 statistical_constants: Dict[str, float], scaler_center: List[float], scaler_scale: List[float]):
+        self.feature_names = list(feature_names)
+        self.imputation_medians = dict(imputation_medians)
+        self.statistical_constants = dict(statistical_constants)
+        self.scaler_center = np.asarray(scaler_center, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+
+        if not (len(self.feature_names) == len(self.scaler_center) == len(self.scaler_scale)):
+            raise ValueError("Dimensiones inconsistentes entre feature_names y los parámetros del scaler.")
+
+    @property
+    def raw_features(self) -> List[str]:
+        """Columnas crudas que el transformador sabe imputar (entrada esperada)."""
+        return list(self.imputation_medians)
+
+    def scaled_bounds(self, filters: Mapping[str, tuple]) -> Dict[str, Tuple[float, float]]:
+
+        """
+        Traslada límites en unidades físicas ({columna: (mín, máx, ...)}, p. ej. los filtros
+        astronómicos) al espacio escalado de las features que son columnas directas.
+        """
+        bounds = {}
+        for j, name in enumerate(self.feature_names):
+            if name in filters and name not in self.statistical_constants:
+                low, high = filters[name][:2]
+                center, scale = self.scaler_center[j], self.scaler_scale[j]
+                bounds[name] = ((low - center) / scale, (high - center) / scale)
+        return bounds
+
+    def transform(self, batch: Mapping) -> np.ndarray:
+
+        """
+        Transforma un lote de columnas crudas (DataFrame o dict de arrays) en la matriz
+        N x F escalada, en el orden de feature_names. Columnas ausentes o NaN se imputan
+        con la mediana de entrenamiento.
+        """
+        n_rows = self._batch_length(batch)
+
+        # 1. Imputación vectorizada de las columnas crudas
+        columns = {}
+        for name, median in self.imputation_medians.items():
+            if name in batch:
+                values = np.asarray(batch[name], dtype=np.float64)
+                columns[name] = np.where(np.isnan(values), median, values)
+            else:
+                columns[name] = np.full(n_rows, median)
+
+        # 2. Features físicas (misma definición que el entrenamiento)
+        columns.update(FeatureCreator.astronomical_feature_arrays(columns))
+
+        # 3. Ensamblado + constantes estadísticas + escalado in-place
+        X = np.empty((n_rows, len(self.feature_names)), dtype=np.float64)
+        for j, name in enumerate(self.feature_names):
+            if name in self.statistical_constants:
+                X[:, j] = self.statistical_constants[name]
+            elif name in columns:
+                X[:, j] = columns[name]
+            else:
+                raise ValueError(f"El transformador no sabe construir la feature '{name}'.")
+
+        X -= self.scaler_center
+        X /= self.scaler_scale
+        return X
+
+    @staticmethod
+    def _batch_length(batch: Mapping) -> int:
+        if hasattr(batch, 'columns'):
+            n_rows = len(batch)
+        else:
+            lengths = {len(np.atleast_1d(values)) for values in batch.values()}
+            if len(lengths) > 1:
+                raise ValueError(f"Todas las columnas deben tener la misma longitud. Longitudes recibidas: {sorted(lengths)}")
+            n_rows = lengths.pop() if lengths else 0
+        if n_rows == 0:
+            raise InsufficientDataError("El lote a transformar está vacío.")
+        return n_rows
+
+    # --- Persistencia (artefacto JSON compacto, sin dependencia de sklearn) ---
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.ARTIFACT_VERSION,
+            "feature_names": self.feature_names,
+            "imputation_medians": self.imputation_medians,
+            "statistical_constants": self.statistical_constants,
+            "scaler_center": self.scaler_center.tolist(),
+            "scaler_scale": self.scaler_scale.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "InferenceTransformer":
+        return cls(
+            feature_names=data["feature_names"],
+            imputation_medians=data["imputation_medians"],
+            statistical_constants=data["statistical_constants"],
+            scaler_center=data["scaler_center"],
+            scaler_scale=data["scaler_scale"],
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=4)
+        logging.info(f"🧪 Transformador de inferencia guardado en: {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "InferenceTransformer":
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,151 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Conjunto canónico de columnas (nombres y unidades del catálogo KOI de Kepler, con el que se entrena)
+CANONICAL_COLUMNS = [
+    'kepid', 'koi_disposition', 'koi_period', 'koi_duration',
+    'koi_depth', 'koi_model_snr', 'koi_impact', 'koi_prad',
+    'koi_steff', 'koi_slogg', 'koi_srad', 'koi_smass'
+]
+
+# Misión de origen de cada fila en un catálogo mixto (ver to_canonical); no es una feature
+MISSION_COLUMN = 'mission'
+
+# Mapeos declarativos {columna de la misión: (columna canónica, factor de conversión de unidades)}
+KEPLER_COLUMN_MAP = {col: (col, None) for col in CANONICAL_COLUMNS}
+
+TESS_COLUMN_MAP = {
+    'tid': ('kepid', None),                       # Identificador del objetivo (TIC)
+    'tfopwg_disp': ('koi_disposition', None),
+    'pl_orbper': ('koi_period', None),            # días
+    'pl_trandurh': ('koi_duration', None),        # horas
+    'pl_trandep': ('koi_depth', None),            # ppm
+    'pl_rade': ('koi_prad', None),                # radios terrestres
+    'st_teff': ('koi_steff', None),               # K
+    'st_logg': ('koi_slogg', None),               # log10(cm/s^2)
+    'st_rad': ('koi_srad', None),                 # radios solares
+}
+
+K2_COLUMN_MAP = {
+    'disposition': ('koi_disposition', None),
+    'pl_orbper': ('koi_period', None),            # días
+    'pl_trandur': ('koi_duration', None),         # horas
+    'pl_trandep': ('koi_depth', 1e4),             # % -> ppm
+    'pl_rade': ('koi_prad', None),
+    'st_teff': ('koi_steff', None),
+    'st_logg': ('koi_slogg', None),
+    'st_rad': ('koi_srad', None),
+    'st_mass': ('koi_smass', None),               # masas solares
+}
+
+# Disposiciones TFOPWG -> vocabulario KOI (CP/KP confirmados, PC/APC candidatos, FP/FA falsos positivos)
+TESS_DISPOSITIONS = {
+    'CP': 'CONFIRMED', 'KP': 'CONFIRMED',
+    'PC': 'CANDIDATE', 'APC': 'CANDIDATE',
+    'FP': 'FALSE POSITIVE', 'FA': 'FALSE POSITIVE',
+}
+
+
+class MissionSchema:
+
+    """
+    Responsabilidad: Traducir las columnas de un catálogo de misión (TESS TOI, K2, ...) al
+    conjunto canónico de features KOI, con renombrado y conversiones de unidades vectorizadas.
+    `signature` son las columnas que identifican el catálogo en la detección automática.
+    """
+
+    def __init__(self, name: str, column_map: Dict[str, Tuple[str, Optional[float]]],
+                 signature: Iterable[str], dispositions: Dict[str, str] = None):
+        self.name = name
+        self.column_map = dict(column_map)
+        self.signature = tuple(signature)
+        self.dispositions = dispositions
+
+    @property
+    def canonical_columns(self) -> List[str]:
+        """Columnas canónicas que la misión publica."""
+        return [target for target, _ in self.column_map.values()]
+
+    def matches(self, columns: Iterable[str]) -> bool:
+        return set(self.signature) <= set(columns)
+
+    def source_columns(self, columns: Iterable[str]) -> List[str]:
+        """Columnas del archivo que este esquema necesita (para la proyección al leer)."""
+        available = set(columns)
+        return [col for col in self.column_map if col in available]
+
+    def to_canonical(self, df: pd.DataFrame) -> pd.DataFrame:
+
+        """Frame con columnas canónicas: renombrado + factores de unidad + disposiciones."""
+        canonical = {}
+        for source, (target, factor) in self.column_map.items():
+            if source not in df.columns:
+                continue
+            values = df[source]
+            if factor is not None:
+                values = pd.to_numeric(values, errors='coerce') * factor
+            canonical[target] = values
+        frame = pd.DataFrame(canonical, index=df.index)
+        if self.dispositions and 'koi_disposition' in frame.columns:
+            disposition = frame['koi_disposition'].astype('string').str.strip().str.upper()
+            frame['koi_disposition'] = disposition.map(self.dispositions).astype(object)
+        return frame
+
+
+KEPLER_SCHEMA = MissionSchema('kepler', KEPLER_COLUMN_MAP, signature=('koi_period',))
+TESS_SCHEMA = MissionSchema('tess', TESS_COLUMN_MAP, signature=('pl_orbper', 'pl_trandurh'),
+                            dispositions=TESS_DISPOSITIONS)
+K2_SCHEMA = MissionSchema('k2', K2_COLUMN_MAP, signature=('pl_orbper', 'pl_trandur', 'disposition'))
+
+MISSION_SCHEMAS = {schema.name: schema for schema in (KEPLER_SCHEMA, TESS_SCHEMA, K2_SCHEMA)}
+
+
+def detect_missions(columns: Iterable[str]) -> List[MissionSchema]:
+
+    """Esquemas cuyas columnas firma están presentes (un catálogo mixto detecta varios)."""
+    columns = set(columns)
+    detected = [schema for schema in MISSION_SCHEMAS.values() if schema.matches(columns)]
+    return detected or [KEPLER_SCHEMA]
+
+
+def publishing_missions(column: str) -> List[str]:
+    """Misiones cuyo catálogo publica la columna canónica `column`."""
+    return [schema.name for schema in MISSION_SCHEMAS.values() if column in schema.canonical_columns]
+
+
+def row_missions(df: pd.DataFrame, schemas: List[MissionSchema]) -> np.ndarray:
+
+    """
+    Misión de origen de cada fila: la primera cuyas columnas firma tiene la fila informadas
+    (todas; si no, alguna). Las filas sin ninguna se atribuyen a la primera misión detectada.
+    """
+    missions = np.full(len(df), schemas[0].name, dtype=object)
+    assigned = np.zeros(len(df), dtype=bool)
+    for complete in (True, False):
+        for schema in schemas:
+            present = df[list(schema.signature)].notna()
+            has_signature = (present.all(axis=1) if complete else present.any(axis=1)).to_numpy()
+            missions[has_signature & ~assigned] = schema.name
+            assigned |= has_signature
+    return missions
+
+
+def to_canonical(df: pd.DataFrame, schemas: List[MissionSchema] = None) -> pd.DataFrame:
+
+    """
+    Convierte un catálogo (de una misión o mixto) al esquema canónico. En un catálogo mixto
+    cada fila toma el valor de la primera misión que lo tenga (combine_first por columnas) y
+    la columna MISSION_COLUMN registra su misión de origen, para que los filtros científicos
+    no exijan a una fila TESS una columna que solo publica Kepler (p. ej. koi_model_snr).
+    """
+    schemas = schemas or detect_missions(df.columns)
+    result = None
+    for schema in schemas:
+        frame = schema.to_canonical(df)
+        result = frame if result is None else result.combine_first(frame)
+    result = result[[col for col in CANONICAL_COLUMNS if col in result.columns]]
+    if len(schemas) > 1:
+        result = result.assign(**{MISSION_COLUMN: row_missions(df, schemas)})
+    return result
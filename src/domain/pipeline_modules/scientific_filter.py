@@ -0,0 +1,81 @@
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+
+from src.domain.pipeline_modules.mission_schema import MISSION_COLUMN, publishing_missions
+
+# Filtros de calidad basados en estándares NASA: {columna: (mínimo, máximo, descripción)}
+KEPLER_FILTERS = {
+    'koi_period': (0.5, 1000, 'Período orbital válido'),
+    'koi_duration': (0.5, 48, 'Duración tránsito observable'),
+    'koi_depth': (10, 100000, 'Profundidad detectable'),
+    # 'koi_kepmag': (6, 20, 'Magnitud Kepler válida'), # Omitida por no estar en todos los datasets
+    'koi_model_snr': (7.1, 1000, 'SNR umbral NASA')
+}
+
+# Mismos criterios físicos para el catálogo TOI de TESS (sin SNR publicado). Las claves son
+# canónicas: el catálogo se traduce al esquema KOI (mission_schema) antes de filtrar
+TESS_FILTERS = {
+    'koi_period': (0.5, 1000, 'Período orbital válido'),          # pl_orbper
+    'koi_duration': (0.5, 48, 'Duración tránsito observable'),    # pl_trandurh
+    'koi_depth': (10, 100000, 'Profundidad detectable'),          # pl_trandep
+    'koi_srad': (0.05, 100, 'Radio estelar físico'),              # st_rad
+}
+
+MISSION_FILTER_PRESETS = {
+    'kepler': KEPLER_FILTERS,
+    'tess': TESS_FILTERS,
+}
+
+
+class ScientificFilter:
+
+    """
+    Responsabilidad: Compilar la tabla de filtros astronómicos en una única máscara booleana.
+    Cada criterio se evalúa por columnas en NumPy y la máscara se aplica una sola vez.
+    Los conteos de rechazo por filtro salen de la misma pasada (mismo orden que la tabla:
+    una fila se atribuye al primer filtro que incumple). Reutilizable en inferencia para
+    rechazar candidatos fuera del dominio de entrenamiento antes de llegar al modelo.
+    """
+
+    def __init__(self, filters: Dict[str, Tuple[float, float, str]] = None):
+        self.filters = dict(KEPLER_FILTERS if filters is None else filters)
+
+    @classmethod
+    def for_mission(cls, mission: str) -> "ScientificFilter":
+        """Preset de filtros por misión ('kepler', 'tess')."""
+        try:
+            return cls(MISSION_FILTER_PRESETS[mission.lower()])
+        except KeyError:
+            raise ValueError(f"Misión desconocida '{mission}'. Opciones: {sorted(MISSION_FILTER_PRESETS)}")
+
+    def evaluate(self, columns: Mapping, base_mask: np.ndarray = None) -> Tuple[np.ndarray, Dict[str, int]]:
+
+        """
+        Evalúa los filtros sobre un DataFrame o dict de arrays.
+        Retorna (máscara de filas aceptadas, {descripción: filas rechazadas}).
+        Solo se aplican los filtros cuya columna existe; NaN se rechaza. `base_mask`
+        permite partir de filas ya descartadas (p. ej. sin label), que no se cuentan.
+        En un catálogo mixto (columna MISSION_COLUMN) cada criterio se evalúa solo sobre
+        las filas cuya misión publica la columna: el SNR de Kepler no rechaza filas TESS.
+        """
+        mask = np.ones(self._length(columns), dtype=bool) if base_mask is None else np.array(base_mask, dtype=bool)
+        rejections = {}
+        missions = np.asarray(columns[MISSION_COLUMN]) if MISSION_COLUMN in columns else None
+        for col, (min_val, max_val, desc) in self.filters.items():
+            if col not in columns:
+                continue
+            values = np.asarray(columns[col], dtype=np.float64)
+            # Las comparaciones con NaN son False: los NaN quedan rechazados
+            passes = (values >= min_val) & (values <= max_val)
+            if missions is not None:
+                passes |= ~np.isin(missions, publishing_missions(col))
+            rejections[desc] = int(np.count_nonzero(mask & ~passes))
+            mask &= passes
+        return mask, rejections
+
+    @staticmethod
+    def _length(columns: Mapping) -> int:
+        if hasattr(columns, 'columns'):
+            return len(columns)
+        return max((len(np.atleast_1d(values)) for values in columns.values()), default=0)
@@ -0,0 +1,285 @@
+import numpy as np
+
+
+class StreamingMoments:
+
+    """
+    Acumulador combinable (mergeable) de momentos centrales hasta orden 4.
+    Permite calcular media, desviación, asimetría y curtosis por chunks sin
+    mantener los datos en memoria (fórmulas de Pébay para combinar particiones).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+
+    def update(self, values) -> "StreamingMoments":
+        """Añade un bloque de valores (los NaN se ignoran)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        block = StreamingMoments()
+        block.count = len(values)
+        block.mean = float(values.mean())
+        deviations = values - block.mean
+        block.m2 = float(np.dot(deviations, deviations))
+        block.m3 = float(np.sum(deviations ** 3))
+        block.m4 = float(np.sum(deviations ** 4))
+        return self.merge(block)
+
+    def merge(self, other: "StreamingMoments") -> "StreamingMoments":
+        """Combina otro acumulador en este (in-place)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.m3, self.m4 = other.count, other.mean, other.m2, other.m3, other.m4
+            return self
+
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+
+        m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+        m3 = (self.m3 + other.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + other.m4 + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+              + 6 * delta ** 2 * (na ** 2 * other.m2 + nb ** 2 * self.m2) / n ** 2
+              + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+
+        self.count, self.mean, self.m2, self.m3, self.m4 = n, self.mean + delta * nb / n, m2, m3, m4
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Varianza muestral (ddof=1, igual que pandas)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    @property
+    def skewness(self) -> float:
+        """Asimetría sesgada (equivalente a scipy.stats.skew con bias=True)."""
+        if self.count == 0 or self.m2 == 0:
+            return float('nan')
+        return float(np.sqrt(self.count) * self.m3 / self.m2 ** 1.5)
+
+    @property
+    def kurtosis(self) -> float:
+        """Curtosis de Fisher sesgada (equivalente a scipy.stats.kurtosis por defecto)."""
+        if self.count == 0 or self.m2 == 0:
+            return float('nan')
+        return float(self.count * self.m4 / self.m2 ** 2 - 3.0)
+
+
+class QuantileSketch:
+
+    """
+    Sketch de cuantiles ponderado, combinable y de memoria acotada.
+    Mientras no supera 2 x capacity puntos es exacto (mismo resultado que np.quantile);
+    al superarlo se comprime a `capacity` centroides de igual peso, con un error de
+    rango del orden de 1/capacity.
+    """
+
+    def __init__(self, capacity: int = 2048):
+        if capacity < 2:
+            raise ValueError("capacity debe ser >= 2.")
+        self.capacity = capacity
+        self._values = np.empty(0, dtype=np.float64)
+        self._weights = np.empty(0, dtype=np.float64)
+
+    @property
+    def total_weight(self) -> float:
+        return float(self._weights.sum())
+
+    def update(self, values, weights=None) -> "QuantileSketch":
+        """Añade un bloque de valores (con pesos opcionales); los NaN se ignoran."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64).ravel()
+        valid = ~np.isnan(values)
+        self._values = np.concatenate([self._values, values[valid]])
+        self._weights = np.concatenate([self._weights, weights[valid]])
+        if len(self._values) > 2 * self.capacity:
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        return self.update(other._values, other._weights)
+
+    def _compress(self) -> None:
+        order = np.argsort(self._values, kind='stable')
+        values, weights = self._values[order], self._weights[order]
+        centers = np.cumsum(weights) - weights / 2
+        bins = np.minimum((centers / weights.sum() * self.capacity).astype(np.int64), self.capacity - 1)
+
+        bin_weights = np.bincount(bins, weights=weights, minlength=self.capacity)
+        bin_sums = np.bincount(bins, weights=weights * values, minlength=self.capacity)
+        occupied = bin_weights > 0
+        self._values = bin_sums[occupied] / bin_weights[occupied]
+        self._weights = bin_weights[occupied]
+
+    def quantile(self, q: float) -> float:
+        """Cuantil q en [0, 1] con interpolación lineal (como np.quantile para pesos unitarios)."""
+        if len(self._values) == 0:
+            return float('nan')
+        order = np.argsort(self._values, kind='stable')
+        values, weights = self._values[order], self._weights[order]
+        centers = np.cumsum(weights) - weights / 2
+        target = q * (weights.sum() - 1) + 0.5
+        return float(np.interp(target, centers, values))
+
+
+class FeatureDistributionSketch:
+
+    """
+    Sketch de memoria constante de la distribución de F features a la vez (matriz N x F).
+    Por feature guarda un histograma sobre bordes fijos (p. ej. los cuantiles del
+    entrenamiento), media/varianza en línea (combinación de Chan), mínimo/máximo, NaN y
+    conteos fuera de [lower, upper]. update() es vectorizado y su coste por fila no depende
+    de cuántas filas se hayan visto (O(F x bordes)).
+    """
+
+    def __init__(self, edges, lower=None, upper=None):
+        self.edges = np.ascontiguousarray(np.atleast_2d(edges), dtype=np.float64)
+        n_features, n_edges = self.edges.shape
+        self.lower = np.full(n_features, -np.inf) if lower is None else np.asarray(lower, dtype=np.float64)
+        self.upper = np.full(n_features, np.inf) if upper is None else np.asarray(upper, dtype=np.float64)
+        self.counts = np.zeros((n_features, n_edges + 1), dtype=np.int64)
+        self.count = np.zeros(n_features, dtype=np.int64)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.minimum = np.full(n_features, np.inf)
+        self.maximum = np.full(n_features, -np.inf)
+        self.missing = np.zeros(n_features, dtype=np.int64)
+        self.below = np.zeros(n_features, dtype=np.int64)
+        self.above = np.zeros(n_features, dtype=np.int64)
+        self._offsets = np.arange(n_features) * (n_edges + 1)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.edges)
+
+    def update(self, matrix) -> "FeatureDistributionSketch":
+        """Añade un bloque N x F (las filas no finitas cuentan como `missing` en su feature)."""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.shape[1] != self.n_features:
+            raise ValueError(f"Se esperaban {self.n_features} features, pero se recibieron {matrix.shape[1]}.")
+        finite = np.isfinite(matrix)
+        if finite.all():
+            # Camino habitual (sin NaN): sin máscaras intermedias
+            return self._update_finite(matrix)
+
+        values = np.where(finite, matrix, 0.0)
+        bins = (values[:, :, None] >= self.edges[None, :, :]).sum(axis=2)
+        self.counts += np.bincount((bins + self._offsets)[finite], minlength=self.counts.size).reshape(self.counts.shape)
+
+        n_block = finite.sum(axis=0)
+        block_mean = np.divide(values.sum(axis=0), n_block, out=np.zeros(self.n_features), where=n_block > 0)
+        block_m2 = (np.where(finite, values - block_mean, 0.0) ** 2).sum(axis=0)
+        self._merge_moments(n_block, block_mean, block_m2)
+
+        self.minimum = np.minimum(self.minimum, np.where(finite, matrix, np.inf).min(axis=0))
+        self.maximum = np.maximum(self.maximum, np.where(finite, matrix, -np.inf).max(axis=0))
+        self.missing += len(matrix) - n_block
+        self.below += (finite & (values < self.lower)).sum(axis=0)
+        self.above += (finite & (values > self.upper)).sum(axis=0)
+        return self
+
+    def _update_finite(self, matrix: np.ndarray) -> "FeatureDistributionSketch":
+        # Bin = número de bordes <= valor (igual que np.searchsorted(..., side='right'))
+        bins = (matrix[:, :, None] >= self.edges[None, :, :]).sum(axis=2)
+        self.counts += np.bincount((bins + self._offsets).ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+        n_rows = len(matrix)
+        block_mean = matrix.mean(axis=0)
+        block_m2 = ((matrix - block_mean) ** 2).sum(axis=0) if n_rows > 1 else np.zeros(self.n_features)
+        self._merge_moments(n_rows, block_mean, block_m2)
+
+        np.minimum(self.minimum, matrix.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, matrix.max(axis=0), out=self.maximum)
+        self.below += (matrix < self.lower).sum(axis=0)
+        self.above += (matrix > self.upper).sum(axis=0)
+        return self
+
+    def _merge_moments(self, n_block, block_mean: np.ndarray, block_m2: np.ndarray) -> None:
+        # Combinación de Chan et al. de (n, media, M2), feature a feature
+        total = self.count + n_block
+        delta = block_mean - self.mean
+        weight = np.divide(n_block, total, out=np.zeros(self.n_features), where=total > 0)
+        self.m2 += block_m2 + delta ** 2 * self.count * weight
+        self.mean += delta * weight
+        self.count = total
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Varianza muestral por feature (ddof=1; NaN con menos de 2 valores)."""
+        return np.divide(self.m2, self.count - 1, out=np.full(self.n_features, np.nan), where=self.count > 1)
+
+    def proportions(self) -> np.ndarray:
+        """Fracción de valores por bin (F x bins); filas a cero si la feature no tiene datos."""
+        return np.divide(self.counts, self.count[:, None], out=np.zeros(self.counts.shape), where=self.count[:, None] > 0)
+
+    def quantiles(self, qs) -> np.ndarray:
+
+        """
+        Cuantiles aproximados (F x len(qs)) interpolando linealmente dentro de cada bin.
+        Los bins extremos se acotan con el mínimo y el máximo observados.
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        result = np.full((self.n_features, len(qs)), np.nan)
+        for j in np.flatnonzero(self.count > 0):
+            bounds = np.concatenate([[self.minimum[j]], self.edges[j], [self.maximum[j]]])
+            bounds = np.clip(bounds, self.minimum[j], self.maximum[j])
+            cdf = np.concatenate([[0.0], np.cumsum(self.counts[j]) / self.count[j]])
+            result[j] = np.interp(qs, cdf, bounds)
+        return result
+
+    # --- Persistencia (listas JSON; los límites infinitos se guardan como null) ---
+
+    def to_dict(self) -> dict:
+        def finite_or_none(array):
+            return [float(v) if np.isfinite(v) else None for v in array]
+
+        return {
+            "edges": self.edges.tolist(),
+            "lower": finite_or_none(self.lower),
+            "upper": finite_or_none(self.upper),
+            "counts": self.counts.tolist(),
+            "count": self.count.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+            "minimum": finite_or_none(self.minimum),
+            "maximum": finite_or_none(self.maximum),
+            "missing": self.missing.tolist(),
+            "below": self.below.tolist(),
+            "above": self.above.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FeatureDistributionSketch":
+        def array(values, default):
+            return np.array([default if v is None else v for v in values], dtype=np.float64)
+
+        sketch = cls(data["edges"], array(data["lower"], -np.inf), array(data["upper"], np.inf))
+        sketch.counts = np.asarray(data["counts"], dtype=np.int64)
+        sketch.count = np.asarray(data["count"], dtype=np.int64)
+        sketch.mean = np.asarray(data["mean"], dtype=np.float64)
+        sketch.m2 = np.asarray(data["m2"], dtype=np.float64)
+        sketch.minimum = array(data["minimum"], np.inf)
+        sketch.maximum = array(data["maximum"], -np.inf)
+        sketch.missing = np.asarray(data["missing"], dtype=np.int64)
+        sketch.below = np.asarray(data["below"], dtype=np.int64)
+        sketch.above = np.asarray(data["above"], dtype=np.int64)
+        return sketch
+
+    def empty_like(self) -> "FeatureDistributionSketch":
+        """Sketch vacío con los mismos bordes y límites (p. ej. para la ventana de serving)."""
+        return FeatureDistributionSketch(self.edges, self.lower, self.upper)
@@ -0,0 +1,92 @@
+import logging
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+from astropy.timeseries import BoxLeastSquares
+
+from src.domain.entities.exoplanet import LightCurve
+from src.domain.exceptions.exceptions import InsufficientDataError
+
+# Columnas del catálogo KOI que produce la búsqueda (mismas unidades que el archivo NASA)
+TRANSIT_COLUMNS = ('koi_period', 'koi_duration', 'koi_depth', 'koi_model_snr', 'koi_time0bk')
+
+
+class TransitSearch:
+
+    """
+    Responsabilidad: Buscar tránsitos periódicos en una curva de luz con Box Least Squares.
+    Estima período [días], duración [horas], profundidad [ppm] y SNR con las columnas y
+    unidades del catálogo KOI, de modo que la salida entra directamente en el pipeline de
+    features (filtros científicos -> InferenceTransformer -> modelo).
+    Espera una curva ya limpia (sigma_clip) y aplanada (detrend); el flujo se usa relativo
+    a su mediana.
+    """
+
+    DEFAULT_DURATIONS_HOURS = (1.0, 2.0, 3.0, 5.0, 8.0, 12.0)
+    MIN_POINTS = 50
+
+    def __init__(self, min_period: float = 0.5, max_period: Optional[float] = None,
+                 durations_hours: Sequence[float] = DEFAULT_DURATIONS_HOURS, frequency_factor: float = 1.0):
+        self.min_period = min_period
+        # Sin máximo: la mitad de la ventana observada (al menos dos tránsitos)
+        self.max_period = max_period
+        self.durations_hours = tuple(durations_hours)
+        self.frequency_factor = frequency_factor
+
+    def search(self, light_curve: LightCurve) -> Dict[str, float]:
+
+        """Ejecuta el periodograma BLS y retorna los parámetros del pico de mayor potencia."""
+        if len(light_curve) < self.MIN_POINTS:
+            raise InsufficientDataError(
+                f"La curva de luz tiene {len(light_curve)} puntos; se requieren al menos {self.MIN_POINTS}.")
+
+        time = light_curve.time
+        reference = np.median(light_curve.flux)
+        flux = light_curve.flux / reference
+        error = np.abs(light_curve.error / reference)
+
+        baseline = float(time.max() - time.min())
+        max_period = self.max_period or baseline / 2.0
+        durations = np.asarray(self.durations_hours) / 24.0
+        durations = durations[durations < self.min_period]
+        if max_period <= self.min_period or len(durations) == 0:
+            raise InsufficientDataError(
+                f"Ventana de observación ({baseline:.2f} d) insuficiente para buscar períodos >= {self.min_period} d.")
+
+        bls = BoxLeastSquares(time, flux, dy=error)
+        periodogram = bls.autopower(durations, minimum_period=self.min_period, maximum_period=max_period,
+                                    frequency_factor=self.frequency_factor)
+        best = int(np.nanargmax(periodogram.power))
+        period, duration = periodogram.period[best], periodogram.duration[best]
+
+        # Refinamiento barato de la duración solo en el período ganador (la grilla gruesa sesga la profundidad)
+        fine_durations = np.linspace(0.5 * duration, min(1.5 * duration, 0.99 * self.min_period), 21)
+        refined = bls.power(np.full(len(fine_durations), period), fine_durations)
+        best = int(np.nanargmax(refined.power))
+
+        result = {
+            'koi_period': float(period),
+            'koi_duration': float(refined.duration[best] * 24.0),
+            'koi_depth': float(refined.depth[best] * 1e6),
+            'koi_model_snr': float(refined.depth_snr[best]),
+            'koi_time0bk': float(refined.transit_time[best]),
+        }
+        logging.info(f"🔭 BLS: período={result['koi_period']:.4f} d, duración={result['koi_duration']:.2f} h, "
+                     f"profundidad={result['koi_depth']:.0f} ppm, SNR={result['koi_model_snr']:.1f}")
+        return result
+
+    def search_many(self, light_curves: Iterable[LightCurve]) -> Dict[str, np.ndarray]:
+
+        """
+        Busca tránsitos en varias curvas y retorna columnas (dict de arrays) listas para
+        ExoplanetService.predict_candidates. Las curvas sin datos suficientes quedan en NaN
+        (los filtros científicos las rechazan).
+        """
+        rows = []
+        for light_curve in light_curves:
+            try:
+                rows.append(self.search(light_curve))
+            except InsufficientDataError as e:
+                logging.warning(f"Curva de luz omitida en la búsqueda BLS: {e}")
+                rows.append(dict.fromkeys(TRANSIT_COLUMNS, np.nan))
+        return {col: np.array([row[col] for row in rows], dtype=np.float64) for col in TRANSIT_COLUMNS}
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 
 class MLRepository(ABC):
     """
@@ -17,6 +17,14 @@ class MLRepository(ABC):
         """Realiza una predicción en base a las features de entrada."""
         pass
 
+    @abstractmethod
+    def predict_batch(self, features_matrix: Sequence[Sequence[float]]) -> Dict[str, Any]:
+        """
+        Realiza predicciones vectorizadas sobre una matriz N x F.
+        Retorna un resultado columnar: listas 'predictions' y 'confidences' alineadas por fila.
+        """
+        pass
+
     @abstractmethod
     def get_feature_names(self) -> List[str]:
         """Obtiene la lista de características esperadas (57 en v3)."""
@@ -25,4 +33,12 @@ class MLRepository(ABC):
     @abstractmethod
     def get_feature_importance(self) -> Optional[Dict[str, float]]:
         """Obtiene la importancia de características para la interpretabilidad."""
-        pass
\ No newline at end of file
+        pass
+
+    def get_transformer(self) -> Optional[Any]:
+        """Transformador de inferencia asociado al modelo servido (None si el adaptador no tiene)."""
+        return None
+
+    def get_drift_reference(self) -> Optional[Any]:
+        """Distribución de referencia de las features del modelo servido (None si no hay)."""
+        return None
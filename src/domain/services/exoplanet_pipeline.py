@@ -2,11 +2,17 @@ import pandas as pd
 import numpy as np
 import logging
 import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Optional
 from src.domain.pipeline_modules.data_cleaner import DataCleaner
 from src.domain.pipeline_modules.feature_creator import FeatureCreator
 from src.domain.pipeline_modules.data_finalizer import DataFinalizer
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from src.domain.pipeline_modules.inference_transformer import InferenceTransformer
+from src.domain.pipeline_modules.streaming_stats import QuantileSketch, StreamingMoments
+from src.domain.pipeline_modules.fingerprint_store import FingerprintStore
+from src.domain.exceptions.exceptions import InsufficientDataError
 
 class ExoplanetPreprocessor:
 
@@ -19,57 +25,295 @@ class ExoplanetPreprocessor:
     4. Feature Engineering Astronómico (FeatureCreator) 
     5. Feature Engineering Estadístico (FeatureCreator)
     6. Balanceo de Clases (DataFinalizer)  
+    Tras fit() o fit_transform_complete(), `transformer` contiene todos los parámetros
+    aprendidos (medianas, constantes estadísticas y scaler) para transformar lotes en inferencia.
+    fit_streaming() obtiene el mismo transformador recorriendo el catálogo por chunks.
+    Con balance_mode='weights' el paso 6 no duplica filas: deja `sample_weights` por fila
+    (y el RobustScaler se ajusta sobre las filas originales).
+    Cada paso queda cronometrado en `stage_profile` (y, con profile_memory=True, con su pico
+    de memoria vía tracemalloc); `stage_observer(etapa, segundos, pico_bytes)` recibe cada medición.
+    transform_incremental() procesa solo las filas nuevas o modificadas de un volcado respecto a
+    un FingerprintStore, con el transformador congelado de la versión anterior.
     """
     
-    def __init__(self, data_path: str = './data/kepler_koi.csv'):
+    def __init__(self, data_path: str = './data/kepler_koi.csv', balance_mode: str = 'oversample',
+                 stage_observer: Optional[Callable[[str, float, Optional[int]], None]] = None,
+                 profile_memory: bool = False):
+        if balance_mode not in DataFinalizer.BALANCE_MODES:
+            raise ValueError(f"Modo de balanceo desconocido '{balance_mode}'. Opciones: {DataFinalizer.BALANCE_MODES}")
         self.data_path = data_path
+        self.balance_mode = balance_mode
         self.cleaner = DataCleaner()
         self.creator = FeatureCreator()
         self.finalizer = DataFinalizer()
         self.feature_names = []
+        self.transformer = None
+        self.sample_weights = None
+        # Filas filtradas (antes de imputar) del último ajuste completo: base del almacén de huellas
+        self.training_rows_ = None
+        self.stage_observer = stage_observer
+        self.profile_memory = profile_memory
+        self.stage_profile = []
+
+    @contextmanager
+    def _stage(self, name: str):
+        """Cronometra un paso del pipeline; el pico de memoria solo se mide si profile_memory."""
+        started_tracing = False
+        if self.profile_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            peak = None
+            if self.profile_memory:
+                peak = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.stage_profile.append({'stage': name, 'seconds': round(seconds, 4), 'peak_memory_bytes': peak})
+            if self.stage_observer is not None:
+                self.stage_observer(name, seconds, peak)
+
+    def fit(self) -> InferenceTransformer:
+
+        """
+        Ajusta el pipeline (pasos 1-7) y devuelve el transformador de inferencia
+        con todos los parámetros aprendidos, sin crear splits temporales.
+        """
+        X_balanced, _ = self._prepare_training_frame()
+        with self._stage('scaling'):
+            self.finalizer.scale_features(X_balanced)
+        self.transformer = self._build_transformer()
+        return self.transformer
+
+    def transform(self, batch) -> np.ndarray:
+
+        """Transforma columnas KOI crudas en la matriz escalada (requiere fit previo)."""
+        if self.transformer is None:
+            raise RuntimeError("El preprocesador no está ajustado. Ejecute fit() o fit_transform_complete() primero.")
+        return self.transformer.transform(batch)
+
+    def fit_streaming(self, chunk_size: int = 50_000, sketch_capacity: int = 4096) -> InferenceTransformer:
+
+        """
+        Modo streaming para catálogos mayores que la memoria. Dos pasadas por chunks:
+        1. Filtros científicos por chunk + sketches de cuantiles para las medianas de imputación.
+        2. Imputación + features físicas por chunk; momentos combinables para _skew/_kurt/_cv y
+           sketches ponderados para el RobustScaler. El balanceo por oversampling se sustituye
+           por pesos de clase equivalentes (no se duplican filas).
+        La memoria queda acotada por chunk_size y sketch_capacity, no por el tamaño del catálogo.
+        """
+        logging.info(f"= INICIO DEL PIPELINE EN MODO STREAMING (chunks de {chunk_size:,} filas) =")
+        self.stage_profile = []
+
+        # Pasada 1: medianas de imputación y conteo de clases
+        median_sketches, class_counts, n_rows, rejections = {}, {}, 0, {}
+        with self._stage('streaming_pass_1'):
+            for chunk in self._iter_filtered_chunks(chunk_size, rejections):
+                n_rows += len(chunk)
+                for label, count in chunk['target_class'].value_counts().items():
+                    class_counts[label] = class_counts.get(label, 0) + int(count)
+                for col in self.cleaner.imputable_columns(chunk):
+                    median_sketches.setdefault(col, QuantileSketch(sketch_capacity)).update(chunk[col].to_numpy(dtype=np.float64))
+
+        if n_rows == 0:
+            raise InsufficientDataError("Ninguna fila superó los filtros científicos en modo streaming.")
+        if len(class_counts) < 2:
+            raise ValueError("Error de balanceo: Solo se encontró una clase en el set final.")
+
+        medians = {col: sketch.quantile(0.5) for col, sketch in median_sketches.items()}
+        self.cleaner.imputation_medians_ = medians
+        majority_count = max(class_counts.values())
+        class_weights = {label: majority_count / count for label, count in class_counts.items()}
+        for desc, removed in rejections.items():
+            logging.info(f"   {desc}: -{removed:,} filas")
+        logging.info(f"Pasada 1 completada: {n_rows:,} filas filtradas. Distribución: {class_counts}")
+
+        # Pasada 2: features físicas, momentos estadísticos y cuantiles del scaler
+        moments, scale_sketches, feature_columns = {}, {}, None
+        with self._stage('streaming_pass_2'):
+            for chunk in self._iter_filtered_chunks(chunk_size):
+                chunk = chunk.fillna(value=medians).dropna()
+                for name, values in FeatureCreator.astronomical_feature_arrays(chunk).items():
+                    chunk[name] = values
+
+                X_chunk = chunk.drop(columns=DataCleaner.NON_FEATURE_COLUMNS, errors='ignore')
+                if feature_columns is None:
+                    feature_columns = list(X_chunk.columns)
+                row_weights = chunk['target_class'].map(class_weights).to_numpy(dtype=np.float64)
+
+                for col in feature_columns:
+                    scale_sketches.setdefault(col, QuantileSketch(sketch_capacity)).update(
+                        X_chunk[col].to_numpy(dtype=np.float64), row_weights
+                    )
+                for col in self.creator.statistical_columns(chunk):
+                    moments.setdefault(col, StreamingMoments()).update(chunk[col].to_numpy(dtype=np.float64))
+
+        constants = self.creator.statistical_constants_from_moments(moments)
+        self.feature_names = feature_columns + list(constants)
+
+        # RobustScaler: centro = mediana, escala = IQR (0 -> 1). Las constantes quedan con escala 1.
+        center, scale = [], []
+        for name in self.feature_names:
+            if name in constants:
+                center.append(constants[name])
+                scale.append(1.0)
+            else:
+                sketch = scale_sketches[name]
+                iqr = sketch.quantile(0.75) - sketch.quantile(0.25)
+                center.append(sketch.quantile(0.5))
+                scale.append(iqr if iqr != 0 else 1.0)
+
+        self.transformer = InferenceTransformer(
+            feature_names=self.feature_names,
+            imputation_medians=medians,
+            statistical_constants=constants,
+            scaler_center=center,
+            scaler_scale=scale,
+        )
+        logging.info(f"PIPELINE STREAMING FINALIZADO. Features totales: {len(self.feature_names)}")
+        return self.transformer
+
+    def iter_transform_streaming(self, chunk_size: int = 50_000):
+
+        """Genera (X_escalado, y) por chunk con el transformador ya ajustado (memoria acotada)."""
+        if self.transformer is None:
+            raise RuntimeError("El preprocesador no está ajustado. Ejecute fit_streaming() primero.")
+        for chunk in self._iter_filtered_chunks(chunk_size):
+            if len(chunk) > 0:
+                yield self.transformer.transform(chunk), chunk['target_class'].to_numpy()
+
+    def _iter_filtered_chunks(self, chunk_size: int, rejections: dict = None):
+        """
+        Chunks seleccionados, etiquetados y con los filtros científicos (locales por fila)
+        aplicados. Si se pasa `rejections`, acumula ahí los conteos de rechazo de todos los chunks.
+        """
+        for chunk in self.cleaner.iter_chunks(self.data_path, chunk_size):
+            chunk, _, chunk_rejections = self.cleaner.filter_rows(chunk)
+            if rejections is not None:
+                for desc, removed in chunk_rejections.items():
+                    rejections[desc] = rejections.get(desc, 0) + removed
+            yield chunk
+
+    def _build_transformer(self) -> InferenceTransformer:
+        return InferenceTransformer(
+            feature_names=self.feature_names,
+            imputation_medians=self.cleaner.imputation_medians_,
+            statistical_constants=self.creator.statistical_constants_,
+            scaler_center=self.finalizer.scaler.center_,
+            scaler_scale=self.finalizer.scaler.scale_,
+        )
+
+    def fingerprint_store(self) -> FingerprintStore:
+
+        """Almacén de huellas del último ajuste completo: filas filtradas y su matriz transformada."""
+        if self.transformer is None or self.training_rows_ is None:
+            raise RuntimeError("El preprocesador no está ajustado. Ejecute fit() o fit_transform_complete() primero.")
+        rows = self.training_rows_
+        return FingerprintStore.build(rows, self.transformer.transform(rows), self.transformer.feature_names)
+
+    def transform_incremental(self, store: FingerprintStore, transformer: InferenceTransformer) -> tuple:
+
+        """
+        Reentrenamiento incremental: carga y filtra el volcado, lo compara con `store` y transforma
+        solo las filas nuevas o modificadas con `transformer` (el de la versión anterior, congelado:
+        los árboles existentes siguen siendo válidos en su espacio escalado).
+        Retorna (almacén actualizado, StoreDiff, X de las filas insertadas, y de las filas insertadas).
+        """
+        logging.info("= INICIO DEL PIPELINE INCREMENTAL =")
+        self.stage_profile = []
+        self.transformer = transformer
+        self.feature_names = list(transformer.feature_names)
+
+        with self._stage('load_and_select'):
+            df = self.cleaner.load_and_select(self.data_path)
+        with self._stage('scientific_filters'):
+            df = self.cleaner.apply_scientific_filters(df)
+        with self._stage('fingerprint_diff'):
+            diff = store.diff(df)
+        with self._stage('delta_features'):
+            inserted = df[diff.inserted]
+            X_delta = transformer.transform(inserted) if len(inserted) else np.empty((0, len(self.feature_names)))
+        with self._stage('store_update'):
+            updated_store = store.update(df, diff, X_delta)
+
+        logging.info(f"🧬 Delta del volcado: {diff.n_inserted:,} filas nuevas o modificadas "
+                     f"({diff.changed_kepids:,} kepid modificados), {diff.deleted:,} eliminadas, "
+                     f"{len(diff.kept):,} sin cambios")
+        logging.info("⏱️ Tiempos por paso: " + ", ".join(f"{s['stage']}={s['seconds']:.2f}s" for s in self.stage_profile))
+        return updated_store, diff, X_delta, inserted['target_class'].to_numpy()
 
     def fit_transform_complete(self, target_col='koi_disposition', n_splits=5) -> tuple:
 
         """
         Ejecuta el pipeline completo de preprocesamiento de datos.
         """
+        X_balanced, y_balanced = self._prepare_training_frame()
+
+        # 7. Escalado Robusto (DataFinalizer)
+        with self._stage('scaling'):
+            X_final_scaled = self.finalizer.scale_features(X_balanced)
+        self.transformer = self._build_transformer()
+
+        # 8. Creación de Splits Temporales (DataFinalizer)
+        with self._stage('temporal_splits'):
+            temporal_splits = self.finalizer.create_temporal_splits(X_final_scaled, y_balanced.values, n_splits=n_splits)
+        
+        logging.info("=" * 50)
+        logging.info(f"PIPELINE FINALIZADO. Features totales: {len(self.feature_names)}")
+        logging.info("⏱️ Tiempos por paso: " + ", ".join(f"{s['stage']}={s['seconds']:.2f}s" for s in self.stage_profile))
+        
+        return X_final_scaled, y_balanced.values, temporal_splits
+
+    def _prepare_training_frame(self) -> tuple:
+
+        """Pasos 1-6 del pipeline: devuelve (X_balanced, y_balanced) antes del escalado."""
 
         logging.info("= INICIO DEL PIPELINE DE PREPROCESAMIENTO DE EXOPLANETAS =")
         logging.info("=" * 50)
+        self.stage_profile = []
 
         # 1. Carga y Selección Inicial (DataCleaner)
-        df = self.cleaner.load_and_select(self.data_path)
+        with self._stage('load_and_select'):
+            df = self.cleaner.load_and_select(self.data_path)
 
         # 2. Limpieza y Filtros Científicos (DataCleaner)
-        df_processed = self.cleaner.apply_scientific_filters(df)
+        with self._stage('scientific_filters'):
+            df_processed = self.cleaner.apply_scientific_filters(df)
+        self.training_rows_ = df_processed
         
         # 3. Manejo de Valores Faltantes (DataCleaner)
-        df_processed = self.cleaner.handle_missing_values(df_processed)
+        with self._stage('missing_values'):
+            df_processed = self.cleaner.handle_missing_values(df_processed)
 
         # 4. Feature Engineering Astronómico (FeatureCreator)
-        df_processed = self.creator.create_astronomical_features(df_processed)
+        with self._stage('astronomical_features'):
+            df_processed = self.creator.create_astronomical_features(df_processed)
         
         # 5. Feature Engineering Estadístico (FeatureCreator)
-        df_processed = self.creator.create_statistical_features(df_processed)
+        with self._stage('statistical_features'):
+            df_processed = self.creator.create_statistical_features(df_processed)
         
         # Separar features y target
         X_raw = df_processed.drop(columns=['label', 'target_class', 'kepid'], errors='ignore')
         y_raw = df_processed['target_class']
         
         # 6. Balanceo de Clases (DataFinalizer)
-        # CAMBIO CLAVE 1: Aseguramos que el output del target sea un DataFrame.
-        X_balanced, y_balanced = self.finalizer.balance_classes(X_raw, y_raw.rename('target'))
+        with self._stage('class_balancing'):
+            if self.balance_mode == 'weights':
+                # Sin filas duplicadas: el balanceo viaja como pesos por muestra
+                self.sample_weights = self.finalizer.balance_weights(y_raw)
+                X_balanced, y_balanced = X_raw, y_raw.rename('target')
+            else:
+                # CAMBIO CLAVE 1: Aseguramos que el output del target sea un DataFrame.
+                X_balanced, y_balanced = self.finalizer.balance_classes(X_raw, y_raw.rename('target'))
         
         # Guardar nombres de features ANTES del escalado
         self.feature_names = list(X_balanced.columns)
 
-        # 7. Escalado Robusto (DataFinalizer)
-        X_final_scaled = self.finalizer.scale_features(X_balanced)
-
-        # 8. Creación de Splits Temporales (DataFinalizer)
-        temporal_splits = self.finalizer.create_temporal_splits(X_final_scaled, y_balanced.values, n_splits=n_splits)
-        
-        logging.info("=" * 50)
-        logging.info(f"PIPELINE FINALIZADO. Features totales: {len(self.feature_names)}")
-        
-        return X_final_scaled, y_balanced.values, temporal_splits
\ No newline at end of file
+        return X_balanced, y_balanced
\ No newline at end of file
@@ -0,0 +1,120 @@
+from typing import Dict
+
+import numpy as np
+
+# Marca de hoja en los árboles de sklearn (TREE_UNDEFINED)
+LEAF_FEATURE = -2
+
+
+def compile_voting_classifier(model) -> Dict[str, np.ndarray]:
+
+    """
+    Exporta un VotingClassifier soft (RandomForest + LogisticRegression) a arrays planos.
+    Todos los árboles se concatenan en arrays contiguos de nodos (feature, threshold,
+    hijos [izq, der] intercalados, valor de hoja normalizado) con los índices de hijos ya
+    desplazados. Los arrays se guardan ya en el dtype/layout que usa la inferencia para
+    poder cargarlos con mmap_mode='r' sin copias. Solo se leen atributos: no requiere sklearn.
+    """
+    if getattr(model, 'voting', 'soft') != 'soft':
+        raise ValueError("Solo se puede compilar un VotingClassifier con voting='soft'.")
+    if getattr(model, 'weights', None) is not None:
+        raise ValueError("La compilación no soporta pesos de votación personalizados.")
+
+    forest = model.named_estimators_['rf']
+    logistic = model.named_estimators_['lr']
+
+    features, thresholds, children, values, roots = [], [], [], [], []
+    offset, max_depth = 0, 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+
+        node_values = tree.value[:, 0, :].astype(np.float64)
+        totals = node_values.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+
+        features.append(tree.feature.astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        children.append(np.column_stack([np.where(left >= 0, left + offset, -1),
+                                         np.where(right >= 0, right + offset, -1)]).ravel())
+        values.append(node_values / totals)
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        'classes': np.asarray(model.classes_),
+        'tree_roots': np.asarray(roots, dtype=np.int32),
+        'tree_max_depth': np.asarray(max_depth, dtype=np.int64),
+        'node_feature': np.concatenate(features),
+        'node_threshold': np.concatenate(thresholds),
+        # Índices int32 e hijos intercalados [izq, der]: un único gather por nivel
+        'node_children': np.concatenate(children).astype(np.int32),
+        'node_value': np.concatenate(values),
+        'lr_coef': np.asarray(logistic.coef_, dtype=np.float64),
+        'lr_intercept': np.asarray(logistic.intercept_, dtype=np.float64),
+    }
+
+
+class CompiledEnsemble:
+
+    """
+    Motor de inferencia NumPy para el Ensemble compilado (sin sklearn en tiempo de servicio).
+    predict_proba recorre todos los árboles a la vez para todo el lote (un paso por nivel
+    de profundidad, solo sobre los pares fila-árbol que aún no llegaron a una hoja) y
+    promedia con la regresión logística, igual que voting='soft'.
+    Los arrays se usan tal cual (pueden ser np.memmap de solo lectura compartidos
+    entre workers): ninguna operación escribe sobre ellos.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.classes_ = np.asarray(arrays['classes'])
+        self.tree_roots = arrays['tree_roots']
+        self.max_depth = int(arrays['tree_max_depth'])
+        self.node_feature = arrays['node_feature']
+        self.node_threshold = arrays['node_threshold']
+        self.node_children = arrays['node_children']
+        self.node_value = arrays['node_value']
+        self.lr_coef = arrays['lr_coef']
+        self.lr_intercept = arrays['lr_intercept']
+        self.n_features_in_ = self.lr_coef.shape[1]
+
+    def _forest_proba(self, X: np.ndarray) -> np.ndarray:
+        # sklearn evalúa los árboles en float32: se replica para obtener los mismos caminos
+        X_flat = X.astype(np.float32).ravel()
+        n_samples, n_trees = len(X), len(self.tree_roots)
+
+        # Un nodo actual por par (fila, árbol); solo se avanza sobre los pares que no están en hoja
+        nodes = np.tile(self.tree_roots, n_samples)
+        row_offsets = np.repeat(np.arange(n_samples, dtype=np.int32) * np.int32(X.shape[1]), n_trees)
+        active = np.arange(nodes.size, dtype=np.int32)
+
+        for _ in range(self.max_depth):
+            current = nodes[active]
+            feature = self.node_feature[current]
+            internal = feature != LEAF_FEATURE
+            if not internal.all():
+                if not internal.any():
+                    break
+                active, current, feature = active[internal], current[internal], feature[internal]
+            go_right = ~(X_flat[row_offsets[active] + feature] <= self.node_threshold[current])
+            nodes[active] = self.node_children[2 * current + go_right]
+
+        return self.node_value[nodes].reshape(n_samples, n_trees, -1).mean(axis=1)
+
+    def _logistic_proba(self, X: np.ndarray) -> np.ndarray:
+        decision = X @ self.lr_coef.T + self.lr_intercept
+        if decision.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-decision[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        decision -= decision.max(axis=1, keepdims=True)
+        exp = np.exp(decision)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        return (self._forest_proba(X) + self._logistic_proba(X)) / 2.0
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,76 @@
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+from astropy.io import fits
+
+from src.domain.entities.exoplanet import LightCurve
+
+# Nombres de archivo de los productos de la NASA: kplr<KIC 9>-<fecha>_llc.fits / tess<fecha>-s<sector>-<TIC 16>-..._lc.fits
+KEPLER_FILENAME = re.compile(r'^kplr(\d{9})-\d+_[ls]lc\.fits(\.gz)?$', re.IGNORECASE)
+TESS_FILENAME = re.compile(r'^tess\d+-s\d+-(\d{16})-\d+-[a-z]_lc\.fits(\.gz)?$', re.IGNORECASE)
+FITS_SUFFIXES = ('.fits', '.fits.gz', '.fit')
+
+# Columnas leídas de la extensión LIGHTCURVE (el resto de la tabla no se toca)
+TIME_COLUMN = 'TIME'
+QUALITY_COLUMN = 'QUALITY'
+
+
+def parse_target(filename: str) -> Tuple[str, str]:
+
+    """(misión, id de objetivo) a partir del nombre del archivo; desconocido -> ('unknown', nombre sin extensión)."""
+    name = os.path.basename(filename)
+    match = KEPLER_FILENAME.match(name)
+    if match:
+        return 'kepler', str(int(match.group(1)))
+    match = TESS_FILENAME.match(name)
+    if match:
+        return 'tess', str(int(match.group(1)))
+    return 'unknown', name.split('.')[0]
+
+
+def discover_light_curves(directory: str) -> Dict[Tuple[str, str], List[str]]:
+
+    """Recorre el directorio (recursivo) y agrupa los FITS por objetivo (trimestres/sectores juntos)."""
+    targets = defaultdict(list)
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(FITS_SUFFIXES):
+                targets[parse_target(name)].append(os.path.join(root, name))
+    return {target: sorted(paths) for target, paths in sorted(targets.items())}
+
+
+def read_light_curve(path: str, flux_column: str = 'PDCSAP_FLUX') -> LightCurve:
+
+    """
+    Lee una curva de luz Kepler/TESS (extensión 1) con memmap: solo se acceden las columnas
+    TIME, flujo, error y QUALITY. Se descartan cadencias marcadas o no finitas y el flujo se
+    divide por su mediana para poder concatenar trimestres/sectores.
+    """
+    with fits.open(path, memmap=True) as hdul:
+        data = hdul[1].data
+        time = np.array(data[TIME_COLUMN], dtype=np.float64)
+        flux = np.array(data[flux_column], dtype=np.float64)
+        error = np.array(data[f'{flux_column}_ERR'], dtype=np.float64)
+        quality = np.array(data[QUALITY_COLUMN]) if QUALITY_COLUMN in data.columns.names else None
+
+    keep = np.isfinite(time) & np.isfinite(flux) & np.isfinite(error)
+    if quality is not None:
+        keep &= quality == 0
+    time, flux, error = time[keep], flux[keep], error[keep]
+    if len(flux):
+        median = np.median(flux)
+        flux, error = flux / median, error / abs(median)
+    return LightCurve(time, flux, error)
+
+
+def stitch_light_curves(curves: List[LightCurve]) -> LightCurve:
+
+    """Concatena curvas ya normalizadas por su mediana, ordenadas por tiempo."""
+    time = np.concatenate([lc.time for lc in curves])
+    order = np.argsort(time, kind='stable')
+    return LightCurve(time[order],
+                      np.concatenate([lc.flux for lc in curves])[order],
+                      np.concatenate([lc.error for lc in curves])[order])
@@ -1,40 +1,192 @@
 import joblib
 import json
 import os
-from typing import List, Dict, Any, Optional
-from src.infrastructure.monitoring.logger import logger 
+import threading
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from src.infrastructure.monitoring.logger import logger, prediction_logger
 from src.domain.repositories.ml_repository import MLRepository 
+from src.domain.pipeline_modules.inference_transformer import InferenceTransformer
+from src.domain.pipeline_modules.drift_reference import DriftReference
+from src.infrastructure.adapters.compiled_ensemble import CompiledEnsemble
+from src.infrastructure.adapters import model_registry
+from src.infrastructure.adapters.model_registry import ModelRegistry
+
+# Versión reportada cuando se sirven los artefactos planos de models/ (previos al registro)
+LEGACY_MODEL_VERSION = "Ensemble_v3_Final"
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+
+    """
+    Instantánea inmutable de la versión servida. Cada recarga construye una nueva y
+    reemplaza la referencia de una vez: las peticiones en curso terminan con la anterior.
+    """
+    model: Any
+    version: str
+    model_format: str
+    feature_names: List[str]
+    transformer: Optional[InferenceTransformer]
+    drift_reference: Optional[DriftReference]
+    metrics_path: str
+    importance_path: str
+    load_time_seconds: float
+    warmup_time_seconds: float
 
 
 class RandomForestAdapter(MLRepository):
 
     """
     ADAPTADOR: Implementación del Repositorio ML (PORT) para el Ensemble Híbrido.
-    Carga el modelo final y lo usa para predicción.
+    Carga el modelo final y lo usa para predicción. Si existe la versión compilada
+    (arrays NumPy), se sirve con ella sin importar sklearn, mapeada en memoria
+    (mmap_mode='r'): los workers comparten las páginas del page cache del SO.
+    La carga es diferida: ocurre en la primera predicción o en el probe de readiness.
+    Los artefactos salen de la versión CURRENT del registro (models/registry); sin registro
+    se usan los archivos planos de models/. reload() cambia de versión en caliente.
     """
 
     MODEL_FILE_PATH = './models/ensemble_v3_final.pkl'
+    COMPILED_MODEL_FILE_PATH = './models/ensemble_v3_compiled.joblib'
     EXPECTED_FEATURES_COUNT = 32
     METRICS_FILE_PATH = './models/latest_metrics.json'
     IMPORTANCE_FILE_PATH = './models/feature_importance.json'
+    PREPROCESSOR_FILE_PATH = './models/preprocessor.json'
+    DRIFT_REFERENCE_FILE_PATH = './models/drift_reference.json'
+    REGISTRY_DIR = './models/registry'
+    GOLDEN_CASES_FILE_PATH = './data/golden_test_cases.csv'
+
+    def __init__(self, prefer_compiled: bool = True, registry: ModelRegistry = None):
+        # prefer_compiled=False fuerza el modelo sklearn (más rápido en lotes offline muy grandes)
+        self.prefer_compiled = prefer_compiled
+        self.registry = registry or ModelRegistry(self.REGISTRY_DIR)
+        self._state: Optional[LoadedModel] = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """Modelo servido; se carga en el primer acceso."""
+        return self._current_state().model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._state is not None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._state.version if self._state is not None else None
+
+    @property
+    def model_format(self) -> Optional[str]:
+        """'compiled' (NumPy) o 'sklearn'; None si aún no se ha cargado."""
+        return self._state.model_format if self._state is not None else None
+
+    @property
+    def load_time_seconds(self) -> Optional[float]:
+        return self._state.load_time_seconds if self._state is not None else None
+
+    def ensure_loaded(self):
+
+        """Carga el modelo una sola vez aunque varios hilos lo pidan a la vez."""
+        return self._current_state().model
+
+    def _current_state(self) -> LoadedModel:
+        state = self._state
+        if state is None:
+            with self._load_lock:
+                if self._state is None:
+                    self._state = self._build_state()
+                    logger.info(f"Modelo listo para servir en {self._state.load_time_seconds:.3f}s "
+                                f"({self._state.model_format}, versión {self._state.version})")
+                state = self._state
+        return state
+
+    def reload(self, version: Optional[str] = None) -> LoadedModel:
+
+        """
+        Carga una versión del registro (por defecto CURRENT), la calienta con los casos
+        dorados y solo entonces la expone. Si algo falla se mantiene la versión actual.
+        """
+        with self._load_lock:
+            previous = self.model_version
+            new_state = self._build_state(version)
+            self._state = new_state
+        logger.info(f"🔄 Modelo recargado en caliente: {previous} -> {new_state.version} "
+                    f"(carga {new_state.load_time_seconds:.3f}s, warm-up {new_state.warmup_time_seconds:.3f}s)")
+        return new_state
+
+    def _resolve_artifacts(self, version: Optional[str] = None) -> Tuple[str, Dict[str, str]]:
+
+        """Rutas de artefactos de la versión pedida, de CURRENT o, sin registro, de models/."""
+        version = version or self.registry.current_version()
+        if version is None:
+            return LEGACY_MODEL_VERSION, {
+                'model': self.MODEL_FILE_PATH,
+                'compiled_model': self.COMPILED_MODEL_FILE_PATH,
+                'metrics': self.METRICS_FILE_PATH,
+                'importance': self.IMPORTANCE_FILE_PATH,
+                'preprocessor': self.PREPROCESSOR_FILE_PATH,
+                'drift_reference': self.DRIFT_REFERENCE_FILE_PATH,
+                'feature_names': None,
+            }
+        directory = self.registry.version_dir(version)
+        return version, {
+            'model': os.path.join(directory, model_registry.MODEL_FILENAME),
+            'compiled_model': os.path.join(directory, model_registry.COMPILED_MODEL_FILENAME),
+            'metrics': os.path.join(directory, model_registry.METRICS_FILENAME),
+            'importance': os.path.join(directory, model_registry.IMPORTANCE_FILENAME),
+            'preprocessor': os.path.join(directory, model_registry.PREPROCESSOR_FILENAME),
+            'drift_reference': os.path.join(directory, model_registry.DRIFT_REFERENCE_FILENAME),
+            'feature_names': os.path.join(directory, model_registry.FEATURE_NAMES_FILENAME),
+        }
+
+    def _build_state(self, version: Optional[str] = None) -> LoadedModel:
+        start = time.perf_counter()
+        version, paths = self._resolve_artifacts(version)
+        model = self._load_model_from(paths)
+        feature_names = self._load_feature_names(paths['feature_names'])
+        transformer = self._read_transformer(paths['preprocessor'])
+        load_time = time.perf_counter() - start
+        warmup_time = self._warm_up(model, transformer)
+        return LoadedModel(
+            model=model,
+            version=version,
+            model_format='compiled' if isinstance(model, CompiledEnsemble) else 'sklearn',
+            feature_names=feature_names,
+            transformer=transformer,
+            drift_reference=self._read_drift_reference(paths['drift_reference']),
+            metrics_path=paths['metrics'],
+            importance_path=paths['importance'],
+            load_time_seconds=load_time,
+            warmup_time_seconds=warmup_time,
+        )
 
-    def __init__(self):
-        self.model = self.load_model()
-        self.feature_names = self._load_feature_names()
-        
     def load_model(self):
-        """Implementa la carga del modelo binario (.pkl) y extrae el objeto model."""
+        """Implementa la carga del modelo de la versión actual (sin exponerlo; ver reload)."""
+        return self._load_model_from(self._resolve_artifacts()[1])
+
+    def _load_model_from(self, paths: Dict[str, str]):
+
+        """Prefiere el artefacto compilado; si no existe, carga el binario (.pkl) y extrae el objeto model."""
+
+        if self.prefer_compiled and os.path.exists(paths['compiled_model']):
+            return self._load_compiled_model(paths['compiled_model'])
 
-        logger.info(f"Iniciando carga del modelo desde: {self.MODEL_FILE_PATH}")
-        if not os.path.exists(self.MODEL_FILE_PATH):
-            logger.error(f"Archivo no encontrado: {self.MODEL_FILE_PATH}")
-            raise FileNotFoundError(...)
+        model_path = paths['model']
+        logger.info(f"Iniciando carga del modelo desde: {model_path}")
+        if not os.path.exists(model_path):
+            logger.error(f"Archivo no encontrado: {model_path}")
+            raise FileNotFoundError(f"Modelo no encontrado: {model_path}")
         try:
 
             # joblib.load devuelve el diccionario guardado en _save_model.
             # Debemos extraer el objeto 'model' de ese diccionario.
 
-            model_data = joblib.load(self.MODEL_FILE_PATH)
+            model_data = joblib.load(model_path)
             
             # Extraer el objeto VotingClassifier
             model = model_data.get('model') 
@@ -47,6 +199,36 @@ class RandomForestAdapter(MLRepository):
             logger.critical(f"Error CRÍTICO al deserializar el modelo: {e}")
             raise RuntimeError(f"Error al cargar el modelo: {e}")
 
+    def _load_compiled_model(self, path: str) -> CompiledEnsemble:
+        """Carga el Ensemble compilado (arrays planos de nodos + coeficientes LR) como memmap de solo lectura."""
+        logger.info(f"Iniciando carga del modelo compilado desde: {path}")
+        try:
+            model = CompiledEnsemble(joblib.load(path, mmap_mode='r'))
+            logger.info(" Modelo Ensemble V3 compilado (NumPy) cargado exitosamente.")
+            return model
+        except Exception as e:
+            logger.critical(f"Error CRÍTICO al cargar el modelo compilado: {e}")
+            raise RuntimeError(f"Error al cargar el modelo compilado: {e}")
+
+    def _warm_up(self, model, transformer: Optional[InferenceTransformer]) -> float:
+
+        """
+        Pasa los casos dorados por el modelo antes de exponerlo: valida que responde con
+        probabilidades finitas y trae a memoria las páginas mapeadas. Retorna la duración.
+        """
+        start = time.perf_counter()
+        if transformer is not None and os.path.exists(self.GOLDEN_CASES_FILE_PATH):
+            golden = pd.read_csv(self.GOLDEN_CASES_FILE_PATH)
+            matrix = transformer.transform({col: golden[col].to_numpy(dtype=np.float64)
+                                            for col in transformer.raw_features if col in golden.columns})
+        else:
+            matrix = np.zeros((1, self.EXPECTED_FEATURES_COUNT))
+
+        probabilities = model.predict_proba(self._validate_matrix(matrix))
+        if not np.isfinite(probabilities).all():
+            raise RuntimeError("El warm-up con los casos dorados produjo probabilidades no finitas.")
+        return time.perf_counter() - start
+
     def _load_json_data(self, path: str) -> Optional[Dict[str, Any]]:
 
         """Función auxiliar para cargar datos JSON (métricas/importancia)."""
@@ -59,10 +241,74 @@ class RandomForestAdapter(MLRepository):
                 return None
         return None
 
-    def _load_feature_names(self) -> List[str]:
-        """Carga los nombres de las características desde el modelo guardado."""
+    def _read_transformer(self, path: str) -> Optional[InferenceTransformer]:
+
+        """Carga el transformador de inferencia (columnas KOI crudas -> features escaladas), si existe."""
+        if not os.path.exists(path):
+            logger.warning(f"Transformador de inferencia no encontrado: {path}")
+            return None
+        return InferenceTransformer.load(path)
+
+    def _read_drift_reference(self, path: str) -> Optional[DriftReference]:
+
+        """Carga la distribución de referencia de las features (versiones previas no la tienen)."""
+        if not os.path.exists(path):
+            logger.warning(f"Referencia de drift no encontrada: {path}")
+            return None
+        return DriftReference.load(path)
+
+    def get_drift_reference(self) -> Optional[DriftReference]:
+
+        """Referencia de drift de la versión servida (sin forzar la carga del modelo)."""
+        state = self._state
+        return state.drift_reference if state is not None else None
+
+    def get_transformer(self) -> Optional[InferenceTransformer]:
+
+        """Transformador de la versión servida (se carga junto con el modelo)."""
+        return self._current_state().transformer
+
+    def _load_feature_names(self, path: Optional[str]) -> List[str]:
+
+        """
+        Nombres de las características de la versión (feature_names.json del registro), en el
+        orden de las columnas del modelo. Los artefactos planos de models/ no los versionan:
+        sin registro se usan nombres posicionales (feature_0..feature_31).
+        """
+        if path is None:
+            return [f"feature_{i}" for i in range(self.EXPECTED_FEATURES_COUNT)]
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Nombres de características no encontrados: {path}")
+        with open(path, 'r') as f:
+            names = json.load(f).get('feature_names', [])
+        if len(names) != self.EXPECTED_FEATURES_COUNT:
+            raise ValueError(f"{path} declara {len(names)} características; el modelo espera {self.EXPECTED_FEATURES_COUNT}.")
+        return list(names)
+
+    def _validate_matrix(self, features_matrix: Sequence[Sequence[float]]) -> np.ndarray:
 
-        return [f"feature_{i}" for i in range(self.EXPECTED_FEATURES_COUNT)]
+        """Convierte la entrada a una matriz float64 (N x F) y valida sus dimensiones una sola vez."""
+
+        matrix = np.asarray(features_matrix, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.shape[1] != self.EXPECTED_FEATURES_COUNT:
+            received = matrix.shape[-1] if matrix.ndim >= 1 else 0
+            logger.warning(f"Feature Mismatch: Esperado={self.EXPECTED_FEATURES_COUNT}, Recibido={received}")
+            raise ValueError(f"Se esperaban {self.EXPECTED_FEATURES_COUNT} features, pero se recibieron {received}. Ajuste la entrada o el pipeline.")
+        return matrix
+
+    @staticmethod
+    def _score(model, matrix: np.ndarray) -> tuple:
+
+        """
+        Una única pasada de predict_proba sobre el Ensemble. La clase se deriva de las
+        probabilidades (argmax, igual que el voting='soft' de sklearn), evitando recorrer
+        el bosque dos veces.
+        """
+        probabilities = model.predict_proba(matrix)
+        predictions = model.classes_[np.argmax(probabilities, axis=1)]
+        return predictions.astype(int), probabilities[:, 1]
 
     #   Métodos del PORT (MLRepository) implementados
     def predict(self, features: List[float]) -> Dict[str, Any]:
@@ -72,29 +318,57 @@ class RandomForestAdapter(MLRepository):
         if len(features) != self.EXPECTED_FEATURES_COUNT:
             logger.warning(f"Feature Mismatch: Esperado={self.EXPECTED_FEATURES_COUNT}, Recibido={len(features)}")
             raise ValueError(f"Se esperaban {self.EXPECTED_FEATURES_COUNT} features, pero se recibieron {len(features)}. Ajuste la entrada o el pipeline.")
-            
-        prediction = self.model.predict([features])[0]
-        confidence = self.model.predict_proba([features])[0][1] 
+
+        state = self._current_state()
+        predictions, confidences = self._score(state.model, self._validate_matrix([features]))
+        prediction, confidence = predictions[0], confidences[0]
         
-        logger.info(f"Predicción generada: Clase={int(prediction)}, Confianza={confidence:.4f}")
+        # Línea por predicción: muestreada/limitada y con formato diferido (hilo del listener)
+        prediction_logger.info("Predicción generada: Clase=%d, Confianza=%.4f", prediction, confidence)
         
         return {
             "prediction": int(prediction),
             "confidence": float(confidence),
-            "model_name": "Ensemble_v3_Final",
+            "model_name": state.version,
+        }
+
+    def predict_batch(self, features_matrix: Sequence[Sequence[float]]) -> Dict[str, Any]:
+
+        """Predicción vectorizada (N x 32) con una sola llamada a predict_proba. Resultado columnar."""
+
+        matrix = self._validate_matrix(features_matrix)
+        state = self._current_state()
+        predictions, confidences = self._score(state.model, matrix)
+
+        prediction_logger.info("Predicción en lote generada: Filas=%d, Positivos=%d", len(matrix), predictions.sum())
+
+        return {
+            "predictions": predictions.tolist(),
+            "confidences": confidences.astype(float).tolist(),
+            "model_name": state.version,
         }
 
     def get_feature_names(self) -> List[str]:
 
-        """Implementación para devolver los nombres de features."""
-        return self.feature_names
+        """Nombres de features de la versión servida; sin modelo cargado, los de CURRENT (sin forzar la carga)."""
+        state = self._state
+        if state is not None:
+            return state.feature_names
+        return self._load_feature_names(self._resolve_artifacts()[1]['feature_names'])
         
     def get_feature_importance(self) -> Optional[Dict[str, float]]:
 
         """Devuelve la importancia de características para interpretabilidad."""
-        return self._load_json_data(self.IMPORTANCE_FILE_PATH)
+        return self._load_json_data(self._metadata_paths()['importance'])
 
     def get_metrics(self) -> Optional[Dict[str, float]]:
 
         """Devuelve las métricas de evaluación finales."""
-        return self._load_json_data(self.METRICS_FILE_PATH)
\ No newline at end of file
+        return self._load_json_data(self._metadata_paths()['metrics'])
+
+    def _metadata_paths(self) -> Dict[str, str]:
+        # Metadatos de la versión servida; sin modelo cargado, los de CURRENT (sin forzar la carga)
+        state = self._state
+        if state is not None:
+            return {'metrics': state.metrics_path, 'importance': state.importance_path}
+        return self._resolve_artifacts()[1]
\ No newline at end of file
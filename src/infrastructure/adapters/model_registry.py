@@ -0,0 +1,98 @@
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from src.infrastructure.monitoring.logger import logger
+
+# Artefactos de cada versión (mismos nombres que los archivos planos históricos de models/)
+MODEL_FILENAME = 'ensemble_v3_final.pkl'
+COMPILED_MODEL_FILENAME = 'ensemble_v3_compiled.joblib'
+METRICS_FILENAME = 'latest_metrics.json'
+IMPORTANCE_FILENAME = 'feature_importance.json'
+FEATURE_NAMES_FILENAME = 'feature_names.json'
+PREPROCESSOR_FILENAME = 'preprocessor.json'
+DRIFT_REFERENCE_FILENAME = 'drift_reference.json'
+FEATURE_STORE_FILENAME = 'feature_store.npz'
+MANIFEST_FILENAME = 'manifest.json'
+
+
+class ModelRegistry:
+
+    """
+    Responsabilidad: Registro de modelos en disco, un directorio inmutable por entrenamiento.
+    models/registry/<versión>/ guarda modelo, métricas, importancias, nombres de features,
+    transformador y almacén de huellas (reentrenamiento incremental). El archivo CURRENT apunta a la versión publicada y se reemplaza de forma
+    atómica: una versión a medio escribir nunca se sirve.
+    """
+
+    CURRENT_POINTER = 'CURRENT'
+    VERSION_PREFIX = 'ensemble_v3-'
+    # Ids de versión válidos: un solo componente de ruta, sin '.' ni '..' (empieza por alfanumérico)
+    VERSION_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
+    def __init__(self, root_dir: str = './models/registry'):
+        self.root_dir = root_dir
+
+    def create_version(self) -> str:
+
+        """Reserva un directorio nuevo (versión por fecha de entrenamiento) y retorna su id."""
+        os.makedirs(self.root_dir, exist_ok=True)
+        base = self.VERSION_PREFIX + time.strftime('%Y%m%d-%H%M%S')
+        version, suffix = base, 1
+        while True:
+            try:
+                os.makedirs(os.path.join(self.root_dir, version))
+                return version
+            except FileExistsError:
+                suffix += 1
+                version = f"{base}.{suffix}"
+
+    def version_dir(self, version: str) -> str:
+        if not version or not self.VERSION_PATTERN.match(version):
+            raise FileNotFoundError(f"Versión de modelo no encontrada en el registro: {version}")
+        path = os.path.join(self.root_dir, version)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Versión de modelo no encontrada en el registro: {version}")
+        return path
+
+    def artifact_path(self, version: str, filename: str) -> str:
+        return os.path.join(self.version_dir(version), filename)
+
+    def write_manifest(self, version: str, metadata: Dict[str, Any]) -> None:
+
+        """Describe la versión (fecha, métricas, artefactos presentes)."""
+        directory = self.version_dir(version)
+        manifest = {
+            "version": version,
+            "created_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "artifacts": sorted(name for name in os.listdir(directory) if name != MANIFEST_FILENAME),
+            **metadata,
+        }
+        with open(os.path.join(directory, MANIFEST_FILENAME), 'w') as f:
+            json.dump(manifest, f, indent=4)
+
+    def publish(self, version: str) -> None:
+
+        """Marca la versión como actual (reemplazo atómico del puntero CURRENT)."""
+        self.version_dir(version)
+        pointer = os.path.join(self.root_dir, self.CURRENT_POINTER)
+        tmp_pointer = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp_pointer, 'w') as f:
+            f.write(version)
+        os.replace(tmp_pointer, pointer)
+        logger.info(f"📌 Versión de modelo publicada: {version}")
+
+    def current_version(self) -> Optional[str]:
+        pointer = os.path.join(self.root_dir, self.CURRENT_POINTER)
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer, 'r') as f:
+            return f.read().strip() or None
+
+    def list_versions(self) -> List[str]:
+        if not os.path.isdir(self.root_dir):
+            return []
+        return sorted(name for name in os.listdir(self.root_dir)
+                      if os.path.isdir(os.path.join(self.root_dir, name)))
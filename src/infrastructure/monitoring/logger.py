@@ -1,24 +1,198 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
 
-def setup_logger(name: str = "exoplanet-ml"):
-    
-    """Configura un logger global para MLOps."""
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+# Configuración por entorno: formato de consola (text/json), archivo rotado y muestreo de logs por predicción
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_FILE_PATH = os.getenv("LOG_FILE_PATH", "./logs/app_runtime.log")
+LOG_FILE_MAX_BYTES = int(os.getenv("LOG_FILE_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_FILE_BACKUP_COUNT = int(os.getenv("LOG_FILE_BACKUP_COUNT", "5"))
+LOG_PREDICTION_SAMPLE_RATE = float(os.getenv("LOG_PREDICTION_SAMPLE_RATE", "1.0"))
+LOG_PREDICTION_MAX_PER_SECOND = float(os.getenv("LOG_PREDICTION_MAX_PER_SECOND", "50"))
 
-    # Console handler para stdout
-    ch = logging.StreamHandler(sys.stdout)
-    ch.setLevel(logging.INFO)
+# Logger de las líneas por predicción (muestreado y limitado); los módulos lo obtienen por nombre
+PREDICTION_LOGGER_NAME = "exoplanet-ml.predictions"
+TEXT_FORMAT = '%(asctime)s | %(name)s | %(levelname)s | %(request_id)s | %(message)s'
 
-    formatter = logging.Formatter(
-        '%(asctime)s | %(name)s | %(levelname)s | %(message)s'
-    )
-    ch.setFormatter(formatter)
+# Id de la petición HTTP en curso (lo fija RequestIdMiddleware)
+REQUEST_ID = contextvars.ContextVar("request_id", default=None)
 
-    if not logger.handlers:
-        logger.addHandler(ch)
 
-    return logger
+class RequestIdFilter(logging.Filter):
+    """Copia el request id del contexto al registro (se ejecuta en el hilo que emite el log)."""
 
-logger = setup_logger()
\ No newline at end of file
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = REQUEST_ID.get() or '-'
+        return True
+
+
+class PredictionLogFilter(logging.Filter):
+
+    """
+    Muestreo (`sample_rate`) y límite de tasa (token bucket de `max_per_second`) para las
+    líneas por predicción. Las líneas descartadas se cuentan y el siguiente registro emitido
+    lleva `suppressed` con cuántas se omitieron desde el anterior.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, max_per_second: float = 0.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self._tokens = max_per_second
+        self._last = time.monotonic()
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sampled_out = self.sample_rate < 1.0 and random.random() >= self.sample_rate
+        # Contador y token bucket se comparten entre hilos: toda actualización bajo el lock
+        with self._lock:
+            if sampled_out:
+                self._suppressed += 1
+                return False
+            if self.max_per_second > 0:
+                now = time.monotonic()
+                self._tokens = min(self.max_per_second, self._tokens + (now - self._last) * self.max_per_second)
+                self._last = now
+                if self._tokens < 1.0:
+                    self._suppressed += 1
+                    return False
+                self._tokens -= 1.0
+            record.suppressed, self._suppressed = self._suppressed, 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro (timestamp ISO UTC, nivel, logger, request id y mensaje)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, 'request_id', '-'),
+            "message": record.getMessage(),
+        }
+        if getattr(record, 'suppressed', 0):
+            payload["suppressed"] = record.suppressed
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class _DeferredFormatQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que no formatea en el hilo que emite: solo fija el mensaje (%-args) y
+    el traceback; fecha, formato y E/S quedan para el hilo del QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)  # Otros handlers del raíz (p. ej. pytest) ven el registro intacto
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _build_sinks(level: int, log_file: str) -> list:
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(level)
+    console.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    sinks = [console]
+    if log_file:
+        # La rotación ocurre en el hilo del listener, nunca en el de la petición
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        file_sink = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT, encoding='utf-8'
+        )
+        file_sink.setLevel(level)
+        file_sink.setFormatter(JsonFormatter())
+        sinks.append(file_sink)
+    return sinks
+
+
+def setup_logger(name: str = "exoplanet-ml", level: str = LOG_LEVEL, log_file: str = LOG_FILE_PATH):
+
+    """
+    Configura el logging global para MLOps (una sola vez por proceso). El logger raíz recibe
+    un único QueueHandler: los módulos solo encolan y un QueueListener en segundo plano
+    formatea y escribe en stdout (texto o JSON) y en el archivo rotado (JSON).
+    Lo llaman los puntos de entrada (arranque de la API, CLIs), nunca al importar un módulo.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            numeric_level = logging.getLevelName(level) if isinstance(level, str) else level
+            queue_handler = _DeferredFormatQueueHandler(queue.SimpleQueue())
+            queue_handler.addFilter(RequestIdFilter())
+
+            root = logging.getLogger()
+            for handler in list(root.handlers):
+                if isinstance(handler, logging.handlers.QueueHandler):
+                    root.removeHandler(handler)
+            root.addHandler(queue_handler)
+            root.setLevel(numeric_level)
+
+            _listener = logging.handlers.QueueListener(
+                queue_handler.queue, *_build_sinks(numeric_level, log_file), respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(_listener.stop)  # Vacía la cola al terminar el proceso
+
+            logging.getLogger(PREDICTION_LOGGER_NAME).addFilter(
+                PredictionLogFilter(LOG_PREDICTION_SAMPLE_RATE, LOG_PREDICTION_MAX_PER_SECOND)
+            )
+
+    return logging.getLogger(name)
+
+
+class RequestIdMiddleware:
+
+    """
+    Middleware ASGI: toma el X-Request-ID entrante (o genera uno), lo deja en el contexto
+    para todos los logs de la petición y lo devuelve en la cabecera de la respuesta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_id = dict(scope['headers']).get(b'x-request-id', b'').decode('latin-1')[:64] or uuid.uuid4().hex
+        token = REQUEST_ID.set(request_id)
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = list(message.get('headers', [])) + [(b'x-request-id', request_id.encode('latin-1'))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_ID.reset(token)
+
+
+# Loggers con nombre: sin handlers propios, propagan al raíz que configura setup_logger
+logger = logging.getLogger("exoplanet-ml")
+prediction_logger = logging.getLogger(PREDICTION_LOGGER_NAME)
@@ -0,0 +1,331 @@
+import resource
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Buckets de latencia (segundos) para peticiones y etapas de la API; filas por lote de predicción
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+
+class _Shard:
+    """Contadores de un único hilo: solo ese hilo escribe, así que no hace falta lock."""
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * n_buckets
+        self.total = 0.0
+        self.count = 0
+
+
+class _Sharded:
+    """Base común: un shard por hilo (threading.local), sumados al exportar."""
+
+    def __init__(self, n_buckets: int):
+        self._n_buckets = n_buckets
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = _Shard(self._n_buckets)
+            with self._lock:  # Solo la primera observación de cada hilo toma el lock
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _merged(self) -> Tuple[List[int], float, int]:
+        counts = [0] * self._n_buckets
+        total, count = 0.0, 0
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for i, value in enumerate(shard.counts):
+                counts[i] += value
+            total += shard.total
+            count += shard.count
+        return counts, total, count
+
+
+class _HistogramChild(_Sharded):
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        super().__init__(len(buckets) + 1)
+        self._buckets = buckets
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        shard.counts[bisect_left(self._buckets, value)] += 1
+        shard.total += value
+        shard.count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        counts, total, count = self._merged()
+        lines, cumulative = [], 0
+        for bound, value in zip(self._buckets, counts):
+            cumulative += value
+            lines.append(f'{name}_bucket{{{_join(labels, _le(bound))}}} {cumulative}')
+        lines.append(f'{name}_bucket{{{_join(labels, _le("+Inf"))}}} {count}')
+        lines.append(f'{name}_sum{_braces(labels)} {total}')
+        lines.append(f'{name}_count{_braces(labels)} {count}')
+        return lines
+
+
+class _CounterChild(_Sharded):
+
+    def __init__(self):
+        super().__init__(0)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shard().total += amount
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        return [f'{name}{_braces(labels)} {self._merged()[1]}']
+
+
+class _GaugeChild:
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value  # Asignación atómica bajo el GIL
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        return [f'{name}{_braces(labels)} {self.value}']
+
+
+def _join(*parts: str) -> str:
+    return ','.join(part for part in parts if part)
+
+
+def _le(bound) -> str:
+    return 'le="' + str(bound) + '"'
+
+
+def _braces(labels: str) -> str:
+    return f'{{{labels}}}' if labels else ''
+
+
+class Metric:
+
+    """
+    Responsabilidad: Familia de series (histograma, contador o gauge) con etiquetas.
+    Cada combinación de etiquetas tiene su hijo; la escritura va a un shard por hilo,
+    por lo que observar no compite por ningún lock en el camino caliente.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> object:
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"La métrica {self.name} espera las etiquetas {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        if self.kind == 'histogram':
+            return _HistogramChild(self.buckets)
+        if self.kind == 'counter':
+            return _CounterChild()
+        return _GaugeChild()
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for key, child in sorted(self._children.items()):
+            labels = ','.join(f'{label}="{_escape(value)}"' for label, value in zip(self.labelnames, key))
+            lines.extend(child.samples(self.name, labels))
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+
+    """
+    Responsabilidad: Registrar las métricas del proceso y exportarlas en el formato
+    de texto de Prometheus (endpoint /metrics).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Metric:
+        return self._register(Metric(name, documentation, 'histogram', labelnames, buckets))
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Metric:
+        return self._register(Metric(name, documentation, 'counter', labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Metric:
+        return self._register(Metric(name, documentation, 'gauge', labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        # ru_maxrss está en KiB en Linux
+        lines.extend(['# HELP process_peak_rss_bytes Pico de memoria residente del proceso.',
+                      '# TYPE process_peak_rss_bytes gauge',
+                      f'process_peak_rss_bytes {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}'])
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'exoai_http_request_duration_seconds', 'Latencia total de cada petición HTTP.', ('method', 'route', 'status'))
+HTTP_REQUEST_ERRORS = REGISTRY.counter(
+    'exoai_http_request_errors_total', 'Respuestas HTTP con estado >= 400.', ('route', 'status'))
+REQUEST_STAGE_DURATION = REGISTRY.histogram(
+    'exoai_request_stage_duration_seconds',
+    'Latencia por etapa (request_parsing, feature_ordering, model_inference, habitability, serialization).',
+    ('route', 'stage'))
+PREDICTION_BATCH_ROWS = REGISTRY.histogram(
+    'exoai_prediction_batch_rows', 'Filas por petición de predicción.', ('route',), BATCH_SIZE_BUCKETS)
+PREDICTION_ERRORS = REGISTRY.counter(
+    'exoai_prediction_errors_total', 'Errores de predicción por tipo (validation/internal).', ('route', 'kind'))
+PIPELINE_STAGE_DURATION = REGISTRY.gauge(
+    'exoai_pipeline_stage_duration_seconds', 'Duración de cada paso de ExoplanetPreprocessor en su última ejecución.',
+    ('stage',))
+PIPELINE_STAGE_PEAK_MEMORY = REGISTRY.gauge(
+    'exoai_pipeline_stage_peak_memory_bytes', 'Pico de memoria asignada (tracemalloc) en la última ejecución del paso.',
+    ('stage',))
+FEATURE_DRIFT_PSI = REGISTRY.gauge(
+    'exoai_feature_drift_psi', 'PSI de cada feature servida frente a la referencia del entrenamiento.', ('feature',))
+FEATURE_OUT_OF_RANGE = REGISTRY.gauge(
+    'exoai_feature_out_of_range_values', 'Valores servidos fuera de los rangos astronómicos del entrenamiento.',
+    ('feature', 'side'))
+
+
+class StageTimer:
+
+    """Mide las etapas de una petición para una ruta dada (`with timer.stage('model_inference'): ...`)."""
+
+    __slots__ = ('route', 'state')
+
+    def __init__(self, route: str, state=None):
+        self.route = route
+        self.state = state
+
+    @classmethod
+    def for_request(cls, route: str, state) -> 'StageTimer':
+        """Registra request_parsing desde que MetricsMiddleware recibió la petición hasta el handler."""
+        timer = cls(route, state)
+        received_at = getattr(state, 'received_at', None)
+        if received_at is not None:
+            timer.observe('request_parsing', time.perf_counter() - received_at)
+        return timer
+
+    def finish(self) -> None:
+        """Marca el fin del handler: MetricsMiddleware mide la serialización a partir de aquí."""
+        if self.state is not None:
+            self.state.handler_done = time.perf_counter()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        REQUEST_STAGE_DURATION.labels(self.route, stage).observe(seconds)
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+
+def observe_pipeline_stage(stage: str, seconds: float, peak_memory_bytes: Optional[int] = None) -> None:
+
+    """Observador para ExoplanetPreprocessor(stage_observer=...)."""
+    PIPELINE_STAGE_DURATION.labels(stage).set(seconds)
+    if peak_memory_bytes is not None:
+        PIPELINE_STAGE_PEAK_MEMORY.labels(stage).set(peak_memory_bytes)
+
+
+def observe_pipeline_profile(profile: Iterable[dict]) -> None:
+
+    """Carga un `stage_profile` guardado (p. ej. el del entrenamiento de la versión servida)."""
+    for entry in profile or ():
+        observe_pipeline_stage(entry['stage'], entry['seconds'], entry.get('peak_memory_bytes'))
+
+
+class MetricsMiddleware:
+
+    """
+    Middleware ASGI puro (sin BaseHTTPMiddleware): latencia total por ruta/estado, errores y
+    las etapas que ocurren fuera del handler. Deja `received_at` en el estado de la petición
+    (el handler mide request_parsing desde ahí) y, si el handler dejó `handler_done`, mide
+    la serialización hasta el envío de las cabeceras de respuesta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        state = scope.setdefault('state', {})
+        state['received_at'] = started
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+                handler_done = state.get('handler_done')
+                if handler_done is not None:
+                    route = scope.get('route')
+                    REQUEST_STAGE_DURATION.labels(route.path if route else scope['path'], 'serialization').observe(
+                        time.perf_counter() - handler_done)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            path = route.path if route is not None else 'unmatched'
+            HTTP_REQUEST_DURATION.labels(scope['method'], path, status[0]).observe(time.perf_counter() - started)
+            if status[0] >= 400:
+                HTTP_REQUEST_ERRORS.labels(path, status[0]).inc()
+
+
+def observe_drift_report(report: dict) -> None:
+
+    """Vuelca un informe de DriftMonitor.report() en los gauges de drift."""
+    for feature, entry in (report or {}).get('features', {}).items():
+        if entry.get('psi') is not None:
+            FEATURE_DRIFT_PSI.labels(feature).set(entry['psi'])
+        for side, value in entry.get('out_of_range', {}).items():
+            FEATURE_OUT_OF_RANGE.labels(feature, side).set(value)
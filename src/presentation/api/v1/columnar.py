@@ -0,0 +1,183 @@
+import json
+import struct
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+
+try:  # pyarrow es opcional: sin él solo se acepta la matriz float32 (y JSON)
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+# Formatos binarios aceptados además de JSON (Content-Type de la petición y Accept de la respuesta)
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+FLOAT32_MATRIX = "application/x-exoai-float32-matrix"
+JSON = "application/json"
+BINARY_MEDIA_TYPES = (ARROW_STREAM, FLOAT32_MATRIX)
+
+# Cabecera de la matriz float32: magia, versión, filas, columnas (little-endian, 16 bytes).
+# Le siguen filas x columnas float32 little-endian en orden de filas (row-major).
+MATRIX_HEADER = struct.Struct('<4sIII')
+MATRIX_REQUEST_MAGIC = b'EXOM'
+MATRIX_RESPONSE_MAGIC = b'EXOR'
+MATRIX_FORMAT_VERSION = 1
+# Columnas opcionales tras las features (columnas = features + estas): no entran al modelo.
+# koi_teq alimenta la regla de habitabilidad; sin ella, is_potentially_habitable sale NaN (desconocido).
+MATRIX_TRAILING_COLUMNS = ('koi_teq',)
+
+# Documentación OpenAPI de los cuerpos binarios alternativos (se fusiona con el esquema JSON)
+COLUMNAR_OPENAPI = {
+    "requestBody": {"content": {
+        ARROW_STREAM: {"schema": {"type": "string", "format": "binary"}},
+        FLOAT32_MATRIX: {"schema": {"type": "string", "format": "binary"}},
+    }}
+}
+
+
+def media_type(header: Optional[str]) -> str:
+    return (header or '').split(';')[0].strip().lower()
+
+
+def response_media_type(request: Request, request_media: str) -> str:
+    """Formato de la respuesta: el pedido en Accept si es uno soportado; si no, el de la petición."""
+    accepted = [media_type(part) for part in request.headers.get('accept', '').split(',')]
+    for candidate in accepted:
+        if candidate in BINARY_MEDIA_TYPES or candidate == JSON:
+            return candidate
+    return request_media
+
+
+def require_arrow() -> None:
+    if pa is None:
+        raise HTTPException(status_code=415, detail=f"{ARROW_STREAM} requiere pyarrow en el servidor.")
+
+
+# --- Decodificación (sin objetos Python por valor) ---
+
+def decode_float32_matrix(body: bytes, n_columns: int, trailing_columns=()) -> np.ndarray:
+
+    """
+    Vista NumPy (N x C, float32) sobre el cuerpo binario, sin copiar. Valida la cabecera
+    y que el número de columnas sea el de features del modelo, opcionalmente seguido de
+    todas las `trailing_columns` (p. ej. MATRIX_TRAILING_COLUMNS).
+    """
+    if len(body) < MATRIX_HEADER.size:
+        raise ValueError("Cuerpo float32 sin cabecera completa.")
+    magic, version, n_rows, n_cols = MATRIX_HEADER.unpack_from(body)
+    if magic != MATRIX_REQUEST_MAGIC or version != MATRIX_FORMAT_VERSION:
+        raise ValueError(f"Cabecera float32 inválida (magia {magic!r}, versión {version}).")
+    if n_cols not in (n_columns, n_columns + len(trailing_columns)):
+        expected_cols = f"{n_columns} o {n_columns + len(trailing_columns)}" if trailing_columns else f"{n_columns}"
+        raise ValueError(f"Se esperaban {expected_cols} columnas de features, pero la matriz tiene {n_cols}.")
+    if n_rows == 0:
+        raise ValueError("El lote de features está vacío.")
+    expected = MATRIX_HEADER.size + n_rows * n_cols * 4
+    if len(body) != expected:
+        raise ValueError(f"Tamaño del cuerpo inconsistente: {len(body)} bytes, se esperaban {expected}.")
+    return np.frombuffer(body, dtype='<f4', count=n_rows * n_cols, offset=MATRIX_HEADER.size).reshape(n_rows, n_cols)
+
+
+def decode_arrow_columns(body: bytes, columns: Iterable[str] = None) -> Dict[str, np.ndarray]:
+
+    """
+    Columnas de un stream Arrow IPC como arrays float64 (nulos -> NaN). Solo se convierten
+    las `columns` pedidas (las que usa el handler) o, sin ellas, las numéricas: el resto
+    (p. ej. identificadores de texto como kepoi_name) se ignora. Las columnas float64 de un
+    solo bloque y sin nulos se devuelven sin copia.
+    """
+    require_arrow()
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise ValueError(f"Stream Arrow IPC inválido: {e}")
+    if table.num_rows == 0:
+        raise ValueError("El lote está vacío.")
+    wanted = None if columns is None else set(columns)
+    decoded = {}
+    for name, column in zip(table.column_names, table.columns):
+        if wanted is None and not _is_numeric(column.type):
+            continue
+        if wanted is not None and name not in wanted:
+            continue
+        try:
+            if column.null_count:
+                column = column.cast(pa.float64()).fill_null(np.nan)
+            decoded[name] = np.asarray(column.to_numpy(), dtype=np.float64)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, TypeError, ValueError):
+            raise ValueError(f"La columna '{name}' debe ser numérica (tipo Arrow: {column.type}).")
+    if not decoded and wanted is None:
+        raise ValueError("El lote no trae columnas numéricas.")
+    return decoded
+
+
+def _is_numeric(arrow_type) -> bool:
+    return (pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+            or pa.types.is_boolean(arrow_type) or pa.types.is_null(arrow_type))
+
+
+# --- Codificación de respuestas ---
+
+def encode_float32_matrix(columns: List[np.ndarray]) -> bytes:
+    """Respuesta N x C float32 con cabecera EXOR (mismo formato que la petición)."""
+    matrix = np.column_stack([np.asarray(values, dtype='<f4') for values in columns])
+    return MATRIX_HEADER.pack(MATRIX_RESPONSE_MAGIC, MATRIX_FORMAT_VERSION, *matrix.shape) + matrix.tobytes()
+
+
+def encode_arrow(columns: Mapping[str, "pa.Array"], metadata: Mapping[str, str]) -> bytes:
+    """Stream Arrow IPC con una sola tabla; los metadatos van en el esquema."""
+    require_arrow()
+    table = pa.table(dict(columns)).replace_schema_metadata({key: str(value) for key, value in metadata.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_column(values, type_name: str, mask: np.ndarray = None) -> "pa.Array":
+    """Array Arrow tipado desde NumPy; `mask` marca los nulos."""
+    return pa.array(np.asarray(values), type=getattr(pa, type_name)(), mask=mask)
+
+
+def metadata_json(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class ColumnarRoute(APIRoute):
+
+    """
+    Ruta con negociación de contenido: si el Content-Type es Arrow IPC o la matriz float32
+    y el endpoint registró un handler columnar (`@columnar_body`), la petición va a ese
+    handler; JSON sigue por el handler normal de FastAPI (validación pydantic y OpenAPI).
+    """
+
+    def get_route_handler(self) -> Callable:
+        json_handler = super().get_route_handler()
+        columnar_handler = getattr(self.endpoint, 'columnar_handler', None)
+        if columnar_handler is None:
+            return json_handler
+
+        async def handler(request: Request):
+            request_media = media_type(request.headers.get('content-type'))
+            if request_media in BINARY_MEDIA_TYPES:
+                return await columnar_handler(request, request_media)
+            return await json_handler(request)
+
+        return handler
+
+
+def columnar_body(handler: Callable) -> Callable:
+    """Registra `handler(request, media_type)` como alternativa binaria del endpoint decorado."""
+    def register(endpoint: Callable) -> Callable:
+        endpoint.columnar_handler = handler
+        return endpoint
+    return register
+
+
+def feature_matrix(columns: Mapping[str, np.ndarray], feature_order: List[str]) -> np.ndarray:
+    """Matriz N x F en el orden del modelo a partir de columnas con nombre (Arrow)."""
+    missing = sorted(name for name in feature_order if name not in columns)
+    if missing:
+        raise ValueError(f"Faltan características en la petición: {missing}")
+    return np.column_stack([columns[name] for name in feature_order])
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any
+import logging
+from src.presentation.api.v1.schemas.schemas import CrossMatchRequest, CrossMatchResponse
+from src.presentation.api.v1.endpoints.models import CATALOG_SERVICE
+
+# Logger del módulo (los handlers los configura setup_logger en el logger raíz)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("/crossmatch", response_model=CrossMatchResponse)
+async def crossmatch(req: CrossMatchRequest):
+    """
+    Cruza un lote de objetos con los catálogos KOI, confirmados y TOI: uniones por ID en tablas
+    hash y búsqueda por cono (KD-tree) sobre ra/dec. El índice se carga una vez fuera del event loop.
+    """
+    radius = req.radius_arcsec or CATALOG_SERVICE.radius_arcsec
+    try:
+        results = await run_in_threadpool(
+            CATALOG_SERVICE.crossmatch, kepid=req.kepid, tid=req.tid, names=req.names,
+            ra=req.ra, dec=req.dec, radius_arcsec=radius
+        )
+    except ValueError as e:
+        logger.warning(f"Error de validación del cross-match: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error en la entrada del cross-match: {str(e)}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return CrossMatchResponse(count=len(results), radius_arcsec=radius, results=results)
+
+@router.get("/stats", response_model=Dict[str, Any])
+async def get_catalog_stats():
+    """ Estado del índice de catálogos: entradas por catálogo, entradas con posición y radio por defecto. """
+    return CATALOG_SERVICE.get_stats()
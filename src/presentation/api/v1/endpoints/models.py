@@ -1,46 +1,85 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Header, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
 import logging
+import os
+import numpy as np
 from src.presentation.api.v1.schemas.schemas import (
-    PredictRequest, PredictResponse, MetricsResponse, FeatureImportanceResponse
+    PredictRequest, PredictResponse, PredictBatchRequest, PredictBatchResponse,
+    PredictCandidatesRequest, PredictCandidatesResponse, MetricsResponse, FeatureImportanceResponse,
+    ReloadModelRequest, ReloadModelResponse, ModelVersionsResponse
 )
 from src.infrastructure.adapters.ml_adapter import RandomForestAdapter
 from src.application.services.exoplanet_service import ExoplanetService
+from src.domain.entities.exoplanet import Exoplanet, ExoplanetBatch
+from src.application.services.prediction_batcher import PredictionBatcher
+from src.application.services.prediction_cache import PredictionCache
+from src.application.services.drift_monitor import DriftMonitor
+from src.application.services.catalog_crossmatch import CatalogCrossMatchService
+from src.infrastructure.monitoring.metrics import PREDICTION_BATCH_ROWS, PREDICTION_ERRORS, StageTimer
+from src.presentation.api.v1.columnar import (
+    ARROW_STREAM, COLUMNAR_OPENAPI, FLOAT32_MATRIX, JSON, MATRIX_TRAILING_COLUMNS, ColumnarRoute, arrow_column,
+    columnar_body, decode_arrow_columns, decode_float32_matrix, encode_arrow, encode_float32_matrix,
+    feature_matrix, metadata_json, require_arrow, response_media_type
+)
 
-# Configuración del logger
-logging.basicConfig(level=logging.INFO)
+# Logger del módulo (los handlers los configura setup_logger en el logger raíz)
 logger = logging.getLogger(__name__)
 
-# Inicialización de componentes
+# Inicialización de componentes (el modelo se carga en la primera predicción o en /ready)
 ML_REPOSITORY = RandomForestAdapter()
-EXOPLANET_SERVICE = ExoplanetService(ml_repository=ML_REPOSITORY)
-logger.info("Servicio ExoplanetService y Modelo ML cargados correctamente.")
+# Caché LRU/TTL de resultados (clave: features redondeadas + versión del modelo)
+PREDICTION_CACHE = PredictionCache()
+# Sketches de las features servidas frente a la referencia del entrenamiento (ver /models/drift)
+DRIFT_MONITOR = DriftMonitor()
+# Sin transformador explícito: el servicio usa el de la versión servida (cambia con cada recarga)
+EXOPLANET_SERVICE = ExoplanetService(ml_repository=ML_REPOSITORY, prediction_cache=PREDICTION_CACHE,
+                                     drift_monitor=DRIFT_MONITOR)
+# Índice de catálogos conocidos (KOI, confirmados, TOI) para el contexto de /predict-candidates
+CATALOG_SERVICE = CatalogCrossMatchService()
+# Coalescedor de peticiones individuales concurrentes (micro-batching)
+PREDICTION_BATCHER = PredictionBatcher(service=EXOPLANET_SERVICE)
+logger.info("Servicio ExoplanetService inicializado (carga del modelo diferida).")
+# Token de los endpoints de administración (vacío = endpoints desactivados)
+MODEL_ADMIN_TOKEN = os.getenv("MODEL_ADMIN_TOKEN", "")
 
-router = APIRouter()
+# Las rutas de predicción aceptan además cuerpos Arrow IPC / matriz float32 (ver columnar.py)
+router = APIRouter(route_class=ColumnarRoute)
 
 @router.post("/predict", response_model=PredictResponse)
-async def predict_exoplanet(req: PredictRequest):
+async def predict_exoplanet(req: PredictRequest, request: Request):
     """ Clasifica un candidato a exoplaneta a partir de un diccionario de características. """
+    timer = StageTimer.for_request("/models/predict", request.state)
     try:
-        # Obtener el orden correcto de las features desde el adaptador
-        feature_order = ML_REPOSITORY.get_feature_names()
-        
-        # Validar que todas las features necesarias están en el request
-        if not all(feature in req.features for feature in feature_order):
-            missing = sorted([f for f in feature_order if f not in req.features])
-            raise ValueError(f"Faltan características en la petición: {missing}")
+        with timer.stage("feature_ordering"):
+            # Obtener el orden correcto de las features desde el adaptador
+            feature_order = ML_REPOSITORY.get_feature_names()
+            
+            # Validar que todas las features necesarias están en el request
+            if not all(feature in req.features for feature in feature_order):
+                missing = sorted([f for f in feature_order if f not in req.features])
+                raise ValueError(f"Faltan características en la petición: {missing}")
 
-        # Ordenar las features del request según lo esperado por el modelo
-        ordered_features = [req.features[name] for name in feature_order]
+            # Ordenar las features del request según lo esperado por el modelo
+            ordered_features = [req.features[name] for name in feature_order]
 
-        result = EXOPLANET_SERVICE.predict(features=ordered_features)
+        # Se agrupa con otras peticiones concurrentes y se ejecuta fuera del event loop
+        with timer.stage("model_inference"):
+            result = await PREDICTION_BATCHER.submit(ordered_features)
+        PREDICTION_BATCH_ROWS.labels("/models/predict").observe(1)
 
         prediction_label = "Exoplaneta Confirmado" if result['prediction'] == 1 else "Candidato Falso"
         
-        # Lógica de dominio simple para habitabilidad
-        is_habitable = (result['prediction'] == 1 and 
-                        req.features.get('koi_prad', 100) < 2.5 and 
-                        req.features.get('koi_steff', 0) > 4000)
+        # Regla de habitabilidad del dominio (koi_teq es opcional en la petición: sin él, no habitable)
+        with timer.stage("habitability"):
+            is_habitable = Exoplanet(
+                kepid=req.features.get('kepid', 'N/A'),
+                period_days=req.features.get('koi_period', float('nan')),
+                radius_earth=req.features.get('koi_prad', float('nan')),
+                equilibrium_temp=req.features.get('koi_teq', float('nan')),
+                confidence_score=result['confidence']
+            ).is_potentially_habitable()
 
         return PredictResponse(
             prediction_label=prediction_label,
@@ -50,11 +89,263 @@ async def predict_exoplanet(req: PredictRequest):
             is_potentially_habitable=is_habitable
         )
     except ValueError as e:
+        PREDICTION_ERRORS.labels("/models/predict", "validation").inc()
         logger.warning(f"Error de validación de features: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error en la entrada de features: {str(e)}")
     except Exception as e:
+        PREDICTION_ERRORS.labels("/models/predict", "internal").inc()
         logger.error(f"Error interno en la predicción: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+    finally:
+        timer.finish()
+
+async def _score_batch(features_matrix: np.ndarray, columns, timer: StageTimer) -> tuple:
+    """
+    Inferencia + regla de habitabilidad de un lote (común a JSON y a los formatos columnares).
+    La inferencia (y la carga diferida del modelo) corre fuera del event loop.
+    """
+    with timer.stage("model_inference"):
+        result = await run_in_threadpool(EXOPLANET_SERVICE.predict_batch, features_matrix)
+    predictions = np.asarray(result['predictions'], dtype=int)
+    confidences = np.asarray(result['confidences'], dtype=np.float64)
+
+    # Misma regla de habitabilidad que /predict, evaluada como máscara sobre el lote
+    with timer.stage("habitability"):
+        is_habitable = ExoplanetBatch.from_columns(columns, confidences).is_potentially_habitable()
+    return predictions, confidences, is_habitable, result['model_name']
+
+
+async def predict_batch_columnar(request: Request, request_media: str) -> Response:
+    """
+    /predict-batch con cuerpo binario: Arrow IPC (una columna por feature, con nombre) o matriz
+    float32 en el orden de get_feature_names(). Se decodifica directamente a NumPy y la
+    respuesta sale en el mismo formato (o en el indicado por Accept).
+    """
+    if request_media == ARROW_STREAM:
+        require_arrow()
+    timer = StageTimer.for_request("/models/predict-batch", request.state)
+    try:
+        with timer.stage("feature_ordering"):
+            feature_order = ML_REPOSITORY.get_feature_names()
+            body = await request.body()
+            if request_media == FLOAT32_MATRIX:
+                # Tras las features pueden venir las columnas de MATRIX_TRAILING_COLUMNS (koi_teq)
+                trailing = [name for name in MATRIX_TRAILING_COLUMNS if name not in feature_order]
+                matrix = decode_float32_matrix(body, len(feature_order), trailing)
+                features_matrix = matrix[:, :len(feature_order)]
+                columns = dict(zip(feature_order + trailing, matrix.T))
+            else:
+                # Solo features + columnas de habitabilidad: otras columnas (ids de texto) no se decodifican
+                columns = decode_arrow_columns(body, feature_order + list(MATRIX_TRAILING_COLUMNS))
+                features_matrix = feature_matrix(columns, feature_order)
+        PREDICTION_BATCH_ROWS.labels("/models/predict-batch").observe(len(features_matrix))
+
+        predictions, confidences, is_habitable, model_name = await _score_batch(features_matrix, columns, timer)
+    except ValueError as e:
+        PREDICTION_ERRORS.labels("/models/predict-batch", "validation").inc()
+        logger.warning(f"Error de validación del lote de features: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error en la entrada de features: {str(e)}")
+    except Exception as e:
+        PREDICTION_ERRORS.labels("/models/predict-batch", "internal").inc()
+        logger.error(f"Error interno en la predicción en lote: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+    finally:
+        timer.finish()
+
+    # La codificación queda fuera del handler: MetricsMiddleware la mide como serialization
+    response_media = response_media_type(request, request_media)
+    headers = {"X-Model-Version": str(model_name)}
+    if response_media == FLOAT32_MATRIX:
+        # Columnas: prediction_value, confidence_score, is_potentially_habitable (NaN sin koi_teq: desconocida)
+        habitable_column = is_habitable if 'koi_teq' in columns else np.full(len(is_habitable), np.nan)
+        return Response(encode_float32_matrix([predictions, confidences, habitable_column]),
+                        media_type=FLOAT32_MATRIX, headers=headers)
+    if response_media == ARROW_STREAM:
+        require_arrow()
+        return Response(encode_arrow({
+            "prediction_value": arrow_column(predictions, "int8"),
+            "confidence_score": arrow_column(confidences, "float64"),
+            "is_potentially_habitable": arrow_column(is_habitable, "bool_"),
+        }, {"model_version": model_name}), media_type=ARROW_STREAM, headers=headers)
+    return JSONResponse(PredictBatchResponse(
+        count=len(predictions),
+        prediction_value=predictions.tolist(),
+        confidence_score=confidences.tolist(),
+        is_potentially_habitable=is_habitable.tolist(),
+        model_version=model_name
+    ).model_dump())
+
+@router.post("/predict-batch", response_model=PredictBatchResponse, openapi_extra=COLUMNAR_OPENAPI)
+@columnar_body(predict_batch_columnar)
+async def predict_exoplanet_batch(req: PredictBatchRequest, request: Request):
+    """ Clasifica N candidatos en una sola pasada del modelo a partir de columnas de características. """
+    timer = StageTimer.for_request("/models/predict-batch", request.state)
+    try:
+        with timer.stage("feature_ordering"):
+            feature_order = ML_REPOSITORY.get_feature_names()
+
+            # Validación única del lote completo: presencia de columnas y longitudes consistentes
+            missing = sorted([f for f in feature_order if f not in req.features])
+            if missing:
+                raise ValueError(f"Faltan características en la petición: {missing}")
+
+            lengths = {len(req.features[name]) for name in feature_order}
+            if len(lengths) != 1:
+                raise ValueError(f"Todas las columnas de features deben tener la misma longitud. Longitudes recibidas: {sorted(lengths)}")
+            n_rows = lengths.pop()
+            if n_rows == 0:
+                raise ValueError("El lote de features está vacío.")
+
+            # Matriz N x F en el orden esperado por el modelo (sin bucles por fila)
+            features_matrix = np.column_stack([np.asarray(req.features[name], dtype=np.float64) for name in feature_order])
+        PREDICTION_BATCH_ROWS.labels("/models/predict-batch").observe(n_rows)
+
+        predictions, confidences, is_habitable, model_name = await _score_batch(features_matrix, req.features, timer)
+
+        return PredictBatchResponse(
+            count=n_rows,
+            prediction_value=predictions.tolist(),
+            confidence_score=confidences.tolist(),
+            is_potentially_habitable=is_habitable.tolist(),
+            model_version=model_name
+        )
+    except ValueError as e:
+        PREDICTION_ERRORS.labels("/models/predict-batch", "validation").inc()
+        logger.warning(f"Error de validación del lote de features: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error en la entrada de features: {str(e)}")
+    except Exception as e:
+        PREDICTION_ERRORS.labels("/models/predict-batch", "internal").inc()
+        logger.error(f"Error interno en la predicción en lote: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+    finally:
+        timer.finish()
+
+def _require_transformer() -> None:
+    """503 si la versión servida no tiene transformador (puede disparar la carga diferida del modelo)."""
+    if EXOPLANET_SERVICE.transformer is None:
+        raise HTTPException(status_code=503, detail="Transformador de inferencia no disponible. Reentrene el modelo.")
+
+async def predict_candidates_columnar(request: Request, request_media: str) -> Response:
+    """
+    /predict-candidates con cuerpo Arrow IPC (columnas crudas con nombre; nulos -> NaN).
+    Respuesta Arrow con columnas anulables (rechazados = nulo) y los rechazos por filtro
+    y la versión en los metadatos del esquema.
+    """
+    if request_media != ARROW_STREAM:
+        raise HTTPException(status_code=415, detail=f"/predict-candidates necesita columnas con nombre: use {ARROW_STREAM}.")
+    require_arrow()
+    await run_in_threadpool(_require_transformer)
+    timer = StageTimer.for_request("/models/predict-candidates", request.state)
+    try:
+        with timer.stage("feature_ordering"):
+            raw_columns = decode_arrow_columns(await request.body())
+            n_rows = len(next(iter(raw_columns.values())))
+        PREDICTION_BATCH_ROWS.labels("/models/predict-candidates").observe(n_rows)
+
+        with timer.stage("model_inference"):
+            result = await run_in_threadpool(EXOPLANET_SERVICE.predict_candidates, raw_columns)
+
+        # Disposición conocida por kepid/tid o ra/dec (índice en memoria, sin leer CSVs)
+        with timer.stage("catalog_context"):
+            catalog_context = await run_in_threadpool(CATALOG_SERVICE.context_for_columns, raw_columns)
+    except ValueError as e:
+        PREDICTION_ERRORS.labels("/models/predict-candidates", "validation").inc()
+        logger.warning(f"Error de validación de candidatos: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error en la entrada de candidatos: {str(e)}")
+    except Exception as e:
+        PREDICTION_ERRORS.labels("/models/predict-candidates", "internal").inc()
+        logger.error(f"Error interno en la predicción de candidatos: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+    finally:
+        timer.finish()
+
+    model_version = result['model_name'] or ML_REPOSITORY.model_version or "Ensemble_v3_Final"
+    if response_media_type(request, request_media) == JSON:
+        return JSONResponse(PredictCandidatesResponse(
+            count=n_rows, accepted=result['accepted'], prediction_value=result['predictions'],
+            confidence_score=result['confidences'], is_potentially_habitable=result['is_potentially_habitable'],
+            rejections=result['rejections'], model_version=model_version,
+            catalog_context=catalog_context
+        ).model_dump())
+    rejected = ~np.asarray(result['accepted'], dtype=bool)
+    predictions = np.array([0 if value is None else value for value in result['predictions']])
+    confidences = np.array([np.nan if value is None else value for value in result['confidences']], dtype=np.float64)
+    habitable = [value is True for value in result['is_potentially_habitable']]
+    unknown = np.array([value is None for value in result['is_potentially_habitable']], dtype=bool)
+    columns = {
+        "accepted": arrow_column(~rejected, "bool_"),
+        "prediction_value": arrow_column(predictions, "int8", mask=rejected),
+        "confidence_score": arrow_column(confidences, "float64", mask=rejected),
+        "is_potentially_habitable": arrow_column(habitable, "bool_", mask=unknown),
+    }
+    if catalog_context is not None:
+        known = np.array([context["known_disposition"] or '' for context in catalog_context])
+        columns["known_disposition"] = arrow_column(known, "string", mask=known == '')
+        columns["already_confirmed"] = arrow_column([context["already_confirmed"] for context in catalog_context], "bool_")
+    return Response(encode_arrow(columns, {"model_version": model_version, "rejections": metadata_json(result['rejections'])}),
+        media_type=ARROW_STREAM, headers={"X-Model-Version": str(model_version)})
+
+@router.post("/predict-candidates", response_model=PredictCandidatesResponse, openapi_extra=COLUMNAR_OPENAPI)
+@columnar_body(predict_candidates_columnar)
+async def predict_candidates(req: PredictCandidatesRequest, request: Request):
+    """ Clasifica candidatos con columnas KOI crudas: filtros científicos -> transformador -> modelo. """
+    await run_in_threadpool(_require_transformer)
+    timer = StageTimer.for_request("/models/predict-candidates", request.state)
+    try:
+        with timer.stage("feature_ordering"):
+            lengths = {len(values) for values in req.candidates.values()}
+            if len(lengths) != 1:
+                raise ValueError(f"Todas las columnas deben tener la misma longitud. Longitudes recibidas: {sorted(lengths)}")
+            n_rows = lengths.pop()
+            if n_rows == 0:
+                raise ValueError("El lote de candidatos está vacío.")
+
+            raw_columns = {name: np.asarray(values, dtype=np.float64) for name, values in req.candidates.items()}
+        PREDICTION_BATCH_ROWS.labels("/models/predict-candidates").observe(n_rows)
+
+        # Filtros científicos + transformador + modelo
+        with timer.stage("model_inference"):
+            result = await run_in_threadpool(EXOPLANET_SERVICE.predict_candidates, raw_columns)
+
+        # Disposición conocida por kepid/tid o ra/dec (índice en memoria, sin leer CSVs)
+        with timer.stage("catalog_context"):
+            catalog_context = await run_in_threadpool(CATALOG_SERVICE.context_for_columns, raw_columns)
+
+        return PredictCandidatesResponse(
+            count=n_rows,
+            accepted=result['accepted'],
+            prediction_value=result['predictions'],
+            confidence_score=result['confidences'],
+            is_potentially_habitable=result['is_potentially_habitable'],
+            rejections=result['rejections'],
+            model_version=result['model_name'] or ML_REPOSITORY.model_version or "Ensemble_v3_Final",
+            catalog_context=catalog_context
+        )
+    except ValueError as e:
+        PREDICTION_ERRORS.labels("/models/predict-candidates", "validation").inc()
+        logger.warning(f"Error de validación de candidatos: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error en la entrada de candidatos: {str(e)}")
+    except Exception as e:
+        PREDICTION_ERRORS.labels("/models/predict-candidates", "internal").inc()
+        logger.error(f"Error interno en la predicción de candidatos: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+    finally:
+        timer.finish()
+
+@router.get("/batcher-stats", response_model=Dict[str, Any])
+async def get_batcher_stats():
+    """ Estadísticas del micro-batcher: profundidad de cola, tamaño de lote y tiempos de espera. """
+    return PREDICTION_BATCHER.get_stats()
+
+@router.get("/cache-stats", response_model=Dict[str, Any])
+async def get_cache_stats():
+    """ Estadísticas de la caché de predicciones: tamaño, ratio de aciertos y desalojos. """
+    return PREDICTION_CACHE.get_stats()
+
+@router.get("/drift", response_model=Dict[str, Any])
+async def get_drift_report():
+    """ Drift de las features servidas frente al entrenamiento: PSI, KS aproximado, cuantiles y valores fuera de rango. """
+    return await run_in_threadpool(DRIFT_MONITOR.report, ML_REPOSITORY.get_drift_reference())
 
 @router.get("/metrics", response_model=MetricsResponse)
 async def get_metrics():
@@ -73,4 +364,44 @@ async def get_feature_importance():
     
     # Ordenar y devolver solo el top 10 para eficiencia
     top_10 = dict(sorted(importance.items(), key=lambda item: item[1], reverse=True)[:10])
-    return FeatureImportanceResponse(importance=top_10)
\ No newline at end of file
+    return FeatureImportanceResponse(importance=top_10)
+
+@router.get("/versions", response_model=ModelVersionsResponse)
+async def get_model_versions():
+    """ Versiones del registro de modelos, la publicada (CURRENT) y la que se está sirviendo. """
+    return ModelVersionsResponse(
+        versions=ML_REPOSITORY.registry.list_versions(),
+        current_version=ML_REPOSITORY.registry.current_version(),
+        serving_version=ML_REPOSITORY.model_version
+    )
+
+@router.post("/admin/reload", response_model=ReloadModelResponse)
+async def reload_model(req: Optional[ReloadModelRequest] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    Recarga en caliente: carga y calienta la versión pedida (o CURRENT) fuera del event loop
+    y la intercambia de forma atómica. Las peticiones en curso terminan con el modelo anterior.
+    """
+    if not MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Recarga desactivada: configure MODEL_ADMIN_TOKEN en el servidor.")
+    if x_admin_token != MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Token de administración inválido.")
+
+    previous_version = ML_REPOSITORY.model_version
+    try:
+        state = await run_in_threadpool(ML_REPOSITORY.reload, req.version if req else None)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Recarga del modelo fallida; se mantiene la versión {previous_version}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"No se pudo recargar el modelo: {str(e)}")
+
+    # Los resultados cacheados pertenecen al modelo anterior (aunque se recargue el mismo id de versión)
+    PREDICTION_CACHE.invalidate()
+
+    return ReloadModelResponse(
+        previous_version=previous_version,
+        model_version=state.version,
+        model_format=state.model_format,
+        load_time_seconds=state.load_time_seconds,
+        warmup_time_seconds=state.warmup_time_seconds
+    )
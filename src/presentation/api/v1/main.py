@@ -1,6 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.presentation.api.v1.endpoints import models
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from src.presentation.api.v1.endpoints import catalogs, models
+from src.infrastructure.monitoring.metrics import (
+    REGISTRY, MetricsMiddleware, observe_drift_report, observe_pipeline_profile
+)
+from src.infrastructure.monitoring.logger import RequestIdMiddleware, setup_logger
 
 # Configuración básica de la aplicación FastAPI
 app = FastAPI(
@@ -23,17 +29,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latencia por ruta, errores y etapas de serialización (middleware ASGI puro, ver /metrics)
+app.add_middleware(MetricsMiddleware)
+# X-Request-ID por petición (se propaga a todos los logs emitidos durante la petición)
+app.add_middleware(RequestIdMiddleware)
+
 # Incluir router de modelos (endpoints como /models/predict)
 app.include_router(models.router, prefix="/models", tags=["Models"])
+# Cross-match con los catálogos conocidos (KOI, confirmados, TOI)
+app.include_router(catalogs.router, prefix="/catalogs", tags=["Catalogs"])
 
 @app.get("/health", tags=["Health"])
 async def health_check():
 
-    """Endpoint simple para verificar que la API está operativa."""
-    return {"status": "UP", "model_loaded": True}
+    """Liveness: la API está operativa. Informa el estado real de carga del modelo sin forzarla."""
+    repository = models.ML_REPOSITORY
+    return {
+        "status": "UP",
+        "model_loaded": repository.is_loaded,
+        "model_version": repository.model_version,
+        "model_format": repository.model_format,
+        "model_load_time_seconds": repository.load_time_seconds,
+    }
+
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+
+    """Readiness: carga el modelo si aún no lo está (fuera del event loop) y responde 503 si falla."""
+    repository = models.ML_REPOSITORY
+    try:
+        await run_in_threadpool(repository.ensure_loaded)
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "NOT_READY", "model_loaded": False, "detail": str(e)})
+    return {
+        "status": "READY",
+        "model_loaded": True,
+        "model_version": repository.model_version,
+        "model_format": repository.model_format,
+        "model_load_time_seconds": repository.load_time_seconds,
+    }
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+
+    """Métricas en formato de texto Prometheus (latencias por etapa, lotes, errores, pipeline y drift)."""
+    # Tiempos/memoria por paso del preprocesador del entrenamiento de la versión servida
+    training_metrics = models.ML_REPOSITORY.get_metrics() or {}
+    observe_pipeline_profile(training_metrics.get("pipeline_profile"))
+    # PSI y valores fuera de rango de las features servidas (ventana actual del monitor de drift)
+    observe_drift_report(models.DRIFT_MONITOR.report(models.ML_REPOSITORY.get_drift_reference()))
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 @app.on_event("startup")
 async def startup_event():
-    
-    # Aquí podríamos cargar el modelo si no lo hiciéramos en el adaptador
-    print("🚀 API de Exoplanetas arrancada. Lista para predicciones.")
\ No newline at end of file
+
+    # Logging del proceso servidor (cola + listener en segundo plano, ver monitoring/logger.py)
+    setup_logger()
+    # El modelo no se carga aquí: se difiere hasta la primera predicción o el probe /ready
+    print("🚀 API de Exoplanetas arrancada. Lista para predicciones.")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+
+    # Detiene el worker del micro-batcher de predicciones
+    await models.PREDICTION_BATCHER.close()
\ No newline at end of file
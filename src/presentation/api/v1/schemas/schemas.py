@@ -20,9 +20,78 @@ class PredictResponse(BaseModel):
     prediction_label: str = Field(..., example="Exoplaneta Confirmado")
     confidence_score: float = Field(..., example=0.95)
     prediction_value: int = Field(..., example=1)
-    model_version: str = Field("Ensemble_v3_Final", example="Ensemble_v3_Final")
+    model_version: str = Field("Ensemble_v3_Final", example="ensemble_v3-20251005-120000")
     is_potentially_habitable: bool = Field(False, example=False)
+
+class PredictBatchRequest(BaseModel):
+    """
+    Schema columnar para predicción en lote: cada feature mapea a la lista
+    de valores de todos los candidatos (misma longitud para todas las columnas).
+    """
+    features: Dict[str, List[float]] = Field(..., example={
+        "koi_period": [85.5, 2.98], "koi_impact": [0.146, 0.8], "koi_duration": [4.5, 3.5],
+        "koi_depth": [874.8, 82000.0], "koi_prad": [2.26, 15.0], "koi_model_snr": [25.8, 2500.0]
+    })
+
+class PredictBatchResponse(BaseModel):
+    """
+    Schema columnar de salida: listas alineadas por fila con la misma semántica
+    que PredictResponse, más el tamaño del lote.
+    """
+    count: int = Field(..., example=2)
+    prediction_value: List[int] = Field(..., example=[1, 0])
+    confidence_score: List[float] = Field(..., example=[0.95, 0.12])
+    is_potentially_habitable: List[bool] = Field(..., example=[True, False])
+    model_version: str = Field("Ensemble_v3_Final", example="ensemble_v3-20251005-120000")
     
+class PredictCandidatesRequest(BaseModel):
+    """
+    Schema columnar de candidatos con columnas KOI crudas (sin escalar).
+    Los valores nulos o columnas ausentes se imputan con las medianas de entrenamiento.
+    """
+    candidates: Dict[str, List[Optional[float]]] = Field(..., example={
+        "koi_period": [85.5, 0.2], "koi_duration": [4.5, 3.5], "koi_depth": [874.8, 82000.0],
+        "koi_model_snr": [25.8, 2500.0], "koi_prad": [2.26, None]
+    })
+
+class PredictCandidatesResponse(BaseModel):
+    """
+    Resultado columnar: los candidatos rechazados por los filtros científicos
+    no llegan al modelo y tienen predicción/confianza nulas.
+    """
+    count: int = Field(..., example=2)
+    accepted: List[bool] = Field(..., example=[True, False])
+    prediction_value: List[Optional[int]] = Field(..., example=[1, None])
+    confidence_score: List[Optional[float]] = Field(..., example=[0.95, None])
+    # Nulo también si la fila no trae temperatura de equilibrio (koi_teq/pl_eqt): habitabilidad desconocida
+    is_potentially_habitable: List[Optional[bool]] = Field(..., example=[False, None])
+    rejections: Dict[str, int] = Field(..., example={"Período orbital válido": 1})
+    model_version: str = Field("Ensemble_v3_Final", example="ensemble_v3-20251005-120000")
+    # Solo si la petición trae kepid/tid o ra/dec: disposición conocida en KOI/confirmados/TOI por fila
+    catalog_context: Optional[List[Dict[str, Any]]] = Field(None, example=[
+        {"known_disposition": "CONFIRMED", "already_confirmed": True, "confirmed_names": ["Kepler-227 b"], "matches": []}
+    ])
+
+# --- Modelos de Catálogos (cross-match) ---
+
+class CrossMatchRequest(BaseModel):
+    """
+    Schema columnar de objetos a cruzar con los catálogos conocidos: por ID (kepid, TIC ID,
+    nombre KOI/TOI) y/o por posición (ra/dec en grados, búsqueda por cono).
+    """
+    kepid: Optional[List[Optional[int]]] = Field(None, example=[10797460, None])
+    tid: Optional[List[Optional[int]]] = Field(None, example=[None, 50365310])
+    names: Optional[List[Optional[str]]] = Field(None, example=["K00752.01", "TOI-1000.01"])
+    ra: Optional[List[Optional[float]]] = Field(None, example=[291.93423, 112.357708])
+    dec: Optional[List[Optional[float]]] = Field(None, example=[48.141651, -12.69596])
+    radius_arcsec: Optional[float] = Field(None, gt=0, le=3600, example=2.0)
+
+class CrossMatchResponse(BaseModel):
+    """ Contexto conocido por fila: coincidencias, disposición más concluyente y nombres confirmados. """
+    count: int
+    radius_arcsec: float
+    results: List[Dict[str, Any]]
+
 # --- Modelos de Métricas y Explicabilidad ---
 
 class MetricsResponse(BaseModel):
@@ -31,7 +100,28 @@ class MetricsResponse(BaseModel):
     f1_score: float
     train_size: int
     test_size: int
+    model_version: Optional[str] = None
     
 class FeatureImportanceResponse(BaseModel):
     """ Schema para reportar la importancia de características. """
-    importance: Dict[str, float]
\ No newline at end of file
+    importance: Dict[str, float]
+
+# --- Administración del registro de modelos ---
+
+class ReloadModelRequest(BaseModel):
+    """ Versión del registro a cargar; sin versión se usa la publicada (CURRENT). """
+    version: Optional[str] = Field(None, example="ensemble_v3-20251005-120000")
+
+class ReloadModelResponse(BaseModel):
+    """ Resultado de la recarga en caliente. """
+    previous_version: Optional[str]
+    model_version: str
+    model_format: str
+    load_time_seconds: float
+    warmup_time_seconds: float
+
+class ModelVersionsResponse(BaseModel):
+    """ Versiones disponibles en el registro y la que se está sirviendo. """
+    versions: List[str]
+    current_version: Optional[str]
+    serving_version: Optional[str]
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+
+class FakeRepository:
+
+    """
+    Port MLRepository mínimo para los tests de servicios: clase 1 (confianza 0.9) si la primera
+    feature supera `threshold` y clase 0 (0.2) si no. Cuenta las filas que llegan al modelo.
+    """
+
+    def __init__(self, model_version: str = 'fake', threshold: float = -np.inf, transformer=None):
+        self.model_version = model_version
+        self.threshold = threshold
+        self.transformer = transformer
+        self.rows_seen = 0
+
+    def get_transformer(self):
+        return self.transformer
+
+    def predict_batch(self, features_matrix):
+        positive = np.asarray(features_matrix, dtype=np.float64)[:, 0] > self.threshold
+        self.rows_seen += len(positive)
+        return {"predictions": positive.astype(int).tolist(),
+                "confidences": np.where(positive, 0.9, 0.2).tolist(), "model_name": self.model_version}
+
+
+@pytest.fixture
+def fake_repository():
+    """Clase FakeRepository: se instancia en el test o se pasa como fábrica (repository_factory)."""
+    return FakeRepository
@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+
+from src.domain.pipeline_modules.data_cleaner import DataCleaner
+
+ARCHIVE_CSV = """# This file was produced by the NASA Exoplanet Archive
+# COLUMN kepid: KepID
+#
+kepid,koi_disposition,koi_period,koi_depth,koi_model_snr,koi_teq_err1
+10797460,CONFIRMED,9.48,615.8,35.8,
+10811496,FALSE POSITIVE,19.89,10829.0,76.3,
+10848459,CANDIDATE,1.73,,505.6,
+"""
+
+
+def _write_archive(path, content=ARCHIVE_CSV):
+    path.write_text(content)
+    return str(path)
+
+
+def test_cache_written_and_reused(tmp_path):
+    """La primera lectura crea el Parquet; la segunda lo reutiliza con proyección de columnas."""
+    csv_path = _write_archive(tmp_path / 'koi.csv')
+    cleaner = DataCleaner(cache_dir=str(tmp_path / 'cache'))
+
+    first = cleaner.load_and_select(csv_path)
+    cache_files = os.listdir(tmp_path / 'cache')
+    second = cleaner.load_and_select(csv_path)
+
+    assert len(cache_files) == 1 and cache_files[0].endswith('.parquet')
+    pd.testing.assert_frame_equal(first, second)
+    assert first['target_class'].tolist() == [1, 0, 1]
+    assert pd.isna(first.loc[2, 'koi_depth'])
+
+
+def test_cache_matches_astropy_reader(tmp_path):
+    """El lector rápido debe producir los mismos valores que el lector Astropy original."""
+    csv_path = _write_archive(tmp_path / 'koi.csv')
+
+    fast = DataCleaner(cache_dir=str(tmp_path / 'cache')).read_archive_table(csv_path)
+    reference = DataCleaner(use_cache=False)._read_with_astropy(csv_path)
+
+    for col in ['kepid', 'koi_disposition', 'koi_period', 'koi_depth', 'koi_model_snr']:
+        pd.testing.assert_series_equal(fast[col], reference[col], check_dtype=False)
+
+
+def test_cache_invalidated_when_source_changes(tmp_path):
+    """Un cambio en el CSV genera una nueva entrada y elimina la obsoleta."""
+    csv_path = _write_archive(tmp_path / 'koi.csv')
+    cleaner = DataCleaner(cache_dir=str(tmp_path / 'cache'))
+    cleaner.load_and_select(csv_path)
+    old_cache = os.listdir(tmp_path / 'cache')
+
+    _write_archive(tmp_path / 'koi.csv', ARCHIVE_CSV + "10854555,CONFIRMED,2.52,603.3,40.9,\n")
+    df = cleaner.load_and_select(csv_path)
+    new_cache = os.listdir(tmp_path / 'cache')
+
+    assert len(df) == 4
+    assert len(new_cache) == 1 and new_cache != old_cache
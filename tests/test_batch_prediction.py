@@ -0,0 +1,60 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+
+from src.application.services.exoplanet_service import ExoplanetService
+from src.infrastructure.adapters.ml_adapter import RandomForestAdapter
+
+N_FEATURES = RandomForestAdapter.EXPECTED_FEATURES_COUNT
+
+
+@pytest.fixture
+def adapter(tmp_path, monkeypatch):
+    """Adaptador con un Ensemble pequeño entrenado sobre datos sintéticos (32 features)."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, N_FEATURES))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+
+    ensemble = VotingClassifier(
+        estimators=[('rf', RandomForestClassifier(n_estimators=10, random_state=42)),
+                    ('lr', LogisticRegression(random_state=42))],
+        voting='soft'
+    ).fit(X, y)
+
+    model_path = tmp_path / 'ensemble_test.pkl'
+    joblib.dump({'model': ensemble, 'feature_names': []}, model_path)
+    monkeypatch.setattr(RandomForestAdapter, 'MODEL_FILE_PATH', str(model_path))
+    monkeypatch.setattr(RandomForestAdapter, 'COMPILED_MODEL_FILE_PATH', str(tmp_path / 'no_compiled.joblib'))
+    monkeypatch.setattr(RandomForestAdapter, 'REGISTRY_DIR', str(tmp_path / 'registry'))
+    return RandomForestAdapter()
+
+
+def test_predict_batch_matches_sklearn(adapter):
+    """El lote vectorizado debe coincidir con predict/predict_proba de sklearn fila a fila."""
+    X = np.random.default_rng(1).normal(size=(50, N_FEATURES))
+
+    result = adapter.predict_batch(X)
+
+    assert result['predictions'] == adapter.model.predict(X).tolist()
+    np.testing.assert_allclose(result['confidences'], adapter.model.predict_proba(X)[:, 1])
+    assert result['model_name'] == "Ensemble_v3_Final"
+
+
+def test_predict_single_consistent_with_batch(adapter):
+    """La predicción individual y la del lote deben dar el mismo resultado."""
+    X = np.random.default_rng(2).normal(size=(3, N_FEATURES))
+    service = ExoplanetService(ml_repository=adapter)
+
+    batch = service.predict_batch(X)
+    single = service.predict(X[1].tolist())
+
+    assert single['prediction'] == batch['predictions'][1]
+    assert single['confidence'] == pytest.approx(batch['confidences'][1])
+
+
+def test_predict_batch_feature_mismatch(adapter):
+    """Un lote con columnas incorrectas debe rechazarse completo."""
+    with pytest.raises(ValueError, match="features"):
+        adapter.predict_batch(np.ones((4, 5)))
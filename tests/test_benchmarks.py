@@ -0,0 +1,36 @@
+import pandas as pd
+
+from benchmarks.run_benchmarks import compare, make_synthetic_catalog, summarize
+
+DATA_PATH = './data/kepler_koi.csv'
+
+
+def test_compare_flags_regressions_per_row_and_threshold():
+    baseline = {'results': [
+        {'name': 'serving.predict_single', 'median_s': 0.5, 'rows': 500},
+        {'name': 'pipeline.x1.total', 'median_s': 0.05, 'rows': 9564, 'threshold': 1.0},
+        {'name': 'pipeline.x1.scaling', 'median_s': 0.001, 'rows': 9564},
+    ]}
+    results = [
+        summarize('serving.predict_single', [0.2, 0.2], rows=100),  # 2 ms/fila frente a 1 ms/fila
+        summarize('pipeline.x1.total', [0.08], rows=9564),           # x1.6 dentro de su umbral propio
+        summarize('pipeline.x1.scaling', [0.004], rows=9564),        # x4 pero por debajo del mínimo medible
+        summarize('api.nuevo', [1.0]),
+    ]
+
+    rows = {row['name']: row for row in compare(results, baseline, threshold=0.25)}
+
+    assert set(rows) == {'serving.predict_single', 'pipeline.x1.total', 'pipeline.x1.scaling'}
+    assert rows['serving.predict_single']['ratio'] == 2.0 and rows['serving.predict_single']['regression']
+    assert not rows['pipeline.x1.total']['regression']
+    assert not rows['pipeline.x1.scaling']['regression']
+
+
+def test_synthetic_catalog_scales_rows_with_unique_ids(tmp_path):
+    path = make_synthetic_catalog(DATA_PATH, 2, str(tmp_path / 'koi_x2.csv'))
+    original = pd.read_csv(DATA_PATH, comment='#')
+    synthetic = pd.read_csv(path)
+
+    assert len(synthetic) == 2 * len(original)
+    assert synthetic['kepid'].nunique() == 2 * original['kepid'].nunique()
+    assert set(synthetic['koi_disposition'].dropna()) <= set(original['koi_disposition'].dropna())
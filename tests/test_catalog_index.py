@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from src.application.services.catalog_crossmatch import CatalogCrossMatchService
+from src.domain.pipeline_modules.catalog_index import CatalogIndex
+
+KOI = pd.DataFrame({
+    'kepid': [100, 100, 200, 300],
+    'kepoi_name': ['K00001.01', 'K00001.02', 'K00002.01', 'K00003.01'],
+    'kepler_name': ['Kepler-1 b', None, None, None],
+    'koi_disposition': ['CONFIRMED', 'CANDIDATE', 'FALSE POSITIVE', 'CANDIDATE'],
+    'ra': [290.0, 290.0, 291.0, 0.0001],
+    'dec': [45.0, 45.0, 46.0, 10.0],
+})
+CONFIRMED = pd.DataFrame({
+    'kepid': [100, 100],
+    'koi_name': ['K00001.01', None],  # el segundo planeta no transita (sin KOI)
+    'kepler_name': ['Kepler-1 b', 'Kepler-1 c'],
+    'pl_name': ['TrES-2 b', 'Kepler-1 c'],
+})
+TOI = pd.DataFrame({
+    'toi': [1000.01, 1001.01],
+    'tid': [5000, 6000],
+    'tfopwg_disp': ['CP', 'PC'],
+    'ra': [290.0 + 1.0 / 3600, 359.9999],  # a 1" del KOI 1 y al otro lado de RA=0 del KOI 3
+    'dec': [45.0, 10.0],
+})
+
+
+def write_archive_csv(path, frame):
+    with open(path, 'w') as f:
+        f.write("# This file was produced by the NASA Exoplanet Archive\n")
+        frame.to_csv(f, index=False)
+    return str(path)
+
+
+def build(tmp_path):
+    return CatalogIndex.from_archives(write_archive_csv(tmp_path / 'koi.csv', KOI),
+                                      write_archive_csv(tmp_path / 'toi.csv', TOI),
+                                      write_archive_csv(tmp_path / 'confirmed.csv', CONFIRMED))
+
+
+def test_id_joins_and_cone_search_cross_catalogs(tmp_path):
+    index = build(tmp_path)
+
+    assert index.name[index.lookup_names(['TOI-1000.01', 'K00002.01'])].tolist() == ['TOI-1000.01', 'K00002.01']
+    assert index.lookup_names(['desconocido', None]).tolist() == [-1, -1]
+    assert [len(rows) for rows in index.lookup_hosts([100, np.nan, 999])] == [3, 0, 0]
+    assert index.name[index.lookup_hosts([6000], 'tess')[0]].tolist() == ['TOI-1001.01']
+
+    # Cono de 2": KOI 1, su hermano y el TOI a 1"; a través de RA=0 también se encuentra el vecino
+    rows, separations = index.cone_search([290.0, 0.0], [45.0, 10.0], radius_arcsec=2.0)[0]
+    assert sorted(index.name[rows]) == ['K00001.01', 'K00001.02', 'Kepler-1 c', 'TOI-1000.01']
+    np.testing.assert_allclose(separations[-1], np.cos(np.radians(45.0)), rtol=1e-6)
+    assert index.cone_search([0.0], [10.0], radius_arcsec=0.5)[0][0].size == 2
+    assert index.cone_search([np.nan], [10.0])[0][0].size == 0
+
+    context = index.known_context(kepid=[np.nan, 300, 200], tid=[5000, None, None])
+    assert [row['known_disposition'] for row in context] == ['CONFIRMED', 'CANDIDATE', 'FALSE POSITIVE']
+    assert context[0]['confirmed_names'] == [] and context[1]['already_confirmed'] is False
+    assert index.known_context(names=['K00001.01'])[0]['confirmed_names'] == ['TrES-2 b']
+
+
+def test_index_is_persisted_next_to_the_data_and_invalidated_by_a_new_dump(tmp_path):
+    koi_path = write_archive_csv(tmp_path / 'koi.csv', KOI)
+    toi_path = write_archive_csv(tmp_path / 'toi.csv', TOI)
+    index = CatalogIndex.load_or_build(koi_path, toi_path)
+    cached = sorted((tmp_path / '.cache').glob('catalog_index-*.npz'))
+    assert len(cached) == 1
+
+    restored = CatalogIndex.load(str(cached[0]))
+    query = dict(kepid=[100], ra=[291.0], dec=[46.0], radius_arcsec=2.0)
+    assert restored.known_context(**query) == index.known_context(**query)
+
+    write_archive_csv(tmp_path / 'koi.csv', KOI.assign(koi_disposition='CONFIRMED'))
+    rebuilt = CatalogIndex.load_or_build(koi_path, toi_path)
+    assert rebuilt.known_context(kepid=[300])[0]['already_confirmed']
+    assert sorted((tmp_path / '.cache').glob('catalog_index-*.npz')) != cached
+
+
+def test_service_degrades_to_no_context_when_the_index_cannot_load(tmp_path):
+    def missing_catalogs():
+        raise FileNotFoundError("kepler_koi.csv")
+
+    service = CatalogCrossMatchService(loader=missing_catalogs)
+    assert service.context_for_columns({'kepid': np.array([100.0])}) is None
+    assert service.get_stats()['load_error'] == "kepler_koi.csv"
+
+    service = CatalogCrossMatchService(loader=lambda: build(tmp_path))
+    assert service.context_for_columns({'koi_period': np.array([10.0])}) is None
+    context = service.context_for_columns({'kepid': np.array([100.0]), 'ra': np.array([0.0]), 'dec': np.array([10.0])})
+    assert context[0]['known_disposition'] == 'CONFIRMED' and len(context[0]['matches']) == 5
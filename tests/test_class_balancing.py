@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from sklearn.utils import resample
+
+from src.domain.pipeline_modules.data_finalizer import DataFinalizer
+
+
+def legacy_balance(X, y, random_state=42):
+    """Balanceo original por DataFrames (concat + resample por clase + sample)."""
+    df = pd.concat([X, y], axis=1)
+    counts = df['target'].value_counts()
+    parts = []
+    for label in df['target'].unique():
+        class_df = df[df['target'] == label]
+        is_minority = label == counts.idxmin()
+        parts.append(resample(class_df, n_samples=counts.max() if is_minority else len(class_df),
+                              replace=is_minority, random_state=random_state))
+    df_balanced = pd.concat(parts, ignore_index=True).sample(frac=1, random_state=random_state)
+    return df_balanced.drop(columns=['target']), df_balanced['target']
+
+
+def imbalanced_data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(500, 3)), columns=['a', 'b', 'c'])
+    y = pd.Series((rng.random(500) < 0.3).astype(int), name='target')
+    return X, y
+
+
+def test_index_balancing_reproduces_dataframe_balancing():
+    X, y = imbalanced_data()
+    expected_X, expected_y = legacy_balance(X, y)
+
+    X_balanced, y_balanced = DataFinalizer().balance_classes(X, y)
+
+    np.testing.assert_array_equal(X_balanced.to_numpy(), expected_X.to_numpy())
+    np.testing.assert_array_equal(y_balanced.to_numpy(), expected_y.to_numpy())
+
+
+def test_weight_mode_balances_without_duplicating_rows():
+    _, y = imbalanced_data()
+
+    weights = DataFinalizer().balance_weights(y)
+
+    assert len(weights) == len(y)
+    majority = y.value_counts().max()
+    assert weights[y.to_numpy() == 0].sum() == majority
+    assert weights[y.to_numpy() == 1].sum() == majority
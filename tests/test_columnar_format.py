@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from fastapi import APIRouter, FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+pa = pytest.importorskip('pyarrow')
+
+from src.presentation.api.v1.columnar import (
+    ARROW_STREAM, MATRIX_HEADER, ColumnarRoute, columnar_body, decode_arrow_columns,
+    decode_float32_matrix, encode_arrow, encode_float32_matrix, arrow_column
+)
+
+
+def float32_body(matrix):
+    matrix = np.asarray(matrix, dtype='<f4')
+    return MATRIX_HEADER.pack(b'EXOM', 1, *matrix.shape) + matrix.tobytes()
+
+
+def arrow_body(columns):
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_float32_matrix_is_decoded_without_copy_and_validated():
+    matrix = np.arange(6, dtype=np.float32).reshape(3, 2)
+    body = float32_body(matrix)
+
+    decoded = decode_float32_matrix(body, n_columns=2)
+    assert decoded.base is not None and np.array_equal(decoded, matrix)
+
+    with pytest.raises(ValueError, match="columnas"):
+        decode_float32_matrix(body, n_columns=3)
+    # Columnas opcionales tras las features (koi_teq): todas o ninguna
+    assert decode_float32_matrix(body, n_columns=1, trailing_columns=('koi_teq',)).shape == (3, 2)
+    with pytest.raises(ValueError, match="1 o 3 columnas"):
+        decode_float32_matrix(body, n_columns=1, trailing_columns=('koi_teq', 'koi_insol'))
+    with pytest.raises(ValueError, match="inconsistente"):
+        decode_float32_matrix(body[:-4], n_columns=2)
+
+    response = encode_float32_matrix([np.array([1, 0]), np.array([0.9, 0.1])])
+    assert response[:4] == b'EXOR'
+    assert np.frombuffer(response, '<f4', offset=MATRIX_HEADER.size).tolist() == pytest.approx([1, 0.9, 0, 0.1])
+
+
+def test_arrow_nulls_become_nan_and_responses_keep_nulls():
+    columns = decode_arrow_columns(arrow_body({'koi_period': [85.5, None], 'koi_prad': pa.array([1, 2], pa.int32())}))
+    assert np.isnan(columns['koi_period'][1]) and columns['koi_prad'].dtype == np.float64
+
+    # Las columnas de texto que el handler no usa (identificadores) se ignoran en vez de romper el lote
+    body = arrow_body({'kepoi_name': ['K00752.01', 'K00752.02'], 'koi_period': [9.49, 54.4], 'koi_teq': [793.0, 443.0]})
+    assert list(decode_arrow_columns(body)) == ['koi_period', 'koi_teq']
+    assert list(decode_arrow_columns(body, ['koi_period', 'koi_prad'])) == ['koi_period']
+    with pytest.raises(ValueError, match="kepoi_name"):
+        decode_arrow_columns(body, ['kepoi_name'])
+
+    payload = encode_arrow({'prediction_value': arrow_column([1, 0], 'int8', mask=np.array([False, True]))},
+                           {'model_version': 'v1'})
+    table = pa.ipc.open_stream(payload).read_all()
+    assert table.column('prediction_value').to_pylist() == [1, None]
+    assert table.schema.metadata == {b'model_version': b'v1'}
+
+
+class SumRequest(BaseModel):
+    features: dict
+
+
+async def sum_columnar(request: Request, media: str) -> Response:
+    columns = decode_arrow_columns(await request.body())
+    return Response(str(sum(values.sum() for values in columns.values())), media_type='text/plain')
+
+
+def test_columnar_route_dispatches_on_content_type():
+    router = APIRouter(route_class=ColumnarRoute)
+
+    @router.post('/sum')
+    @columnar_body(sum_columnar)
+    async def sum_json(req: SumRequest):
+        return {"total": sum(sum(values) for values in req.features.values())}
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    assert client.post('/sum', json={'features': {'a': [1, 2]}}).json() == {"total": 3}
+    assert client.post('/sum', content=arrow_body({'a': [1.0, 2.0], 'b': [3.0, 4.0]}),
+                       headers={'content-type': ARROW_STREAM}).text == '10.0'
+    assert client.post('/sum', content=b'', headers={'content-type': 'text/plain'}).status_code == 422
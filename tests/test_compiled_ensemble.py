@@ -0,0 +1,67 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+
+from src.infrastructure.adapters.compiled_ensemble import CompiledEnsemble, compile_voting_classifier
+from src.infrastructure.adapters.ml_adapter import RandomForestAdapter
+
+N_FEATURES = RandomForestAdapter.EXPECTED_FEATURES_COUNT
+
+
+@pytest.fixture(scope="module")
+def ensemble():
+    """Misma configuración que TrainModelUseCase sobre datos sintéticos no lineales."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1500, N_FEATURES))
+    y = (X[:, 0] + X[:, 1] ** 2 + rng.normal(size=1500) > 1).astype(int)
+    return VotingClassifier(
+        estimators=[('rf', RandomForestClassifier(n_estimators=50, random_state=42, class_weight='balanced')),
+                    ('lr', LogisticRegression(random_state=42, class_weight='balanced'))],
+        voting='soft'
+    ).fit(X, y)
+
+
+def test_compiled_probabilities_match_sklearn(ensemble):
+    """Regresión: el motor NumPy debe reproducir predict_proba de sklearn."""
+    compiled = CompiledEnsemble(compile_voting_classifier(ensemble))
+    X = np.random.default_rng(1).normal(size=(500, N_FEATURES)) * 2
+
+    np.testing.assert_allclose(compiled.predict_proba(X), ensemble.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(X), ensemble.predict(X))
+    np.testing.assert_allclose(compiled.predict_proba(X[:1]), ensemble.predict_proba(X[:1]), atol=1e-12)
+
+
+def test_adapter_serves_compiled_model(ensemble, tmp_path, monkeypatch):
+    """Con el artefacto compilado presente, el adaptador no carga el pickle de sklearn."""
+    compiled_path = tmp_path / 'ensemble_compiled.joblib'
+    joblib.dump(compile_voting_classifier(ensemble), compiled_path)
+    monkeypatch.setattr(RandomForestAdapter, 'COMPILED_MODEL_FILE_PATH', str(compiled_path))
+    monkeypatch.setattr(RandomForestAdapter, 'REGISTRY_DIR', str(tmp_path / 'registry'))
+    monkeypatch.setattr(RandomForestAdapter, 'MODEL_FILE_PATH', str(tmp_path / 'missing.pkl'))
+
+    adapter = RandomForestAdapter()
+    X = np.random.default_rng(2).normal(size=(20, N_FEATURES))
+    result = adapter.predict_batch(X)
+
+    assert isinstance(adapter.model, CompiledEnsemble)
+    np.testing.assert_allclose(result['confidences'], ensemble.predict_proba(X)[:, 1], atol=1e-12)
+
+
+def test_adapter_loads_lazily_with_memory_map(ensemble, tmp_path, monkeypatch):
+    """Construir el adaptador no carga el modelo; la primera predicción lo mapea en memoria."""
+    compiled_path = tmp_path / 'ensemble_compiled.joblib'
+    joblib.dump(compile_voting_classifier(ensemble), compiled_path, compress=0)
+    monkeypatch.setattr(RandomForestAdapter, 'COMPILED_MODEL_FILE_PATH', str(compiled_path))
+    monkeypatch.setattr(RandomForestAdapter, 'REGISTRY_DIR', str(tmp_path / 'registry'))
+
+    adapter = RandomForestAdapter()
+    assert not adapter.is_loaded and adapter.load_time_seconds is None
+
+    adapter.predict(np.zeros(N_FEATURES).tolist())
+
+    assert adapter.is_loaded and adapter.model_format == 'compiled'
+    assert adapter.load_time_seconds >= 0
+    assert isinstance(adapter.model.node_threshold, np.memmap)
+    assert not adapter.model.node_threshold.flags.writeable
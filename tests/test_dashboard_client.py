@@ -0,0 +1,132 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.use_cases import train_model_use_case
+from src.application.use_cases.train_model_use_case import TrainModelUseCase
+from src.infrastructure.adapters.ml_adapter import RandomForestAdapter
+from src.infrastructure.adapters.model_registry import ModelRegistry
+from src.presentation.api.v1.endpoints import models
+from src.presentation.api.v1.main import app
+from web.dashboard.api_client import BatchPredictionClient
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class RecordingSession:
+    """Sustituye a requests.Session: responde como /predict-batch y /predict-candidates."""
+
+    def __init__(self):
+        self.calls = []
+
+    def post(self, url, json=None, timeout=None):
+        self.calls.append((url, json))
+        if url.endswith('/predict-batch'):
+            period = json['features']['koi_period']
+            return FakeResponse({'prediction_value': [int(p > 10) for p in period],
+                                 'is_potentially_habitable': [False] * len(period)})
+        period, teq = json['candidates']['pl_orbper'], json['candidates'].get('pl_eqt')
+        return FakeResponse({'count': len(period), 'accepted': [p is not None for p in period],
+                             'prediction_value': [1 if p is not None else None for p in period],
+                             'is_potentially_habitable': [None if t is None else t < 300 for t in teq]})
+
+
+def write_feature_names(path, names):
+    with open(path, 'w') as f:
+        json.dump({'feature_names': names}, f)
+
+
+def test_upload_is_sent_in_columnar_chunks(tmp_path):
+    names_path = tmp_path / 'feature_names.json'
+    write_feature_names(names_path, ['koi_period', 'koi_prad', 'log_snr'])
+    session = RecordingSession()
+    client = BatchPredictionClient('http://api', str(names_path), chunk_size=4, session=session)
+
+    df = pd.DataFrame({'koi_period': np.arange(10, dtype=float) * 3, 'koi_prad': [1.0] * 9 + [5000.0],
+                       'log_snr': [2.0] * 10})
+    progress = []
+    summary = client.predict_frame(df, progress=lambda done, total: progress.append((done, total)))
+
+    assert len(session.calls) == 3
+    assert session.calls[0][1]['features']['log_snr'] == [2.0] * 4
+    assert progress == [(4, 9), (8, 9), (9, 9)]
+    assert summary == {'total': 10, 'invalid': 1, 'positives': 5, 'habitable': 0, 'habitable_unknown': 9}
+
+
+def test_missing_model_features_are_an_error_not_zeros(tmp_path):
+    names_path = tmp_path / 'feature_names.json'
+    write_feature_names(names_path, ['koi_period', 'log_snr'])
+    session = RecordingSession()
+    client = BatchPredictionClient('http://api', str(names_path), session=session)
+
+    with pytest.raises(ValueError, match="log_snr"):
+        client.predict_frame(pd.DataFrame({'koi_period': [3.0, 30.0]}))
+    assert session.calls == []
+
+
+def test_feature_names_are_reloaded_only_when_file_changes(tmp_path):
+    names_path = tmp_path / 'feature_names.json'
+    write_feature_names(names_path, ['koi_period'])
+    client = BatchPredictionClient('http://api', str(names_path), session=RecordingSession())
+
+    first = client.feature_names.get()
+    assert client.feature_names.get() is first
+
+    write_feature_names(names_path, ['koi_period', 'koi_depth'])
+    stat = os.stat(names_path)
+    os.utime(names_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert client.feature_names.get() == ['koi_period', 'koi_depth']
+
+
+def test_mission_catalog_goes_to_candidates_endpoint(tmp_path):
+    session = RecordingSession()
+    client = BatchPredictionClient('http://api', str(tmp_path / 'missing.json'), chunk_size=2, session=session)
+
+    df = pd.DataFrame({'pl_orbper': [1.9, np.nan, 7.0, 9.0], 'pl_eqt': [280.0, 250.0, 900.0, np.nan],
+                       'tfopwg_disp': ['KP', 'PC', 'FP', 'PC']})
+    summary = client.predict_mission_frame(df)
+
+    assert [url for url, _ in session.calls] == ['http://api/models/predict-candidates'] * 2
+    assert 'tfopwg_disp' not in session.calls[0][1]['candidates']
+    assert summary['positives'] == 3 and summary['invalid'] == 1
+    # La habitabilidad la decide la API; sin temperatura de equilibrio es desconocida
+    assert summary['habitable'] == 1 and summary['habitable_unknown'] == 1
+
+
+def test_upload_is_scored_end_to_end_through_the_api(tmp_path, monkeypatch):
+    """Sin sesión simulada: el payload real del cliente contra /models/predict-batch."""
+    for name in ('METRICS_PATH', 'IMPORTANCE_PATH', 'FEATURE_NAMES_PATH', 'PREPROCESSOR_PATH', 'DRIFT_REFERENCE_PATH'):
+        monkeypatch.setattr(train_model_use_case, name, str(tmp_path / f'{name.lower()}.json'))
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    names = ['koi_period', 'koi_prad'] + [f'koi_derived_{i}' for i in range(RandomForestAdapter.EXPECTED_FEATURES_COUNT - 2)]
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, len(names)))
+    TrainModelUseCase(registry=registry).train_and_evaluate(
+        X, (X[:, 0] > 0).astype(int), [(np.arange(150), np.arange(150, 200))], names)
+
+    adapter = RandomForestAdapter(registry=registry)
+    monkeypatch.setattr(models, 'ML_REPOSITORY', adapter)
+    monkeypatch.setattr(models.EXOPLANET_SERVICE, 'ml_repository', adapter)
+
+    # El cliente lee el feature_names.json que escribe el mismo entrenamiento
+    client = BatchPredictionClient('http://testserver', train_model_use_case.FEATURE_NAMES_PATH,
+                                   chunk_size=16, session=TestClient(app))
+    df = pd.DataFrame(rng.normal(size=(40, len(names))), columns=names).assign(koi_prad=1.0)
+    df.loc[0, 'koi_prad'] = 5000.0
+    summary = client.predict_frame(df)
+
+    expected = adapter.predict_batch(df[names].to_numpy()[1:])['predictions']
+    assert summary == {'total': 40, 'invalid': 1, 'positives': sum(expected), 'habitable': 0, 'habitable_unknown': 39}
@@ -1,5 +1,6 @@
+import numpy as np
 import pytest
-from src.domain.entities.exoplanet import Exoplanet
+from src.domain.entities.exoplanet import Exoplanet, ExoplanetBatch
 from src.domain.exceptions.exceptions import ExoplanetDomainError
 
 def test_exoplanet_is_potentially_habitable_success():
@@ -26,4 +27,33 @@ def test_exoplanet_is_not_habitable_low_confidence():
         equilibrium_temp=290.0,
         confidence_score=0.70
     )
-    assert exo.is_potentially_habitable() is False
\ No newline at end of file
+    assert exo.is_potentially_habitable() is False
+
+
+def test_exoplanet_batch_matches_scalar_rule():
+    """La máscara del lote coincide fila a fila con la regla de la entidad escalar."""
+    rng = np.random.default_rng(0)
+    n_rows = 500
+    batch = ExoplanetBatch(
+        kepid=[f"K-{i}" for i in range(n_rows)],
+        period_days=rng.uniform(1, 400, n_rows),
+        radius_earth=np.append(rng.uniform(0.2, 3.0, n_rows - 1), np.nan),
+        equilibrium_temp=rng.uniform(200, 400, n_rows),
+        confidence_score=rng.uniform(0.8, 1.0, n_rows)
+    )
+
+    mask = batch.is_potentially_habitable()
+
+    assert mask.dtype == bool and 0 < mask.sum() < n_rows
+    assert mask.tolist() == [batch[i].is_potentially_habitable() for i in range(n_rows)]
+
+
+def test_exoplanet_batch_from_koi_columns():
+    """Columnas KOI ausentes quedan como NaN y nunca cumplen la regla; longitudes distintas se rechazan."""
+    batch = ExoplanetBatch.from_columns({'koi_prad': [1.5, 1.5], 'koi_teq': [290.0, 290.0]}, [0.95, 0.50])
+    assert batch.is_potentially_habitable().tolist() == [True, False]
+    assert ExoplanetBatch.from_columns({'koi_prad': [1.5]}, [0.95]).is_potentially_habitable().tolist() == [False]
+
+    with pytest.raises(ValueError):
+        ExoplanetBatch.from_columns({'koi_prad': [1.5, 1.0, 0.8]}, [0.95, 0.95])
+
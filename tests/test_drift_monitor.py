@@ -0,0 +1,86 @@
+import numpy as np
+
+from src.application.services.drift_monitor import DriftMonitor
+from src.application.services.exoplanet_service import ExoplanetService
+from src.application.services.prediction_cache import PredictionCache
+from src.domain.pipeline_modules.drift_reference import DriftReference
+from src.domain.pipeline_modules.inference_transformer import InferenceTransformer
+from src.domain.pipeline_modules.streaming_stats import FeatureDistributionSketch
+
+FEATURES = ['koi_period', 'koi_model_snr', 'log_snr']
+
+
+def make_reference(seed=0):
+    X = np.random.default_rng(seed).normal(size=(5000, 3))
+    return DriftReference.from_matrix(X, FEATURES, bounds={'koi_model_snr': (-2.0, 2.0)})
+
+
+class ReferenceRepository:
+    """Repositorio falso con referencia de drift: predice 1 si la primera feature es positiva."""
+
+    def __init__(self, reference):
+        self.model_version = "v1"
+        self.reference = reference
+
+    def predict_batch(self, features_matrix):
+        matrix = np.asarray(features_matrix, dtype=np.float64)
+        return {"predictions": [int(row[0] > 0) for row in matrix], "confidences": [0.5] * len(matrix),
+                "model_name": self.model_version}
+
+    def get_drift_reference(self):
+        return self.reference
+
+
+def test_sketch_matches_numpy_statistics_across_chunks():
+    rng = np.random.default_rng(1)
+    X = rng.lognormal(size=(3000, 3))
+    X[10, 2] = np.nan
+    edges = np.nanquantile(X, np.linspace(0, 1, 21)[1:-1], axis=0).T
+    sketch = FeatureDistributionSketch(edges, lower=[0.5, -np.inf, -np.inf], upper=[5.0, np.inf, np.inf])
+    for chunk in np.array_split(X, 11):
+        sketch.update(chunk)
+    restored = FeatureDistributionSketch.from_dict(sketch.to_dict())
+
+    assert restored.count.tolist() == [3000, 3000, 2999] and restored.missing.tolist() == [0, 0, 1]
+    np.testing.assert_allclose(restored.mean, np.nanmean(X, axis=0))
+    np.testing.assert_allclose(restored.variance, np.nanvar(X, axis=0, ddof=1))
+    assert restored.below[0] == (X[:, 0] < 0.5).sum() and restored.above[0] == (X[:, 0] > 5.0).sum()
+    np.testing.assert_allclose(restored.quantiles([0.5])[:, 0], np.nanmedian(X, axis=0), rtol=0.02)
+
+
+def test_reference_scores_stable_and_shifted_traffic():
+    reference = make_reference()
+    rng = np.random.default_rng(2)
+
+    same = reference.compare(reference.new_sketch().update(rng.normal(size=(2000, 3))))
+    shifted_traffic = rng.normal(size=(2000, 3))
+    shifted_traffic[:, 1] += 3.0
+    shifted = reference.compare(reference.new_sketch().update(shifted_traffic))
+
+    assert same['status'] == 'stable' and same['max_psi'] < 0.1
+    assert shifted['drifted_features'] == ['koi_model_snr'] and shifted['status'] == 'significant'
+    assert shifted['features']['koi_model_snr']['ks'] > 0.8
+    assert shifted['features']['koi_model_snr']['out_of_range']['above'] > 1000
+
+
+def test_service_feeds_monitor_including_cache_hits_and_resets_on_new_reference():
+    repository = ReferenceRepository(make_reference())
+    monitor = DriftMonitor(enabled=True)
+    service = ExoplanetService(ml_repository=repository, prediction_cache=PredictionCache(max_entries=10),
+                               drift_monitor=monitor)
+
+    service.predict_batch([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
+    service.predict([0.1, 0.2, 0.3])  # acierto de caché: también se observa
+    assert monitor.report(repository.reference)['observed_rows'] == 3
+
+    repository.reference = make_reference(seed=3)  # nueva versión servida
+    assert monitor.report(repository.reference)['status'] == 'no_data'
+    service.predict_batch([[0.1, 0.2, 0.3]])
+    assert monitor.report(repository.reference)['observed_rows'] == 1
+
+
+def test_transformer_bounds_follow_the_scaler():
+    transformer = InferenceTransformer(FEATURES, {}, {}, scaler_center=[10.0, 20.0, 0.0], scaler_scale=[2.0, 5.0, 1.0])
+    bounds = transformer.scaled_bounds({'koi_period': (0.5, 1000, 'Período'), 'koi_depth': (10, 100000, 'Prof.')})
+
+    assert bounds == {'koi_period': (-4.75, 495.0)}
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.application.use_cases import train_model_use_case
+from src.application.use_cases.train_model_use_case import TrainModelUseCase
+from src.domain.pipeline_modules.fingerprint_store import FingerprintStore
+from src.domain.pipeline_modules.inference_transformer import InferenceTransformer
+from src.domain.services.exoplanet_pipeline import ExoplanetPreprocessor
+from src.infrastructure.adapters.model_registry import ModelRegistry
+
+DATA_PATH = './data/kepler_koi.csv'
+
+
+def catalog_rows(kepid, period, label):
+    return pd.DataFrame({'kepid': kepid, 'koi_period': period, 'label': label,
+                         'target_class': [int(value != 'false positive') for value in label]})
+
+
+def test_fingerprint_diff_detects_inserted_changed_and_deleted_rows(tmp_path):
+    old = catalog_rows([1, 1, 2, 3, 3], [10.0, 20.0, 5.0, 7.0, 7.0], ['confirmed', 'candidate', 'false positive',
+                                                                        'candidate', 'candidate'])
+    store = FingerprintStore.build(old, np.arange(10.0).reshape(5, 2), ['a', 'b'])
+
+    # kepid 1: una fila cambia de periodo; kepid 2 desaparece; kepid 3 pierde un duplicado; kepid 4 es nuevo
+    new = catalog_rows([1, 1, 3, 4], [10.0, 21.0, 7.0, 3.0], ['confirmed', 'candidate', 'candidate', 'candidate'])
+    new['kepid'] = new['kepid'].astype(np.float64)  # un cambio de dtype no es un cambio de contenido
+    diff = store.diff(new)
+
+    assert diff.kept.tolist() == [0, 3]
+    assert diff.inserted.tolist() == [False, True, False, True]
+    assert diff.deleted == 3 and diff.changed_kepids == 1
+
+    updated = store.update(new, diff, np.array([[-1.0, -1.0], [-2.0, -2.0]]))
+    assert updated.kepid.tolist() == [1, 3, 1, 4]
+    assert updated.features[:, 0].tolist() == [0.0, 6.0, -1.0, -2.0]
+
+    updated.save(str(tmp_path / 'store.npz'))
+    restored = FingerprintStore.load(str(tmp_path / 'store.npz'))
+    assert restored.diff(new).is_empty
+    np.testing.assert_array_equal(restored.reference_median, store.reference_median)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    for name in ('METRICS_PATH', 'IMPORTANCE_PATH', 'FEATURE_NAMES_PATH', 'PREPROCESSOR_PATH', 'DRIFT_REFERENCE_PATH'):
+        monkeypatch.setattr(train_model_use_case, name, str(tmp_path / f'{name.lower()}.json'))
+    return ModelRegistry(str(tmp_path / 'registry'))
+
+
+def test_incremental_retrain_only_transforms_the_delta_and_adds_trees(registry, tmp_path, monkeypatch):
+    preprocessor = ExoplanetPreprocessor(data_path=DATA_PATH)
+    X, y, splits = preprocessor.fit_transform_complete()
+    base = TrainModelUseCase(registry=registry)
+    base.train_and_evaluate(X, y, splits, preprocessor.feature_names, transformer=preprocessor.transformer,
+                            fingerprint_store=preprocessor.fingerprint_store())
+
+    # Nuevo volcado: 20 filas modificadas y 30 KOIs nuevos
+    dump = pd.read_csv(DATA_PATH, comment='#')
+    dump.loc[dump.index[:20], 'koi_depth'] *= 1.1
+    new_kois = dump.iloc[100:130].assign(kepid=lambda df: df['kepid'] + 10**9)
+    dump_path = tmp_path / 'koi_v2.csv'
+    pd.concat([dump, new_kois]).to_csv(dump_path, index=False)
+
+    transformed_rows = []
+    original_transform = InferenceTransformer.transform
+    monkeypatch.setattr(InferenceTransformer, 'transform',
+                        lambda self, batch: transformed_rows.append(len(batch)) or original_transform(self, batch))
+
+    trainer = TrainModelUseCase(registry=registry)
+    metrics = trainer.train_incremental(ExoplanetPreprocessor(data_path=str(dump_path)))
+    delta = metrics['incremental']
+
+    assert registry.current_version() == trainer.version != base.version
+    assert transformed_rows == [delta['inserted_rows']]
+    assert delta['changed_kepids'] > 0
+    assert metrics['train_size'] == len(base.fingerprint_store) + delta['inserted_rows'] - delta['deleted_rows']
+    assert delta['n_estimators'] == 100 + delta['trees_added']
+    assert len(trainer.model.named_estimators_['rf'].estimators_) == delta['n_estimators']
+
+    # Mismo volcado otra vez: nada que hacer; un umbral de delta mínimo exige entrenar desde cero
+    assert TrainModelUseCase(registry=registry).train_incremental(
+        ExoplanetPreprocessor(data_path=str(dump_path)))['model_version'] == trainer.version
+    assert TrainModelUseCase(registry=registry).train_incremental(
+        ExoplanetPreprocessor(data_path=DATA_PATH), max_delta_fraction=0.001) is None
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.domain.exceptions.exceptions import InsufficientDataError
+from src.domain.pipeline_modules.inference_transformer import InferenceTransformer
+from src.domain.services.exoplanet_pipeline import ExoplanetPreprocessor
+
+DATA_PATH = './data/kepler_koi.csv'
+
+
+@pytest.fixture(scope="module")
+def fitted_preprocessor():
+    preprocessor = ExoplanetPreprocessor(data_path=DATA_PATH)
+    preprocessor.fit()
+    return preprocessor
+
+
+def test_transform_matches_training_pipeline(fitted_preprocessor):
+    """transform() sobre columnas crudas debe reproducir el pipeline pandas + RobustScaler."""
+    cleaner, creator = fitted_preprocessor.cleaner, fitted_preprocessor.creator
+
+    raw = cleaner.apply_scientific_filters(cleaner.load_and_select(DATA_PATH))
+    processed = creator.create_statistical_features(
+        creator.create_astronomical_features(cleaner.handle_missing_values(raw))
+    )
+    expected = fitted_preprocessor.finalizer.scaler.transform(processed[fitted_preprocessor.feature_names])
+
+    # Las columnas crudas conservan sus NaN: la imputación ocurre dentro del transformador
+    actual = fitted_preprocessor.transform(raw.loc[processed.index])
+
+    assert actual.shape == (len(processed), len(fitted_preprocessor.feature_names))
+    np.testing.assert_allclose(actual, expected, rtol=1e-10, atol=1e-10)
+
+
+def test_transformer_roundtrip_and_missing_columns(fitted_preprocessor, tmp_path):
+    """El artefacto persistido es equivalente y las columnas ausentes se imputan con la mediana."""
+    path = tmp_path / 'preprocessor.json'
+    fitted_preprocessor.transformer.save(str(path))
+    restored = InferenceTransformer.load(str(path))
+
+    single_row = {'koi_period': [85.5], 'koi_duration': [4.5], 'koi_depth': [874.8]}
+    np.testing.assert_array_equal(restored.transform(single_row), fitted_preprocessor.transform(single_row))
+    assert np.isfinite(restored.transform(single_row)).all()
+
+
+def test_transform_empty_batch_raises(fitted_preprocessor):
+    with pytest.raises(InsufficientDataError):
+        fitted_preprocessor.transform({'koi_period': []})
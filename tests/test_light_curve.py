@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.domain.entities.exoplanet import LightCurve
+from src.domain.pipeline_modules.transit_search import TransitSearch
+
+
+def synthetic_light_curve(period=3.3, t0=1.1, duration_days=3.0 / 24, depth=2000e-6):
+    """Cadencia larga de Kepler (30 min) durante 30 días con variabilidad estelar y un outlier."""
+    rng = np.random.default_rng(0)
+    time = np.arange(0, 30, 30 / 1440)
+    flux = 1 + 0.002 * np.sin(2 * np.pi * time / 12) + rng.normal(0, 2e-4, len(time))
+    phase = (time - t0 + 0.5 * period) % period - 0.5 * period
+    flux[np.abs(phase) < duration_days / 2] -= depth
+    flux[10] = 1.5
+    return LightCurve(time, flux, np.full(len(time), 2e-4))
+
+
+def test_vectorized_normalize_matches_original_formula():
+    flux, error = [10.0, 12.0, 14.0], [1.0, 2.0, 4.0]
+    mean = sum(flux) / len(flux)
+
+    lc = LightCurve([0.0, 1.0, 2.0], flux, error).normalize()
+
+    np.testing.assert_allclose(lc.flux, [(f - mean) / error[i] for i, f in enumerate(flux)])
+    assert lc.flux.dtype == np.float64 and lc.flux.flags.c_contiguous
+    with pytest.raises(AttributeError):
+        lc.extra = 1  # __slots__
+
+
+def test_sigma_clip_keeps_transits():
+    lc = synthetic_light_curve()
+    n_points = len(lc)
+
+    lc.sigma_clip()
+
+    assert len(lc) == n_points - 1  # solo el outlier positivo
+    assert lc.flux.min() < 0.999  # los tránsitos siguen presentes
+
+
+def test_bls_recovers_injected_transit():
+    lc = synthetic_light_curve().sigma_clip().detrend(window_length=241)
+
+    result = TransitSearch(max_period=10).search(lc)
+
+    assert result['koi_period'] == pytest.approx(3.3, rel=0.01)
+    assert result['koi_duration'] == pytest.approx(3.0, rel=0.25)
+    assert result['koi_depth'] == pytest.approx(2000, rel=0.2)
+
+
+def test_search_many_returns_catalog_columns():
+    short = LightCurve(np.arange(10.0), np.ones(10))
+
+    columns = TransitSearch(max_period=10).search_many([short])
+
+    assert set(columns) >= {'koi_period', 'koi_duration', 'koi_depth', 'koi_model_snr'}
+    assert np.isnan(columns['koi_period'][0])
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from astropy.io import fits
+
+from src.application.use_cases import ingest_light_curves_use_case
+from src.application.use_cases.ingest_light_curves_use_case import IngestLightCurvesUseCase
+from src.domain.pipeline_modules.transit_search import TransitSearch
+from src.infrastructure.adapters.fits_light_curve_reader import discover_light_curves, read_light_curve
+
+
+def write_quarter(path, start_day, period=2.5, depth=3000e-6):
+    """FITS con la estructura de un producto Kepler *_llc.fits (extensión LIGHTCURVE)."""
+    rng = np.random.default_rng(int(start_day))
+    time = np.arange(start_day, start_day + 15, 30 / 1440)
+    flux = 5000 * (1 + rng.normal(0, 2e-4, len(time)))
+    phase = (time - 0.7 + 0.5 * period) % period - 0.5 * period
+    flux[np.abs(phase) < 0.06] *= 1 - depth
+    quality = np.zeros(len(time), dtype=np.int32)
+    quality[5] = 128
+    flux[7] = np.nan
+    columns = fits.ColDefs([
+        fits.Column(name='TIME', format='D', array=time),
+        fits.Column(name='PDCSAP_FLUX', format='E', array=flux),
+        fits.Column(name='PDCSAP_FLUX_ERR', format='E', array=np.full(len(time), 1.0)),
+        fits.Column(name='SAP_FLUX', format='E', array=flux),
+        fits.Column(name='QUALITY', format='J', array=quality),
+    ])
+    fits.HDUList([fits.PrimaryHDU(), fits.BinTableHDU.from_columns(columns, name='LIGHTCURVE')]).writeto(path)
+
+
+def test_reader_drops_flagged_cadences(tmp_path):
+    path = tmp_path / 'kplr000011446-2009166043257_llc.fits'
+    write_quarter(path, 0)
+
+    lc = read_light_curve(str(path))
+
+    assert len(lc) == 720 - 2
+    assert np.median(lc.flux) == 1.0
+    assert list(discover_light_curves(str(tmp_path))) == [('kepler', '11446')]
+
+
+def test_ingestion_is_parallel_and_resumable(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'fits'
+    (data_dir / 'q1').mkdir(parents=True)
+    write_quarter(data_dir / 'q1' / 'kplr000011446-2009166043257_llc.fits', 0)
+    write_quarter(data_dir / 'kplr000011446-2009259160929_llc.fits', 15)
+    write_quarter(data_dir / 'kplr000757450-2009166043257_llc.fits', 0, period=3.1)
+    (data_dir / 'kplr000000001-2009166043257_llc.fits').write_bytes(b'corrupt')
+
+    output = tmp_path / 'features.csv'
+    use_case = IngestLightCurvesUseCase(str(data_dir), str(output), max_workers=2,
+                                        transit_search=TransitSearch(max_period=6))
+    table = use_case.run()
+
+    assert sorted(table['target_id']) == ['11446', '757450']
+    stitched = table.set_index('target_id').loc['11446']
+    assert stitched['n_files'] == 2
+    assert abs(stitched['koi_period'] - 2.5) < 0.05
+    assert pd.read_csv(output).shape[0] == 2
+
+    # Segunda ejecución: solo se reintenta el objetivo con error
+    processed = []
+    original = ingest_light_curves_use_case._process_target
+    monkeypatch.setattr(ingest_light_curves_use_case, '_process_target',
+                        lambda task: processed.append(task['target_id']) or original(task))
+    use_case.max_workers = 1
+    again = use_case.run()
+
+    assert processed == ['1']
+    assert sorted(again['target_id']) == ['11446', '757450']
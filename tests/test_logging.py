@@ -0,0 +1,89 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.infrastructure.monitoring.logger import (
+    JsonFormatter, PredictionLogFilter, RequestIdFilter, RequestIdMiddleware, REQUEST_ID, _DeferredFormatQueueHandler
+)
+
+
+def make_record(msg, *args):
+    return logging.LogRecord('exoplanet-ml.predictions', logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_rate_limit_counts_suppressed_lines():
+    log_filter = PredictionLogFilter(sample_rate=1.0, max_per_second=5)
+    emitted = [record for record in (make_record("Predicción %d", i) for i in range(20)) if log_filter.filter(record)]
+
+    assert len(emitted) == 5
+    log_filter._tokens = 1.0
+    record = make_record("siguiente")
+    assert log_filter.filter(record) and record.suppressed == 15
+
+
+def test_sampled_and_rate_limited_counts_are_not_lost_between_threads():
+    log_filter = PredictionLogFilter(sample_rate=0.5, max_per_second=1000)
+    counted = []
+
+    def emit():
+        records = [make_record("Predicción") for _ in range(5000)]
+        counted.append(sum(1 + record.suppressed for record in records if log_filter.filter(record)))
+
+    threads = [threading.Thread(target=emit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(counted) + log_filter._suppressed == 8 * 5000
+
+
+def test_importing_the_api_does_not_configure_logging(tmp_path):
+    """Ni listener ni ./logs al importar: la configuración es cosa de los puntos de entrada."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import src.presentation.api.v1.main\n"
+            "from src.infrastructure.monitoring import logger\n"
+            "assert logger._listener is None\n")
+    subprocess.run([sys.executable, '-c', code], cwd=tmp_path, check=True,
+                   env={**os.environ, 'PYTHONPATH': root, 'CATALOG_INDEX_ENABLED': 'false'})
+
+    assert not (tmp_path / 'logs').exists()
+
+
+def test_queue_handler_defers_formatting_and_keeps_request_id():
+    handler = _DeferredFormatQueueHandler(queue=None)
+    record = make_record("Clase=%d, Confianza=%.2f", 1, 0.934)
+    token = REQUEST_ID.set('req-42')
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        REQUEST_ID.reset(token)
+
+    prepared = handler.prepare(record)
+    payload = json.loads(JsonFormatter().format(prepared))
+
+    assert prepared.args is None and record.args == (1, 0.934)
+    assert payload['message'] == "Clase=1, Confianza=0.93"
+    assert payload['request_id'] == 'req-42'
+
+
+def test_request_id_middleware_propagates_header():
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get('/echo')
+    async def echo():
+        return {"request_id": REQUEST_ID.get()}
+
+    client = TestClient(app)
+    response = client.get('/echo', headers={'X-Request-ID': 'abc'})
+    generated = client.get('/echo')
+
+    assert response.json() == {"request_id": "abc"} and response.headers['x-request-id'] == 'abc'
+    assert len(generated.headers['x-request-id']) == 32
@@ -0,0 +1,59 @@
+import threading
+
+from src.domain.services.exoplanet_pipeline import ExoplanetPreprocessor
+from src.infrastructure.monitoring.metrics import MetricsRegistry, StageTimer, REGISTRY
+
+DATA_PATH = './data/kepler_koi.csv'
+
+
+def test_histogram_merges_per_thread_shards():
+    registry = MetricsRegistry()
+    latency = registry.histogram('test_latency_seconds', 'Latencia de prueba.', ('route',), buckets=(0.1, 1.0))
+    errors = registry.counter('test_errors_total', 'Errores de prueba.')
+
+    def worker():
+        for _ in range(1000):
+            latency.labels('/predict').observe(0.05)
+            errors.labels().inc()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latency.labels('/predict').observe(5.0)
+
+    text = registry.render()
+    assert 'test_latency_seconds_bucket{route="/predict",le="0.1"} 4000' in text
+    assert 'test_latency_seconds_bucket{route="/predict",le="+Inf"} 4001' in text
+    assert 'test_latency_seconds_count{route="/predict"} 4001' in text
+    assert 'test_errors_total 4000.0' in text
+
+
+def test_stage_timer_records_request_stages():
+    class State:
+        received_at = 0.0
+
+    state = State()
+    timer = StageTimer.for_request('/test-route', state)
+    with timer.stage('model_inference'):
+        pass
+    timer.finish()
+
+    text = REGISTRY.render()
+    assert 'exoai_request_stage_duration_seconds_count{route="/test-route",stage="request_parsing"} 1' in text
+    assert 'exoai_request_stage_duration_seconds_count{route="/test-route",stage="model_inference"} 1' in text
+    assert state.handler_done > 0
+
+
+def test_preprocessor_profiles_each_stage():
+    observed = []
+    preprocessor = ExoplanetPreprocessor(data_path=DATA_PATH, profile_memory=True,
+                                         stage_observer=lambda *args: observed.append(args))
+    preprocessor.fit_transform_complete()
+
+    stages = [entry['stage'] for entry in preprocessor.stage_profile]
+    assert stages == ['load_and_select', 'scientific_filters', 'missing_values', 'astronomical_features',
+                      'statistical_features', 'class_balancing', 'scaling', 'temporal_splits']
+    assert all(entry['peak_memory_bytes'] > 0 for entry in preprocessor.stage_profile)
+    assert [stage for stage, _, _ in observed] == stages
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from src.application.services.exoplanet_service import ExoplanetService
+from src.domain.pipeline_modules.data_cleaner import DataCleaner
+from src.domain.pipeline_modules.mission_schema import K2_SCHEMA, detect_missions, to_canonical
+
+TESS_ROWS = pd.DataFrame({
+    'tid': [50365310, 88863718],
+    'tfopwg_disp': ['KP', 'FA'],
+    'pl_orbper': [1.93, 6.99],
+    'pl_trandurh': [2.02, 3.17],
+    'pl_trandep': [656.9, 1286.0],
+    'pl_rade': [5.82, 11.2],
+    'st_teff': [10249.0, 7070.0],
+})
+
+
+def test_tess_columns_map_to_canonical_koi_schema():
+    canonical = to_canonical(TESS_ROWS)
+
+    assert [schema.name for schema in detect_missions(TESS_ROWS.columns)] == ['tess']
+    assert canonical['koi_period'].tolist() == [1.93, 6.99]
+    assert canonical['koi_prad'].tolist() == [5.82, 11.2]
+    assert canonical['koi_disposition'].tolist() == ['CONFIRMED', 'FALSE POSITIVE']
+    assert canonical['kepid'].tolist() == [50365310, 88863718]
+
+
+def test_unit_conversion_and_mixed_catalog():
+    k2 = pd.DataFrame({'disposition': ['CANDIDATE'], 'pl_orbper': [3.0], 'pl_trandur': [2.0], 'pl_trandep': [0.5]})
+    assert K2_SCHEMA.to_canonical(k2)['koi_depth'].tolist() == [5000.0]  # % -> ppm
+
+    mixed = pd.DataFrame({'koi_period': [10.0, np.nan], 'koi_depth': [500.0, np.nan],
+                          'pl_orbper': [np.nan, 4.0], 'pl_trandurh': [np.nan, 3.0], 'pl_trandep': [np.nan, 800.0]})
+    canonical = to_canonical(mixed)
+
+    assert canonical['koi_period'].tolist() == [10.0, 4.0]
+    assert canonical['koi_depth'].tolist() == [500.0, 800.0]
+
+
+def test_load_and_select_detects_tess_archive(tmp_path):
+    path = tmp_path / 'toi.csv'
+    with open(path, 'w') as f:
+        f.write("# This file was produced by the NASA Exoplanet Archive\n")
+        TESS_ROWS.to_csv(f, index=False)
+
+    cleaner = DataCleaner(use_cache=False)
+    df = cleaner.load_and_select(str(path))
+
+    assert cleaner.missions_ == ['tess']
+    assert df['target_class'].tolist() == [1, 0]
+    assert df['koi_duration'].tolist() == [2.02, 3.17]
+
+
+class RecordingTransformer:
+    def transform(self, batch):
+        self.batch = batch
+        return np.column_stack([batch['koi_period'], batch['koi_duration']])
+
+
+def test_service_scores_tess_columns(fake_repository):
+    transformer = RecordingTransformer()
+    service = ExoplanetService(ml_repository=fake_repository(), transformer=transformer)
+
+    result = service.predict_candidates({'pl_orbper': [1.93, 0.1], 'pl_trandurh': [2.02, 2.0], 'pl_trandep': [656.9, 500.0]})
+
+    assert result['accepted'] == [True, False]
+    assert result['is_potentially_habitable'] == [None, None]  # sin pl_eqt: desconocida
+    np.testing.assert_array_equal(transformer.batch['koi_depth'], [656.9])
+
+    result = service.predict_candidates({'pl_orbper': [30.0, 40.0, 50.0], 'pl_trandurh': [2.0] * 3,
+                                         'pl_trandep': [500.0] * 3, 'pl_rade': [1.2] * 3,
+                                         'pl_eqt': [280.0, 1500.0, None]})
+    assert result['is_potentially_habitable'] == [True, False, None]
+
+
+def test_mixed_catalog_filters_each_row_with_its_own_mission(tmp_path, fake_repository):
+    kepler = pd.DataFrame({'kepid': [1, 2], 'koi_disposition': ['CONFIRMED', 'CANDIDATE'], 'koi_period': [10.0, 12.0],
+                           'koi_duration': [3.0, 3.0], 'koi_depth': [500.0, 500.0], 'koi_model_snr': [25.0, 2.0]})
+    path = tmp_path / 'mixed.csv'
+    with open(path, 'w') as f:
+        f.write("# This file was produced by the NASA Exoplanet Archive\n")
+        pd.concat([kepler, TESS_ROWS], ignore_index=True).to_csv(f, index=False)
+
+    cleaner = DataCleaner(use_cache=False)
+    df = cleaner.load_and_select(str(path))
+    assert df['mission'].tolist() == ['kepler', 'kepler', 'tess', 'tess']
+
+    # Las filas TESS no publican SNR: solo se rechaza la fila Kepler con SNR bajo
+    filtered, _, rejections = cleaner.filter_rows(df)
+    assert filtered['kepid'].tolist() == [1, 50365310, 88863718]
+    assert rejections['SNR umbral NASA'] == 1 and 'mission' not in filtered.columns
+
+    transformer = RecordingTransformer()
+    service = ExoplanetService(ml_repository=fake_repository(), transformer=transformer)
+    result = service.predict_candidates({
+        'koi_period': [10.0, 12.0, None], 'koi_duration': [3.0, 3.0, None], 'koi_depth': [500.0, 500.0, None],
+        'koi_model_snr': [25.0, 2.0, None], 'pl_orbper': [None, None, 1.93], 'pl_trandurh': [None, None, 2.02],
+        'pl_trandep': [None, None, 656.9],
+    })
+    assert result['accepted'] == [True, False, True]
+    assert 'mission' not in transformer.batch
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.use_cases import train_model_use_case
+from src.application.use_cases.train_model_use_case import TrainModelUseCase
+from src.infrastructure.adapters.ml_adapter import RandomForestAdapter
+from src.infrastructure.adapters.model_registry import ModelRegistry
+from src.presentation.api.v1.endpoints import models
+from src.presentation.api.v1.main import app
+
+N_FEATURES = RandomForestAdapter.EXPECTED_FEATURES_COUNT
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Registro temporal; los JSON planos de models/ también se redirigen a tmp_path."""
+    for name in ('METRICS_PATH', 'IMPORTANCE_PATH', 'FEATURE_NAMES_PATH', 'PREPROCESSOR_PATH', 'DRIFT_REFERENCE_PATH'):
+        monkeypatch.setattr(train_model_use_case, name, str(tmp_path / f'{name.lower()}.json'))
+    return ModelRegistry(str(tmp_path / 'registry'))
+
+
+def train_version(registry, seed, prefix='feature'):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, N_FEATURES))
+    y = (X[:, 0] > 0).astype(int)
+    splits = [(np.arange(150), np.arange(150, 200))]
+    trainer = TrainModelUseCase(registry=registry)
+    trainer.train_and_evaluate(X, y, splits, [f'{prefix}_{i}' for i in range(N_FEATURES)])
+    return trainer.version
+
+
+def test_training_publishes_versions_and_reload_swaps_atomically(registry):
+    first = train_version(registry, seed=0, prefix='koi_first')
+    adapter = RandomForestAdapter(registry=registry)
+    X = np.zeros((2, N_FEATURES))
+
+    # Los nombres salen del feature_names.json de la versión, antes y después de cargar el modelo
+    assert adapter.get_feature_names()[0] == 'koi_first_0'
+    assert adapter.predict_batch(X)['model_name'] == first
+    assert adapter.get_metrics()['model_version'] == first
+    in_flight = adapter._state
+
+    second = train_version(registry, seed=1, prefix='koi_second')
+    assert registry.current_version() == second
+    assert registry.list_versions() == sorted([first, second])
+    # Publicar no cambia el modelo servido hasta la recarga explícita
+    assert adapter.predict_batch(X)['model_name'] == first
+    assert adapter.get_feature_names()[0] == 'koi_first_0'
+
+    state = adapter.reload()
+
+    assert state.version == second and state.warmup_time_seconds >= 0
+    assert adapter.predict_batch(X)['model_name'] == second
+    assert adapter.get_feature_names() == [f'koi_second_{i}' for i in range(N_FEATURES)]
+    # La instantánea anterior sigue siendo utilizable por las peticiones en curso
+    assert in_flight.model.predict_proba(X).shape == (2, 2)
+
+
+def test_failed_reload_keeps_serving_version(registry):
+    version = train_version(registry, seed=0)
+    adapter = RandomForestAdapter(registry=registry)
+    adapter.ensure_loaded()
+
+    with pytest.raises(FileNotFoundError):
+        adapter.reload('ensemble_v3-missing')
+    # Ids que no son un componente de ruta del registro (raíz, models/, rutas)
+    for invalid in ('.', '..', '../registry', f'{version}/..'):
+        with pytest.raises(FileNotFoundError):
+            registry.version_dir(invalid)
+
+    assert adapter.model_version == version
+
+
+def test_admin_reload_is_rejected_without_a_configured_token(monkeypatch):
+    client = TestClient(app)
+
+    monkeypatch.setattr(models, 'MODEL_ADMIN_TOKEN', '')
+    assert client.post('/models/admin/reload', headers={'X-Admin-Token': ''}).status_code == 403
+
+    monkeypatch.setattr(models, 'MODEL_ADMIN_TOKEN', 'secreto')
+    assert client.post('/models/admin/reload', headers={'X-Admin-Token': 'otro'}).status_code == 403
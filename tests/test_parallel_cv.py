@@ -0,0 +1,31 @@
+import numpy as np
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.application.use_cases.train_model_use_case import TrainModelUseCase
+
+
+def synthetic_folds():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(240, 8))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+    return X, y, list(TimeSeriesSplit(n_splits=3).split(X))
+
+
+def test_parallel_cross_validation_matches_serial():
+    """El pool de procesos (matriz compartida por memmap) da las mismas métricas que en serie."""
+    X, y, splits = synthetic_folds()
+    grid = {'rf__n_estimators': [5, 20], 'lr__C': [1.0]}
+    trainer = TrainModelUseCase()
+
+    parallel = trainer.cross_validate(X, y, splits, param_grid=grid, max_workers=2)
+    serial = trainer.cross_validate(X, y, splits, param_grid=grid, max_workers=1)
+
+    assert len(parallel['configurations']) == 2
+    assert all(len(config['folds']) == 3 for config in parallel['configurations'])
+    assert fold_scores(parallel) == fold_scores(serial)
+    assert parallel['best_params'] in [config['params'] for config in parallel['configurations']]
+
+
+def fold_scores(report):
+    return [[(fold['fold'], fold['accuracy'], fold['f1_score']) for fold in config['folds']]
+            for config in report['configurations']]
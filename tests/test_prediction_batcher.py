@@ -0,0 +1,100 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.application.services.prediction_batcher import PredictionBatcher
+from src.infrastructure.monitoring.logger import REQUEST_ID
+
+
+class FakeService:
+    """Servicio mínimo: registra los tamaños de lote recibidos."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_batch(self, features_matrix):
+        matrix = np.asarray(features_matrix, dtype=np.float64)
+        if matrix.shape[1] != 3:
+            raise ValueError("Se esperaban 3 features")
+        self.batch_sizes.append(len(matrix))
+        return {
+            "predictions": (matrix[:, 0] > 0).astype(int).tolist(),
+            "confidences": matrix[:, 0].tolist(),
+            "model_name": "fake",
+        }
+
+    def predict(self, features):
+        result = self.predict_batch([features])
+        return {"prediction": result["predictions"][0], "confidence": result["confidences"][0], "model_name": "fake"}
+
+
+def test_concurrent_requests_are_coalesced():
+    """Peticiones concurrentes se resuelven con pocas llamadas vectorizadas y cada una recibe su fila."""
+    service = FakeService()
+
+    async def scenario():
+        batcher = PredictionBatcher(service, max_batch_size=16, max_wait_ms=20.0)
+        results = await asyncio.gather(*[batcher.submit([float(i), 0.0, 0.0]) for i in range(40)])
+        stats = batcher.get_stats()
+        await batcher.close()
+        return results, stats
+
+    results, stats = asyncio.run(scenario())
+
+    assert [r["confidence"] for r in results] == [float(i) for i in range(40)]
+    assert max(service.batch_sizes) <= 16
+    assert len(service.batch_sizes) < 40
+    assert stats["rows_total"] == 40
+    assert stats["batch_size"]["max"] <= 16
+
+
+def test_invalid_row_only_fails_its_own_caller():
+    """Una fila con dimensión incorrecta no debe afectar al resto del lote."""
+    service = FakeService()
+
+    async def scenario():
+        batcher = PredictionBatcher(service, max_batch_size=8, max_wait_ms=20.0)
+        results = await asyncio.gather(
+            batcher.submit([1.0, 0.0, 0.0]),
+            batcher.submit([1.0, 0.0]),
+            return_exceptions=True,
+        )
+        stats = batcher.get_stats()
+        await batcher.close()
+        return results, stats
+
+    (ok, failed), stats = asyncio.run(scenario())
+
+    assert ok["prediction"] == 1
+    assert isinstance(failed, ValueError)
+    assert stats["errors_total"] == 1
+
+
+def test_invalid_batch_size_rejected():
+    with pytest.raises(ValueError):
+        PredictionBatcher(FakeService(), max_batch_size=0)
+
+
+def test_worker_does_not_inherit_the_first_request_id():
+    """El worker lo arranca la primera petición, pero sus logs no deben llevar su request id."""
+
+    class ContextRecordingBatcher(PredictionBatcher):
+        seen_request_ids = []
+
+        async def _collect_batch(self):
+            self.seen_request_ids.append(REQUEST_ID.get())
+            return await super()._collect_batch()
+
+    async def scenario():
+        batcher = ContextRecordingBatcher(FakeService(), max_wait_ms=1.0)
+        for request_id in ('primera', 'segunda'):
+            token = REQUEST_ID.set(request_id)
+            try:
+                await batcher.submit([1.0, 0.0, 0.0])
+            finally:
+                REQUEST_ID.reset(token)
+        await batcher.close()
+        return batcher.seen_request_ids
+
+    assert set(asyncio.run(scenario())) == {None}
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.application.services.exoplanet_service import ExoplanetService
+from src.application.services.prediction_cache import PredictionCache
+
+
+class CountingRepository:
+    """Repositorio falso: predice 1 si la primera feature es positiva y registra las filas que recibe."""
+
+    def __init__(self):
+        self.model_version = "v1"
+        self.rows_scored = []
+
+    def predict_batch(self, features_matrix):
+        matrix = np.asarray(features_matrix, dtype=np.float64)
+        self.rows_scored.append(len(matrix))
+        return {
+            "predictions": [int(row[0] > 0) for row in matrix],
+            "confidences": [float(abs(row[0]) % 1) for row in matrix],
+            "model_name": self.model_version,
+        }
+
+    def predict(self, features):
+        raise AssertionError("Con caché, las predicciones individuales pasan por predict_batch")
+
+
+@pytest.fixture
+def service():
+    return ExoplanetService(ml_repository=CountingRepository(), prediction_cache=PredictionCache(max_entries=3))
+
+
+def test_batch_splits_hits_and_misses(service):
+    first = service.predict_batch([[0.25, 1.0], [-0.5, 2.0]])
+    # Mismo vector con ruido por debajo del redondeo -> acierto; la fila nueva es el único fallo
+    second = service.predict_batch([[0.25 + 1e-9, 1.0], [0.75, 3.0], [-0.5, 2.0]])
+
+    assert service.ml_repository.rows_scored == [2, 1]
+    assert second['predictions'] == [1, 1, 0]
+    assert second['confidences'][0] == first['confidences'][0]
+    stats = service.prediction_cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['hit_ratio']) == (2, 3, 0.4)
+
+
+def test_lru_bound_and_single_prediction(service):
+    for value in (1.5, 2.5, 3.5, 4.5):
+        service.predict([value, 0.0])
+
+    stats = service.prediction_cache.get_stats()
+    assert stats['size'] == 3 and stats['evictions'] == 1
+
+    service.predict([1.5, 0.0])  # desalojada (la menos usada) -> vuelve al modelo
+    assert service.ml_repository.rows_scored == [1] * 5
+
+
+def test_new_model_version_invalidates(service):
+    service.predict_batch([[1.0, 1.0]])
+    service.ml_repository.model_version = "v2"
+    result = service.predict_batch([[1.0, 1.0]])
+
+    assert result['model_name'] == "v2"
+    assert service.ml_repository.rows_scored == [1, 1]
+    assert service.prediction_cache.get_stats()['invalidations'] == 1
+
+
+def test_expired_entries_are_rescored():
+    service = ExoplanetService(ml_repository=CountingRepository(), prediction_cache=PredictionCache(ttl_seconds=-1))
+    service.predict_batch([[1.0, 1.0]])
+    service.predict_batch([[1.0, 1.0]])
+
+    assert service.ml_repository.rows_scored == [1, 1]
+    assert service.prediction_cache.get_stats()['expirations'] == 1
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.application.services.exoplanet_service import ExoplanetService
+from src.domain.pipeline_modules.data_cleaner import DataCleaner
+from src.domain.pipeline_modules.scientific_filter import ScientificFilter
+
+CANDIDATES = pd.DataFrame({
+    'label': ['confirmed', None, 'candidate', 'false positive', 'confirmed'],
+    'koi_period': [10.0, 10.0, 0.1, 20.0, 30.0],
+    'koi_duration': [3.0, 3.0, 3.0, 60.0, 2.0],
+    'koi_depth': [500.0, 500.0, 500.0, 500.0, np.nan],
+    'koi_model_snr': [20.0, 20.0, 20.0, 20.0, 20.0],
+})
+
+
+def test_fused_mask_matches_sequential_filters():
+    """La máscara única y sus conteos equivalen al filtrado secuencial por criterio."""
+    df_clean, label_removed, rejections = DataCleaner().filter_rows(CANDIDATES)
+
+    assert df_clean.index.tolist() == [0]
+    assert label_removed == 1
+    assert rejections == {
+        'Período orbital válido': 1,
+        'Duración tránsito observable': 1,
+        'Profundidad detectable': 1,  # NaN se rechaza
+        'SNR umbral NASA': 0,
+    }
+
+
+def test_mission_presets():
+    tess = ScientificFilter.for_mission('tess')
+    mask, rejections = tess.evaluate({'koi_period': [5.0, 2000.0], 'koi_duration': [2.0, 2.0]})
+
+    assert mask.tolist() == [True, False]
+    assert rejections['Período orbital válido'] == 1
+    with pytest.raises(ValueError):
+        ScientificFilter.for_mission('k2-unknown')
+
+
+def test_tess_preset_rejects_rows_of_a_translated_toi_archive(tmp_path):
+    """El catálogo se traduce a columnas koi_* antes de filtrar: el preset TESS debe encontrarlas."""
+    path = tmp_path / 'toi.csv'
+    with open(path, 'w') as f:
+        f.write("# This file was produced by the NASA Exoplanet Archive\n")
+        pd.DataFrame({
+            'tid': [1, 2, 3, 4], 'tfopwg_disp': ['PC', 'PC', 'KP', 'FP'],
+            'pl_orbper': [5.0, 2000.0, 3.0, 4.0], 'pl_trandurh': [2.0, 2.0, 2.0, 2.0],
+            'pl_trandep': [800.0, 800.0, 800.0, 800.0], 'st_rad': [1.0, 1.0, 1.0, 500.0],
+        }).to_csv(f, index=False)
+
+    cleaner = DataCleaner(use_cache=False, filters='tess')
+    filtered, _, rejections = cleaner.filter_rows(cleaner.load_and_select(str(path)))
+
+    assert filtered['kepid'].tolist() == [1, 3]
+    assert rejections == {'Período orbital válido': 1, 'Duración tránsito observable': 0,
+                          'Profundidad detectable': 0, 'Radio estelar físico': 1}
+
+
+class IdentityTransformer:
+    def transform(self, batch):
+        return np.column_stack([batch['koi_period'], batch['koi_duration']])
+
+
+def test_rejected_candidates_never_reach_the_model(fake_repository):
+    repository = fake_repository()
+    service = ExoplanetService(ml_repository=repository, transformer=IdentityTransformer())
+
+    result = service.predict_candidates({'koi_period': [10.0, 0.1, 5.0], 'koi_duration': [3.0, 3.0, 3.0]})
+
+    assert repository.rows_seen == 2
+    assert result['accepted'] == [True, False, True]
+    assert result['predictions'] == [1, None, 1]
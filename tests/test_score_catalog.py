@@ -0,0 +1,86 @@
+import functools
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.application.use_cases.score_catalog_use_case import MANIFEST_FILENAME, ScoreCatalogUseCase
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+CATALOG = pd.DataFrame({
+    'kepid': [101, 102, 103, 104, 105, 106, 107],
+    'koi_disposition': ['CANDIDATE'] * 7,
+    'koi_period': [10.0, 365.0, 3.0, 20.0, 50.0, 2.0, 300.0],
+    'koi_duration': [3.0] * 7,
+    'koi_depth': [500.0] * 7,
+    'koi_model_snr': [20.0, 30.0, 1.0, 15.0, 12.0, 40.0, 25.0],  # la fila 2 no pasa el umbral de SNR
+    'koi_prad': [1.0, 1.1, 2.0, 12.0, 3.0, 1.0, 1.2],
+    'koi_teq': [255.0, 290.0, 300.0, 280.0, 900.0, 1200.0, 270.0],
+})
+
+
+class PeriodTransformer:
+    def transform(self, batch):
+        return np.column_stack([batch['koi_period']])
+
+
+def write_archive_csv(path):
+    with open(path, 'w') as f:
+        f.write("# This file was produced by the NASA Exoplanet Archive\n# COLUMN kepid: KepID\n")
+        CATALOG.to_csv(f, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def score(fake_repository):
+    """Puntúa con el Port falso: clase 1 si el período supera 5 días."""
+    factory = functools.partial(fake_repository, threshold=5, transformer=PeriodTransformer())
+
+    def run(data_path, output_dir, shard_size=3):
+        return ScoreCatalogUseCase(data_path, str(output_dir), shard_size=shard_size, max_workers=1,
+                                   model_version='fake-v1', repository_factory=factory).run()
+    return run
+
+
+def test_catalog_is_scored_into_partitions_with_rejections_as_nulls(tmp_path, score):
+    summary = score(write_archive_csv(tmp_path / 'koi.csv'), tmp_path / 'scores')
+    table = pq.read_table(tmp_path / 'scores')
+    result = table.to_pandas().sort_values('row_index')
+
+    assert summary['shards'] == summary['scored_shards'] == 3 and summary['accepted'] == 6
+    assert result['kepid'].tolist() == CATALOG['kepid'].tolist()
+    assert result['accepted'].tolist() == [True, True, False, True, True, True, True]
+    assert result['prediction'].isna().tolist() == [False, False, True, False, False, False, False]
+    assert result['is_potentially_habitable'].tolist() == [True, True, None, False, False, False, True]
+    assert table.schema.metadata[b'model_version'] == b'fake-v1'
+
+
+def test_interrupted_run_resumes_and_changed_run_restarts(tmp_path, score):
+    data_path = write_archive_csv(tmp_path / 'koi.csv')
+    output_dir = tmp_path / 'scores'
+    score(data_path, output_dir)
+
+    # Corte simulado: el shard 1 no llegó a escribirse
+    (output_dir / 'part-00001.parquet').unlink()
+    score(data_path, output_dir)
+    entries = [json.loads(line) for line in open(output_dir / MANIFEST_FILENAME)]
+    assert [entry['shard'] for entry in entries] == [0, 1, 2, 1]
+
+    # Otro troceado: la salida anterior no se mezcla con la nueva (tampoco shards de 6+ dígitos)
+    (output_dir / 'part-100000.parquet').write_bytes(b'')
+    summary = score(data_path, output_dir, shard_size=2)
+    assert summary['scored_shards'] == 4
+    assert sorted(p.name for p in output_dir.glob('part-*.parquet')) == [f'part-0000{i}.parquet' for i in range(4)]
+
+
+def test_parquet_catalog_shards_span_row_groups(tmp_path, score):
+    data_path = tmp_path / 'koi.parquet'
+    CATALOG.to_parquet(data_path, row_group_size=2)
+
+    score(str(data_path), tmp_path / 'scores')
+    result = pq.read_table(tmp_path / 'scores').to_pandas().sort_values('row_index')
+
+    assert result['row_index'].tolist() == list(range(7))
+    assert result['kepid'].tolist() == CATALOG['kepid'].tolist()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from src.domain.pipeline_modules.streaming_stats import QuantileSketch, StreamingMoments
+from src.domain.services.exoplanet_pipeline import ExoplanetPreprocessor
+
+DATA_PATH = './data/kepler_koi.csv'
+
+
+def test_streaming_moments_merge_matches_scipy():
+    """Los momentos combinados por bloques deben igualar a scipy/pandas sobre el total."""
+    values = np.random.default_rng(0).lognormal(size=5000)
+    acc = StreamingMoments()
+    for block in np.array_split(values, 7):
+        acc.update(block)
+
+    assert acc.count == len(values)
+    assert acc.skewness == pytest.approx(stats.skew(values), rel=1e-9)
+    assert acc.kurtosis == pytest.approx(stats.kurtosis(values), rel=1e-9)
+    assert acc.std == pytest.approx(values.std(ddof=1), rel=1e-9)
+
+
+def test_quantile_sketch_exact_then_bounded():
+    """Exacto bajo la capacidad; aproximado (y acotado en memoria) al superarla."""
+    values = np.random.default_rng(1).normal(size=20000)
+
+    exact = QuantileSketch(capacity=20000).update(values)
+    assert exact.quantile(0.5) == pytest.approx(np.median(values))
+
+    compressed = QuantileSketch(capacity=256)
+    for block in np.array_split(values, 20):
+        compressed.update(block)
+    assert len(compressed._values) <= 2 * 256
+    assert compressed.quantile(0.5) == pytest.approx(np.median(values), abs=0.02)
+    assert compressed.quantile(0.9) == pytest.approx(np.quantile(values, 0.9), abs=0.05)
+
+
+def test_fit_streaming_matches_in_memory_fit():
+    """Por chunks se obtienen las mismas medianas y constantes que el pipeline en memoria."""
+    in_memory = ExoplanetPreprocessor(data_path=DATA_PATH).fit()
+    streaming_preprocessor = ExoplanetPreprocessor(data_path=DATA_PATH)
+    streaming = streaming_preprocessor.fit_streaming(chunk_size=1000, sketch_capacity=100_000)
+
+    assert streaming.feature_names == in_memory.feature_names
+    for col, median in in_memory.imputation_medians.items():
+        assert streaming.imputation_medians[col] == pytest.approx(median)
+    for name, value in in_memory.statistical_constants.items():
+        assert streaming.statistical_constants[name] == pytest.approx(value, rel=1e-9)
+
+    # El scaler usa pesos de clase en vez de oversampling aleatorio: coincide aproximadamente
+    np.testing.assert_allclose(streaming.scaler_center, in_memory.scaler_center, rtol=0.05, atol=1e-6)
+
+    chunks = list(streaming_preprocessor.iter_transform_streaming(chunk_size=2000))
+    assert all(X.shape[1] == len(streaming.feature_names) for X, _ in chunks)
+    assert sum(len(y) for _, y in chunks) > 0
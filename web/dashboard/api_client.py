@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Columnas KOI crudas que el dashboard exige en un CSV de misión (la API deriva el resto de features)
+REQUIRED_COLUMNS = ['koi_period', 'koi_duration', 'koi_depth', 'koi_impact', 'koi_prad', 'koi_model_snr']
+# Columnas que identifican un catálogo TESS/K2 (la API las traduce al esquema KOI)
+MISSION_COLUMNS = ['pl_orbper']
+# Columnas extra (no son features del modelo) que la API usa para la regla de habitabilidad
+HABITABILITY_COLUMNS = ['koi_teq']
+# Filas por petición: payloads de unos cientos de KB, un solo pase del modelo por lote
+DEFAULT_CHUNK_SIZE = 1000
+# Radio planetario (radios terrestres) por encima del cual la fila se considera inválida
+MAX_PLANET_RADIUS = 1000
+
+
+class FeatureNamesCache:
+
+    """
+    Responsabilidad: Mantener en memoria la lista de features del modelo y releer
+    feature_names.json solo cuando su mtime cambia (p. ej. tras un reentrenamiento).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._names = []
+
+    def get(self) -> list:
+        try:
+            stamp = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path) as f:
+                    self._names = json.load(f).get("feature_names", [])
+                self._stamp = stamp
+            return self._names
+
+
+class BatchPredictionClient:
+
+    """
+    Responsabilidad: Enviar un CSV de misión completo a la API en lotes columnares
+    (/models/predict-batch o /models/predict-candidates) reutilizando las conexiones
+    de una requests.Session, e informar del progreso lote a lote.
+    """
+
+    def __init__(self, base_url: str, feature_names_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 timeout: float = 60.0, session: requests.Session = None):
+        self.base_url = base_url.rstrip('/')
+        self.feature_names = FeatureNamesCache(feature_names_path)
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.session = session or self._build_session()
+
+    @staticmethod
+    def _build_session() -> requests.Session:
+        """Sesión con pool keep-alive y reintentos ante errores transitorios del servidor."""
+        session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=None)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _post(self, path: str, payload: dict) -> dict:
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _chunks(self, n_rows: int):
+        for start in range(0, n_rows, self.chunk_size):
+            yield start, min(start + self.chunk_size, n_rows)
+
+    def predict_frame(self, df: pd.DataFrame, progress=None) -> dict:
+
+        """
+        Clasifica un CSV que trae todas las features del modelo (las de feature_names.json, mismo
+        contrato que /models/predict-batch); si falta alguna se lanza ValueError. Las filas con
+        valores no numéricos/vacíos o con un radio planetario irreal no se envían.
+        `progress(filas_procesadas, total)` se llama tras cada lote.
+        """
+        feature_names = self.feature_names.get()
+        if not feature_names:
+            raise FileNotFoundError("Archivo 'feature_names.json' no encontrado.")
+        missing = [name for name in feature_names if name not in df.columns]
+        if missing:
+            raise ValueError(f"Faltan características del modelo en el archivo: {missing}")
+
+        present = {name: pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+                   for name in feature_names}
+        valid = np.ones(len(df), dtype=bool)
+        for values in present.values():
+            valid &= np.isfinite(values)
+        if 'koi_prad' in present:
+            valid &= ~(present['koi_prad'] > MAX_PLANET_RADIUS)
+        n_valid = int(valid.sum())
+        columns = {name: present[name][valid] for name in feature_names}
+        # Sin koi_teq la habitabilidad de la fila es desconocida (no se cuenta como no habitable)
+        known = np.zeros(n_valid, dtype=bool)
+        for name in HABITABILITY_COLUMNS:
+            if name in df.columns and name not in columns:
+                # JSON no admite NaN: un valor ausente se envía como 0.0 (nunca cumple la regla)
+                values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)[valid]
+                known = np.isfinite(values)
+                columns[name] = np.where(known, values, 0.0)
+
+        predictions, habitable = [], []
+        for start, stop in self._chunks(n_valid):
+            result = self._post('/models/predict-batch',
+                                {"features": {name: values[start:stop].tolist() for name, values in columns.items()}})
+            predictions.extend(result['prediction_value'])
+            habitable.extend(result['is_potentially_habitable'])
+            if progress:
+                progress(stop, n_valid)
+
+        return {
+            'total': len(df),
+            'invalid': int((~valid).sum()),
+            'positives': int(sum(predictions)),
+            'habitable': int(np.sum(np.asarray(habitable, dtype=bool) & known)),
+            'habitable_unknown': int((~known).sum()),
+        }
+
+    def predict_mission_frame(self, df: pd.DataFrame, progress=None) -> dict:
+
+        """
+        Clasifica un catálogo con columnas crudas (KOI sin las features derivadas, TESS o K2)
+        enviando sus columnas numéricas a /models/predict-candidates: la API las traduce al
+        esquema KOI, aplica los filtros científicos y el transformador del modelo. La API
+        devuelve la habitabilidad nula (o NaN) si la fila no trae temperatura de equilibrio.
+        """
+        numeric = df.select_dtypes(include='number')
+        columns = {name: numeric[name].to_numpy(dtype=np.float64) for name in numeric.columns}
+
+        positives, rejected, habitable, unknown = 0, 0, 0, 0
+        for start, stop in self._chunks(len(df)):
+            payload = {name: [v if np.isfinite(v) else None for v in values[start:stop].tolist()]
+                       for name, values in columns.items()}
+            result = self._post('/models/predict-candidates', {"candidates": payload})
+            positives += sum(1 for value in result['prediction_value'] if value == 1)
+            rejected += result['count'] - sum(result['accepted'])
+            for accepted, value in zip(result['accepted'], result['is_potentially_habitable']):
+                if not accepted:
+                    continue
+                if value is None or value != value:
+                    unknown += 1
+                else:
+                    habitable += bool(value)
+            if progress:
+                progress(stop, len(df))
+
+        return {'total': len(df), 'invalid': rejected, 'positives': positives, 'habitable': habitable,
+                'habitable_unknown': unknown}
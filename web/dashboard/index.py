@@ -1,22 +1,29 @@
 import dash
-from dash import dcc, html, Input, Output, State
+from dash import dcc, html, Input, Output, State, DiskcacheManager
+import diskcache
 import json
 import os
 import pandas as pd
 import requests
 import base64
 import io
+from api_client import BatchPredictionClient, REQUIRED_COLUMNS, MISSION_COLUMNS, HABITABILITY_COLUMNS
 
 # ========== 1. DEFINICIÓN DE LA APP Y CONFIGURACIÓN ==========
 app = dash.Dash(__name__, external_stylesheets=['https://cdn.jsdelivr.net/npm/bootswatch@4.5.2/dist/cyborg/bootstrap.min.css', 'https://use.fontawesome.com/releases/v5.8.1/css/all.css', '/assets/custom.css'], suppress_callback_exceptions=True)
 server = app.server
 
 # ========== 2. LÓGICA DE API CLIENT Y CARGA DE DATOS ==========
-API_URL = "http://localhost:8000/models/predict"
+API_BASE_URL = "http://localhost:8000"
+API_URL = f"{API_BASE_URL}/models/predict"
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 FEATURE_NAMES_PATH = os.path.join(PROJECT_ROOT, 'models', 'feature_names.json')
 METRICS_PATH = os.path.join(PROJECT_ROOT, 'models', 'latest_metrics.json')
 
+# Cliente de lotes (sesión HTTP reutilizada + nombres de features en caché) y gestor de callbacks en segundo plano
+BATCH_CLIENT = BatchPredictionClient(API_BASE_URL, FEATURE_NAMES_PATH)
+BACKGROUND_MANAGER = DiskcacheManager(diskcache.Cache(os.path.join(PROJECT_ROOT, '.cache', 'dashboard')))
+
 def load_metrics():
     """Carga las métricas del modelo desde el archivo JSON."""
     try:
@@ -26,9 +33,7 @@ def load_metrics():
         return {"accuracy": 0, "f1_score": 0}
 
 def get_all_feature_names():
-    try:
-        with open(FEATURE_NAMES_PATH) as f: return json.load(f).get("feature_names", [])
-    except FileNotFoundError: return []
+    return BATCH_CLIENT.feature_names.get()
 
 def predict_exoplanet(user_inputs: dict):
     all_feature_names = get_all_feature_names()
@@ -37,7 +42,7 @@ def predict_exoplanet(user_inputs: dict):
     features_payload = {name: 0.0 for name in all_feature_names}
     features_payload.update(user_inputs)
     try:
-        response = requests.post(API_URL, json={"features": features_payload})
+        response = BATCH_CLIENT.session.post(API_URL, json={"features": features_payload})
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e: return {"error": f"Error de conexión con la API: {e}."}
@@ -81,6 +86,7 @@ def create_demo_content():
             html.Div(className="col-lg-8", children=html.Div(className="card bg-dark text-white p-4", children=[
                 html.H4("Cargar Archivo de Misión (CSV)"),
                 dcc.Upload(id='upload-data', children=html.Div(['Arrastra o selecciona un archivo CSV para análisis']), className="drag-area", multiple=False),
+                html.Progress(id='upload-progress', value='0', max='1', className="w-100 mt-3", style={'visibility': 'hidden'}),
                 dcc.Loading(id="loading-spinner", type="circle", children=html.Div(id='file-upload-output', className="mt-3"))
             ]))
         ])
@@ -125,22 +131,41 @@ def display_page(pathname):
     elif pathname == '/equipo': return create_team_content()
     else: return create_home_content()
 
-@app.callback(Output('file-upload-output', 'children'), Input('upload-data', 'contents'), State('upload-data', 'filename'), prevent_initial_call=True)
-def handle_file_upload(contents, filename):
+@app.callback(
+    Output('file-upload-output', 'children'),
+    Input('upload-data', 'contents'),
+    State('upload-data', 'filename'),
+    background=True,
+    manager=BACKGROUND_MANAGER,
+    running=[(Output('upload-progress', 'style'), {'visibility': 'visible'}, {'visibility': 'hidden'})],
+    progress=[Output('upload-progress', 'value'), Output('upload-progress', 'max')],
+    prevent_initial_call=True
+)
+def handle_file_upload(set_progress, contents, filename):
     if contents is None: return html.Div()
     content_type, content_string = contents.split(',')
     decoded = base64.b64decode(content_string)
     try:
         if 'csv' in filename:
-            df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
-            required_cols = ['koi_period', 'koi_duration', 'koi_depth', 'koi_impact', 'koi_prad', 'koi_model_snr']
-            if not all(col in df.columns for col in required_cols):
-                return html.Div(f"Error: El archivo CSV debe contener las columnas: {', '.join(required_cols)}", className="alert alert-danger")
+            # comment='#': los CSV del NASA Exoplanet Archive traen cabecera de comentarios
+            df = pd.read_csv(io.StringIO(decoded.decode('utf-8')), comment='#')
+            report = lambda done, total: set_progress((str(done), str(max(total, 1))))
 
-            results = [predict_exoplanet(row[required_cols].to_dict()) for _, row in df.iterrows()]
-            
-            positives = sum(1 for r in results if r.get("prediction_label") == "Exoplaneta Confirmado")
-            false_positives = len(results) - positives
+            # Todo el archivo viaja en lotes columnares (una petición por lote, no por fila)
+            feature_names = get_all_feature_names()
+            if feature_names and all(col in df.columns for col in feature_names):
+                # koi_teq no es feature del modelo, pero la regla de habitabilidad lo necesita
+                extra = [col for col in HABITABILITY_COLUMNS if col in df.columns and col not in feature_names]
+                summary = BATCH_CLIENT.predict_frame(df[feature_names + extra], progress=report)
+            elif all(col in df.columns for col in REQUIRED_COLUMNS) or all(col in df.columns for col in MISSION_COLUMNS):
+                # Columnas crudas (KOI, TESS, K2): la API deriva las features con el transformador del modelo
+                summary = BATCH_CLIENT.predict_mission_frame(df, progress=report)
+            else:
+                return html.Div(f"Error: El archivo CSV debe contener las columnas: {', '.join(REQUIRED_COLUMNS)}", className="alert alert-danger")
+
+            positives = summary['positives']
+            # Las filas inválidas o rechazadas por los filtros no llegan al modelo: no son falsos positivos
+            false_positives = summary['total'] - summary['invalid'] - positives
             
             return html.Div(className="result-summary-container", children=[
                 html.Div(className="result-summary-header", children=[
@@ -149,7 +174,7 @@ def handle_file_upload(contents, filename):
                 html.Div(className="row", children=[
                     html.Div(className="col-md-4", children=html.Div(className="result-stat-card", children=[
                         html.I(className="fas fa-rocket icon total"),
-                        html.Div(len(results), className="value"),
+                        html.Div(summary['total'], className="value"),
                         html.Div("Candidatos Analizados", className="label")
                     ])),
                     html.Div(className="col-md-4", children=html.Div(className="result-stat-card", children=[
@@ -162,10 +187,16 @@ def handle_file_upload(contents, filename):
                         html.Div(false_positives, className="value"),
                         html.Div("Falsos Positivos", className="label")
                     ]))
-                ])
+                ]),
+                html.P(f"Candidatos potencialmente habitables: {summary['habitable']}"
+                       + (f" (habitabilidad desconocida sin temperatura de equilibrio: {summary['habitable_unknown']})"
+                          if summary['habitable_unknown'] else ""), className="text-white-50 mt-2"),
+                html.P(f"Filas descartadas por datos inválidos: {summary['invalid']}", className="text-white-50 mt-2") if summary['invalid'] else html.Div()
             ])
         else:
             return html.Div("Error: Por favor, carga un archivo CSV.", className="alert alert-danger")
+    except requests.exceptions.RequestException as e:
+        return html.Div(f"Error de conexión con la API: {e}.", className="alert alert-danger")
     except Exception as e:
         return html.Div(f"Hubo un error al procesar el archivo: {e}", className="alert alert-danger")
 